@@ -1,4 +1,5 @@
 from dummy_api.api import setup_routes, app
+from dummy_api.environment import freeze_environment_heap
 import os
 
 
@@ -7,3 +8,4 @@ abspath = os.path.join(os.path.dirname(__file__), file_path)
 
 
 setup_routes(file_path)
+freeze_environment_heap()
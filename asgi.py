@@ -0,0 +1,11 @@
+from dummy_api.asgi import create_app
+from dummy_api.environment import freeze_environment_heap
+import os
+
+
+file_path = os.environ.get("ROUTES_FILE_PATH", "new_routes.json")
+abspath = os.path.join(os.path.dirname(__file__), file_path)
+
+
+app = create_app(file_path)
+freeze_environment_heap()
@@ -0,0 +1,85 @@
+import json
+import os
+import tempfile
+import time
+from dummy_api.routes import RoutesProvider
+
+RECORD_COUNT = 100000
+# POSTing every record on its own takes hours (each response is the whole list), so that is timed on a sample
+SINGLE_POST_SAMPLE = 200
+
+
+def build_records(start: int, count: int) -> list:
+    return [{"id": i, "name": f"Person {i}", "age": i % 90} for i in range(start, start + count)]
+
+
+def build_route_provider() -> RoutesProvider:
+    routes_data = {
+        "data_groups": [{"group_name": "people", "data": {"people": []}}],
+        "routes": [
+            {
+                "path": "/people",
+                "name": "people",
+                "methods": ["GET", "POST"],
+                "indexes": ["name"],
+                "sorted_indexes": ["age"],
+                "data": {"reference": {"source": "people", "find": "people"}}
+            },
+            {
+                "path": "/people/{id}",
+                "name": "person",
+                "data": {"reference": {"source": "people", "find": "people[id={id}]"}}
+            }
+        ]
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "routes.json")
+        with open(file_path, "w") as f:
+            f.write(json.dumps(routes_data))
+        return RoutesProvider(file_path)
+
+
+def seed_bulk(record_count: int) -> float:
+    route_provider = build_route_provider()
+    records = build_records(0, record_count)
+    started = time.perf_counter()
+    route_provider.get_route_response(
+        "/people", request_method="POST", request_body={"payload": records, "bulk": True}
+    )
+    # the first read after seeding, with the indexes in use
+    route_provider.get_route_response("/people", query_parameters={"name": "Person 7", "sort": "age"})
+    return time.perf_counter() - started
+
+
+def seed_single(record_count: int, sample_size: int) -> float:
+    # every POST is followed by a read, like a test harness checking what it wrote, which keeps the indexes in sync
+    route_provider = build_route_provider()
+    route_provider.get_route_response(
+        "/people", request_method="POST", request_body={"payload": build_records(0, record_count), "bulk": True}
+    )
+    started = time.perf_counter()
+    for record in build_records(record_count, sample_size):
+        route_provider.get_route_response("/people", request_method="POST", request_body={"payload": record})
+        route_provider.get_route_response("/people", query_parameters={"name": record["name"]})
+    return (time.perf_counter() - started) / sample_size
+
+
+def run() -> list:
+    bulk_s = seed_bulk(RECORD_COUNT)
+    # per record cost of single POSTs at the start and at the end of seeding
+    single_start_s = seed_single(0, SINGLE_POST_SAMPLE)
+    single_end_s = seed_single(RECORD_COUNT - SINGLE_POST_SAMPLE, SINGLE_POST_SAMPLE)
+    return [
+        {"mode": "bulk", "seconds": bulk_s},
+        {"mode": "single POSTs (estimated)", "seconds": (single_start_s + single_end_s) / 2 * RECORD_COUNT}
+    ]
+
+
+def main():
+    print(f"seeding {RECORD_COUNT} records")
+    for result in run():
+        print(f"{result['mode']:>26} {result['seconds']:>10.2f}s")
+
+
+if __name__ == "__main__":
+    main()
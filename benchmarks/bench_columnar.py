@@ -0,0 +1,100 @@
+import json
+import os
+import tempfile
+import timeit
+import tracemalloc
+from dummy_api.columnar import ColumnarList, is_columnar_available
+from dummy_api.request import RouteRequest
+from dummy_api.routes import RoutesProvider
+
+ITEM_COUNT = 100000
+# (label, query parameters), none of the fields are indexed
+REQUESTS = [
+    ("scanned eq", {"category": "category_7", "limit": "20"}),
+    ("scanned range", {"score__gte": "990.5", "limit": "20"}),
+    ("count", {"aggregate": "count"}),
+    ("sum, min, max", {"aggregate": "sum:score,min:added,max:score"}),
+    ("group by", {"aggregate": "count,sum:score", "group_by": "category"})
+]
+
+
+def build_items() -> list:
+    return [
+        {
+            "id": i,
+            "category": f"category_{i % 100}",
+            "score": (i % 1000) + 0.5,
+            "added": f"2020-{1 + i % 12:02}-{1 + i % 28:02}"
+        }
+        for i in range(ITEM_COUNT)
+    ]
+
+
+def measure_memory(build: callable) -> int:
+    # bytes still allocated by what build returns
+    tracemalloc.start()
+    try:
+        value = build()
+        return tracemalloc.get_traced_memory()[0] if value is not None else 0
+    finally:
+        tracemalloc.stop()
+
+
+def build_route_provider(items: list, columnar: bool) -> RoutesProvider:
+    routes_data = {
+        "data_groups": [{"group_name": "items", "data": {"items": items}}],
+        "routes": [
+            {
+                "path": "/items",
+                "name": "items",
+                "columnar": columnar,
+                "data": {"reference": {"source": "items", "find": "items"}}
+            }
+        ]
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "routes.json")
+        with open(file_path, "w") as f:
+            f.write(json.dumps(routes_data))
+        return RoutesProvider(file_path)
+
+
+def time_request(route_provider: RoutesProvider, query_parameters: dict, number: int = 5) -> float:
+    # seconds per request, rendered without the response cache
+    request = RouteRequest("/items", query_parameters=query_parameters)
+    route, params = route_provider.match_route(request)
+    run_time = min(timeit.repeat(
+        lambda: route_provider.encode_route_result(route, request, params), number=number, repeat=3
+    ))
+    return run_time / number
+
+
+def run() -> list:
+    if not is_columnar_available():
+        return []
+    items = build_items()
+    results = [{
+        "request": "memory (MB)",
+        "list": measure_memory(build_items) / 2 ** 20,
+        "columnar": measure_memory(lambda: ColumnarList.from_records(items)) / 2 ** 20
+    }]
+    route_providers = {"list": build_route_provider(items, False), "columnar": build_route_provider(items, True)}
+    for label, query_parameters in REQUESTS:
+        result = {"request": f"{label} (ms)"}
+        for storage, route_provider in route_providers.items():
+            result[storage] = time_request(route_provider, query_parameters) * 1000
+        results.append(result)
+    return results
+
+
+def main():
+    if not is_columnar_available():
+        print("numpy is not installed, columnar storage is unavailable")
+        return
+    print(f"{'':>20} {'list':>10} {'columnar':>10}")
+    for result in run():
+        print(f"{result['request']:>20} {result['list']:>10.2f} {result['columnar']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
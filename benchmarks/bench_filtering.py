@@ -0,0 +1,81 @@
+import json
+import os
+import tempfile
+import timeit
+from dummy_api.request import RouteRequest
+from dummy_api.routes import RoutesProvider
+
+ITEM_COUNT = 20000
+# (label, query parameters): status has a hash index, score a sorted one, category and rank have neither
+REQUESTS = [
+    ("full list", {}),
+    ("indexed eq", {"status": "status_7"}),
+    ("scanned eq", {"category": "category_7"}),
+    ("indexed eq + range", {"status": "status_7", "score__gte": "500"}),
+    ("indexed range", {"score__gte": "990"}),
+    ("scanned range", {"rank__gte": "990"}),
+    ("membership", {"tags": "tag_3"}),
+    ("indexed sort, page", {"sort": "-score", "limit": "20"}),
+    ("scanned sort, page", {"sort": "-rank", "limit": "20"})
+]
+
+
+def build_route_provider() -> RoutesProvider:
+    items = [
+        {
+            "id": i,
+            "status": f"status_{i % 100}",
+            "category": f"category_{i % 100}",
+            "score": i % 1000,
+            "rank": i % 1000,
+            "tags": [f"tag_{i % 50}", "common"]
+        }
+        for i in range(ITEM_COUNT)
+    ]
+    routes_data = {
+        "data_groups": [{"group_name": "items", "data": {"items": items}}],
+        "routes": [
+            {
+                "path": "/items",
+                "name": "items",
+                "indexes": ["status"],
+                "sorted_indexes": ["score"],
+                "data": {"reference": {"source": "items", "find": "items"}}
+            }
+        ]
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "routes.json")
+        with open(file_path, "w") as f:
+            f.write(json.dumps(routes_data))
+        return RoutesProvider(file_path)
+
+
+def time_request(route_provider: RoutesProvider, query_parameters: dict, number: int = 20) -> tuple:
+    # (seconds per request, items returned), rendered without the response cache so every run filters and encodes
+    request = RouteRequest("/items", query_parameters=query_parameters)
+    route, params = route_provider.match_route(request)
+    body, headers = route_provider.encode_route_result(route, request, params)
+    run_time = min(timeit.repeat(
+        lambda: route_provider.encode_route_result(route, request, params), number=number, repeat=5
+    ))
+    return run_time / number, len(json.loads(body))
+
+
+def run() -> list:
+    route_provider = build_route_provider()
+    results = []
+    for label, query_parameters in REQUESTS:
+        run_time, item_count = time_request(route_provider, query_parameters)
+        results.append({"request": label, "ms": run_time * 1000, "items": item_count})
+    return results
+
+
+def main():
+    print(f"{'request':>20} {'time (ms)':>10} {'items':>7}")
+    for result in run():
+        print(f"{result['request']:>20} {result['ms']:>10.3f} {result['items']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import timeit
+from dummy_api.data import MutableDataStore
+
+LIST_LENGTHS = [100, 10000, 1000000]
+
+
+def build_store(list_length: int, indexed: bool) -> MutableDataStore:
+    store = MutableDataStore()
+    store.add_data_group("data", {"items": [{"id": i, "value": f"Item {i}"} for i in range(list_length)]})
+    if indexed:
+        store.register_query_indexes("data", "items[id={id}]")
+    return store
+
+
+def time_lookup(store: MutableDataStore, list_length: int, repeat: int, number: int) -> float:
+    resolver = store.build_data_resolver("data", "items[id={id}]")
+    last_id = str(list_length - 1)
+    resolver(id=last_id)  # build the index outside of the timed runs
+    best = min(timeit.repeat(lambda: resolver(id=last_id), number=number, repeat=repeat))
+    return best / number
+
+
+def run(list_lengths: list = None) -> list:
+    results = []
+    for list_length in list_lengths or LIST_LENGTHS:
+        results.append({
+            "items": list_length,
+            "indexed_us": time_lookup(build_store(list_length, True), list_length, 5, 1000) * 1e6,
+            "scan_us": time_lookup(build_store(list_length, False), list_length, 3, 3) * 1e6
+        })
+    return results
+
+
+def main():
+    print(f"{'items':>8} {'indexed (us/lookup)':>21} {'scan (us/lookup)':>18}")
+    for result in run():
+        print(f"{result['items']:>8} {result['indexed_us']:>21.2f} {result['scan_us']:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
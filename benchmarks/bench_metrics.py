@@ -0,0 +1,73 @@
+import json
+import os
+import tempfile
+import timeit
+from benchmarks.bench_routing import build_routes_data
+from dummy_api.metrics import MetricsRegistry, RESULT_OK, RequestTimings
+from dummy_api.request import RouteRequest
+from dummy_api.routes import RoutesProvider
+
+ROUTE_COUNT = 1000
+# (label, method, path): cache hits are the cheapest requests, so they show the instrumentation's overhead the most
+REQUESTS = [
+    ("cached GET", "GET", "/resource_10/1"),
+    ("uncached POST", "POST", "/resource_10/1"),
+    ("not found", "GET", "/not/a/route")
+]
+
+
+def build_route_provider(collect_metrics: bool) -> RoutesProvider:
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "routes.json")
+        with open(file_path, "w") as f:
+            f.write(json.dumps(build_routes_data(ROUTE_COUNT)))
+        return RoutesProvider(file_path, collect_metrics=collect_metrics)
+
+
+def time_requests(route_providers: list, method: str, path: str, number: int = 20000, rounds: int = 5) -> list:
+    # the providers take turns, so load on the machine skews them alike
+    body = {"payload": {"id": 1, "value": "One"}} if method == "POST" else None
+    request = RouteRequest(path, request_method=method, request_body=body)
+    best_times = [float("inf")] * len(route_providers)
+    for _ in range(rounds):
+        for i, route_provider in enumerate(route_providers):
+            route_provider.render_request(request)
+            run_time = timeit.timeit(lambda: route_provider.render_request(request), number=number)
+            best_times[i] = min(best_times[i], run_time / number)
+    return best_times
+
+
+def time_record_request(number: int = 100000) -> float:
+    # the instrumentation alone, end to end differences are easily lost in the noise
+    metrics = MetricsRegistry()
+    timings = RequestTimings()
+    timings.matched = timings.resolved = timings.serialized = timings.started
+    return min(timeit.repeat(
+        lambda: metrics.record_request("/resource/{id}", "GET", RESULT_OK, timings), number=number, repeat=5
+    )) / number
+
+
+def run() -> list:
+    route_providers = [build_route_provider(True), build_route_provider(False)]
+    results = []
+    for label, method, path in REQUESTS:
+        enabled_us, disabled_us = (run_time * 1e6 for run_time in time_requests(route_providers, method, path))
+        results.append({
+            "request": label,
+            "metrics_us": enabled_us,
+            "no_metrics_us": disabled_us,
+            "overhead_us": enabled_us - disabled_us
+        })
+    return results
+
+
+def main():
+    print(f"{'request':>14} {'metrics (us)':>13} {'no metrics (us)':>16} {'overhead (us)':>14}")
+    for result in run():
+        print(f"{result['request']:>14} {result['metrics_us']:>13.2f} {result['no_metrics_us']:>16.2f} "
+              f"{result['overhead_us']:>14.2f}")
+    print(f"record_request alone: {time_record_request() * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import json
+import os
+import tempfile
+import timeit
+from dummy_api.request import RouteRequest
+from dummy_api.routes import RoutesProvider
+
+ITEM_COUNT = 500
+FIELD_COUNT = 50
+# (label, path, fields)
+REQUESTS = [
+    ("list, all fields", "/items", None),
+    ("list, 2 fields", "/items", "id,name"),
+    ("list, nested field", "/items", "id,details.owner.name"),
+    ("item, all fields", "/items/250", None),
+    ("item, 2 fields", "/items/250", "id,name")
+]
+
+
+def build_wide_item(item_id: int) -> dict:
+    item = {"id": item_id, "name": f"Item {item_id}"}
+    item.update({f"field_{i}": f"value {i} of item {item_id}" for i in range(FIELD_COUNT)})
+    item["details"] = {
+        "owner": {"name": f"Owner {item_id}", "history": [{"year": year, "note": "x" * 40} for year in range(20)]},
+        "dimensions": {f"axis_{i}": i * 1.5 for i in range(20)}
+    }
+    return item
+
+
+def build_route_provider() -> RoutesProvider:
+    routes_data = {
+        "data_groups": [{"group_name": "items", "data": {"items": [build_wide_item(i) for i in range(ITEM_COUNT)]}}],
+        "routes": [
+            {"path": "/items", "name": "items", "data": {"reference": {"source": "items", "find": "items"}}},
+            {
+                "path": "/items/{id}",
+                "name": "item",
+                "data": {"reference": {"source": "items", "find": "items[id={id}]"}}
+            }
+        ]
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "routes.json")
+        with open(file_path, "w") as f:
+            f.write(json.dumps(routes_data))
+        return RoutesProvider(file_path)
+
+
+def time_request(route_provider: RoutesProvider, path: str, fields: str = None, number: int = 50) -> tuple:
+    # (seconds per request, response bytes), rendered without the response cache so every run resolves and encodes
+    request = RouteRequest(path, query_parameters={"fields": fields} if fields else None)
+    route, params = route_provider.match_route(request)
+    body, headers = route_provider.encode_route_result(route, request, params)
+    run_time = min(timeit.repeat(
+        lambda: route_provider.encode_route_result(route, request, params), number=number, repeat=5
+    ))
+    return run_time / number, len(body)
+
+
+def run() -> list:
+    route_provider = build_route_provider()
+    results = []
+    for label, path, fields in REQUESTS:
+        run_time, body_size = time_request(route_provider, path, fields)
+        results.append({"request": label, "fields": fields, "ms": run_time * 1000, "bytes": body_size})
+    return results
+
+
+def main():
+    print(f"{'request':>20} {'time (ms)':>10} {'bytes out':>10}")
+    for result in run():
+        print(f"{result['request']:>20} {result['ms']:>10.3f} {result['bytes']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import json
+import os
+import random
+import tempfile
+import timeit
+from dummy_api.request import RouteRequest
+from dummy_api.routes import RoutesProvider
+
+ROUTE_COUNTS = [10, 1000, 50000]
+
+
+def build_routes_data(route_count: int) -> dict:
+    routes = []
+    for i in range(route_count):
+        if i % 2 == 0:
+            path = f"/resource_{i}/{{id}}"
+            find = "items[id={id}]"
+        else:
+            path = f"/resource_{i}/items"
+            find = "items"
+        routes.append({
+            "path": path,
+            "name": f"resource_{i}",
+            "methods": ["GET", "POST"],
+            "data": {"reference": {"source": "data", "find": find}}
+        })
+    return {
+        "data_groups": [{"group_name": "data", "data": {"items": [{"id": 1, "value": "One"}]}}],
+        "routes": routes
+    }
+
+
+def build_route_provider(route_count: int) -> RoutesProvider:
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "routes.json")
+        with open(file_path, "w") as f:
+            f.write(json.dumps(build_routes_data(route_count)))
+        return RoutesProvider(file_path)
+
+
+def linear_match(route_provider: RoutesProvider, request: RouteRequest):
+    for route in route_provider.routes:
+        if route.can_handle_request(request):
+            return route, route.constraint.get_constraint_parameters_from_request(request)
+
+
+def get_sample_requests(route_count: int, sample_size: int = 100) -> list:
+    rng = random.Random(route_count)
+    requests = []
+    for _ in range(sample_size):
+        i = rng.randrange(route_count)
+        path = f"/resource_{i}/1" if i % 2 == 0 else f"/resource_{i}/items"
+        requests.append(RouteRequest(path, request_method="GET"))
+    requests.append(RouteRequest("/not/a/route", request_method="GET"))
+    return requests
+
+
+def time_per_request(match_fn: callable, requests: list, repeat: int) -> float:
+    def run():
+        for request in requests:
+            match_fn(request)
+
+    best = min(timeit.repeat(run, number=1, repeat=repeat))
+    return best / len(requests)
+
+
+def run(route_counts: list = None) -> list:
+    results = []
+    for route_count in route_counts or ROUTE_COUNTS:
+        route_provider = build_route_provider(route_count)
+        requests = get_sample_requests(route_count)
+        linear_repeat = 3 if route_count > 1000 else 10
+        results.append({
+            "routes": route_count,
+            "trie_us": time_per_request(route_provider.match_route, requests, 10) * 1e6,
+            "linear_us": time_per_request(lambda r: linear_match(route_provider, r), requests, linear_repeat) * 1e6
+        })
+    return results
+
+
+def main():
+    print(f"{'routes':>8} {'trie (us/req)':>15} {'linear (us/req)':>17}")
+    for result in run():
+        print(f"{result['routes']:>8} {result['trie_us']:>15.2f} {result['linear_us']:>17.2f}")
+
+
+if __name__ == "__main__":
+    main()
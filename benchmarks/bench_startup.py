@@ -0,0 +1,64 @@
+import json
+import os
+import tempfile
+import timeit
+from dummy_api.routes import RoutesProvider
+
+# (routes, items per data group) of the generated routes files
+SIZES = [(100, 1000), (5000, 10000), (50000, 100000)]
+DATA_GROUP_COUNT = 10
+
+
+def build_routes_data(route_count: int, item_count: int) -> dict:
+    data_groups = []
+    for group in range(DATA_GROUP_COUNT):
+        data_groups.append({
+            "group_name": f"group_{group}",
+            "data": {"items": [{"id": i, "name": f"Item {i}", "tags": ["a", "b"]} for i in range(item_count)]}
+        })
+    routes = []
+    for i in range(route_count):
+        routes.append({
+            "path": f"/resource_{i}/{{id}}",
+            "name": f"resource_{i}",
+            "methods": ["GET", "POST"],
+            "data": {"reference": {"source": f"group_{i % DATA_GROUP_COUNT}", "find": "items[id={id}]"}}
+        })
+    return {"data_groups": data_groups, "routes": routes}
+
+
+def time_startup(file_path: str, repeat: int, **options) -> float:
+    return min(timeit.repeat(lambda: RoutesProvider(file_path, **options), number=1, repeat=repeat))
+
+
+def run(sizes: list = None) -> list:
+    results = []
+    for route_count, item_count in sizes or SIZES:
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "routes.json")
+            with open(file_path, "w") as f:
+                f.write(json.dumps(build_routes_data(route_count, item_count)))
+            repeat = 2 if route_count * item_count > 10 ** 8 else 5
+            compile_s = min(timeit.repeat(lambda: RoutesProvider.compile(file_path), number=1, repeat=1))
+            results.append({
+                "routes": route_count,
+                "items": item_count * DATA_GROUP_COUNT,
+                "file_mb": os.path.getsize(file_path) / 1e6,
+                "json_s": time_startup(file_path, repeat),
+                "artifact_s": time_startup(file_path, repeat, use_artifact=True),
+                "lazy_s": time_startup(file_path, repeat, lazy_data=True),
+                "compile_s": compile_s
+            })
+    return results
+
+
+def main():
+    print(f"{'routes':>8} {'items':>9} {'file (MB)':>10} {'json (s)':>10} {'artifact (s)':>13} {'lazy (s)':>10} "
+          f"{'compile (s)':>12}")
+    for result in run():
+        print(f"{result['routes']:>8} {result['items']:>9} {result['file_mb']:>10.1f} {result['json_s']:>10.3f} "
+              f"{result['artifact_s']:>13.3f} {result['lazy_s']:>10.3f} {result['compile_s']:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
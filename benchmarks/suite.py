@@ -0,0 +1,299 @@
+import argparse
+import functools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import timeit
+import typing
+from dummy_api.data import DataPathQuery
+from dummy_api.request import RouteRequest
+from dummy_api.route_matching import RouteMatcher
+from dummy_api.routes import RoutesProvider
+
+RESULTS_FORMAT_VERSION = 2
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+# shared CI machines easily vary by a third between runs, pass a lower --threshold on quiet ones
+DEFAULT_THRESHOLD = 0.5
+# cases that only got slower by less than this many microseconds are within the timer's noise, whatever the ratio
+DEFAULT_NOISE_FLOOR_US = 1.0
+# runs sharing fewer cases with the baseline are scaled by the calibration workload alone, see get_scale
+MIN_SCALED_CASES = 10
+MIN_RUN_TIME = 0.02
+REPEAT = 5
+# every case is timed once per round and the median round counts, so a burst of load on the machine only spoils
+# some rounds instead of the result. The best of very few runs swings by 2x between runs on shared machines.
+DEFAULT_ROUNDS = 15
+CHILD_LIST_LENGTH = 10
+SAMPLE_SIZE = 50
+
+
+class BenchmarkCase(typing.NamedTuple):
+    name: str
+    # build(**parameters) returns the callable to time, every call is one operation
+    build: callable
+    parameters: dict
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}[{','.join(f'{name}={value}' for name, value in self.parameters.items())}]"
+
+
+def get_parameter_names(parameter_count: int) -> typing.List[str]:
+    return [f"p{i}" for i in range(parameter_count)]
+
+
+def get_query_path(depth: int, parameter_count: int) -> str:
+    # depth levels of plain keys, then one list predicate per path parameter
+    keys = [f"level_{level}" for level in range(depth)]
+    lists = [
+        f"{'items' if i == 0 else 'children'}[id={{{name}}}]"
+        for i, name in enumerate(get_parameter_names(parameter_count))
+    ]
+    return ".".join(keys + lists)
+
+
+def build_list(length: int, remaining_lists: int) -> typing.List[dict]:
+    items = []
+    for i in range(length):
+        item = {"id": i, "value": f"Item {i}"}
+        if remaining_lists > 1:
+            item["children"] = build_list(CHILD_LIST_LENGTH, remaining_lists - 1)
+        items.append(item)
+    return items
+
+
+def build_group_data(list_length: int, depth: int, parameter_count: int) -> dict:
+    data = {"items": build_list(list_length, parameter_count)}
+    for level in reversed(range(depth)):
+        data = {f"level_{level}": data}
+    return data
+
+
+def build_routes_file_data(route_count: int, list_length: int, depth: int, parameter_count: int) -> dict:
+    # every route reads one item of the same group, through parameter_count nested list lookups
+    path_parameters = "/".join(f"{{{name}}}" for name in get_parameter_names(parameter_count))
+    return {
+        "data_groups": [{"group_name": "data", "data": build_group_data(list_length, depth, parameter_count)}],
+        "routes": [
+            {
+                "path": f"/resource_{i}/{path_parameters}",
+                "name": f"resource_{i}",
+                "methods": ["GET", "POST"],
+                "data": {"reference": {"source": "data", "find": get_query_path(depth, parameter_count)}}
+            }
+            for i in range(route_count)
+        ]
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def build_route_provider(route_count: int, list_length: int, depth: int, parameter_count: int) -> RoutesProvider:
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "routes.json")
+        with open(file_path, "w") as f:
+            f.write(json.dumps(build_routes_file_data(route_count, list_length, depth, parameter_count)))
+        return RoutesProvider(file_path)
+
+
+def get_sample_paths(route_count: int, list_length: int, parameter_count: int) -> typing.List[str]:
+    # spread over the routes, always the last items so unindexed lookups scan whole lists
+    ids = [list_length - 1] + [CHILD_LIST_LENGTH - 1] * (parameter_count - 1)
+    item_path = "/".join(str(item_id) for item_id in ids)
+    step = max(route_count // SAMPLE_SIZE, 1)
+    return [f"/resource_{i}/{item_path}" for i in range(0, route_count, step)]
+
+
+def get_sample_params(list_length: int, parameter_count: int) -> dict:
+    ids = [list_length - 1] + [CHILD_LIST_LENGTH - 1] * (parameter_count - 1)
+    return {name: str(item_id) for name, item_id in zip(get_parameter_names(parameter_count), ids)}
+
+
+def build_match(routes: int, params: int) -> typing.Tuple[callable, int]:
+    route_provider = build_route_provider(routes, CHILD_LIST_LENGTH, 0, params)
+    paths = get_sample_paths(routes, CHILD_LIST_LENGTH, params)
+    requests = [RouteRequest(path, request_method="GET") for path in paths]
+
+    def run():
+        for request in requests:
+            route_provider.match_route(request)
+    return run, len(requests)
+
+
+def build_pattern_match(params: int) -> typing.Tuple[callable, int]:
+    route_pattern = "/resource/" + "/".join(f"{{{name}}}" for name in get_parameter_names(params))
+    request_path = "/resource/" + "/".join(str(i) for i in range(params))
+    return lambda: RouteMatcher.does_request_path_match_route_pattern(request_path, route_pattern), 1
+
+
+def build_query_dict(items: int, depth: int, params: int) -> typing.Tuple[callable, int]:
+    data = build_group_data(items, depth, params)
+    query = DataPathQuery(get_query_path(depth, params))
+    sample_params = get_sample_params(items, params)
+    return lambda: query.query_dict(data, **sample_params), 1
+
+
+def build_update_dict(items: int, depth: int, params: int) -> typing.Tuple[callable, int]:
+    data = build_group_data(items, depth, params)
+    query = DataPathQuery(get_query_path(depth, params))
+    sample_params = get_sample_params(items, params)
+    update = {"id": int(sample_params[f"p{params - 1}"]), "value": "Updated"}
+    return lambda: query.update_dict(data, update, **sample_params), 1
+
+
+def build_route_get(items: int, depth: int, params: int) -> typing.Tuple[callable, int]:
+    route_provider = build_route_provider(1, items, depth, params)
+    path = get_sample_paths(1, items, params)[0]
+    return lambda: route_provider.get_route_response_data(path), 1
+
+
+def build_route_post(items: int, depth: int, params: int) -> typing.Tuple[callable, int]:
+    route_provider = build_route_provider(1, items, depth, params)
+    path = get_sample_paths(1, items, params)[0]
+    sample_params = get_sample_params(items, params)
+    body = {"payload": {"id": int(sample_params[f"p{params - 1}"]), "value": "Updated"}}
+    return lambda: route_provider.get_route_response_data(path, request_method="POST", request_body=body), 1
+
+
+def get_cases() -> typing.List[BenchmarkCase]:
+    cases = []
+    for routes in [10, 1000, 10000]:
+        for params in [1, 3]:
+            cases.append(BenchmarkCase("match", build_match, {"routes": routes, "params": params}))
+    for params in [1, 3, 6]:
+        cases.append(BenchmarkCase("pattern_match", build_pattern_match, {"params": params}))
+    for name, build in [("query_dict", build_query_dict), ("update_dict", build_update_dict),
+                        ("route_get", build_route_get), ("route_post", build_route_post)]:
+        for items in [100, 10000]:
+            for depth in [0, 4]:
+                for params in [1, 3]:
+                    cases.append(BenchmarkCase(name, build, {"items": items, "depth": depth, "params": params}))
+    return cases
+
+
+def get_loop_count(fn: callable) -> int:
+    # calls of fn that take at least MIN_RUN_TIME
+    timer = timeit.Timer(fn)
+    number = 1
+    while timer.timeit(number) < MIN_RUN_TIME:
+        number *= 2
+    return number
+
+
+def time_operation(fn: callable, operations: int, number: int = None) -> float:
+    # best of REPEAT runs of number calls each, in microseconds per operation
+    number = number or get_loop_count(fn)
+    return min(timeit.Timer(fn).repeat(repeat=REPEAT, number=number)) / number / operations * 1e6
+
+
+def calibrate() -> float:
+    # a fixed pure Python workload, so results from machines of different speeds can be compared
+    def workload():
+        total = 0
+        for i in range(1000):
+            total += {"id": i}.get("id")
+        return total
+    return time_operation(workload, 1)
+
+
+def run(name_filter: str = None, rounds: int = DEFAULT_ROUNDS) -> dict:
+    operations = {}
+    for case in get_cases():
+        if not name_filter or name_filter in case.key:
+            operations[case.key] = case.build(**case.parameters)
+    build_route_provider.cache_clear()
+    loop_counts = {key: get_loop_count(fn) for key, (fn, _) in operations.items()}
+
+    round_times = {key: [] for key in operations}
+    calibration_times = []
+    for _ in range(rounds):
+        for key, (fn, operation_count) in operations.items():
+            round_times[key].append(time_operation(fn, operation_count, loop_counts[key]))
+        calibration_times.append(calibrate())
+    return {
+        "version": RESULTS_FORMAT_VERSION,
+        "python": platform.python_version(),
+        "calibration_us": statistics.median(calibration_times),
+        "results": {key: statistics.median(times) for key, times in round_times.items()}
+    }
+
+
+def get_scale(results: dict, baseline: dict) -> float:
+    # how much faster the machine ran the baseline. The median ratio of many cases tracks that far better than the
+    # calibration workload, which a noisy moment skews by a third, but a regression in few cases would move it too.
+    ratios = [
+        baseline_us / results["results"][key] for key, baseline_us in baseline["results"].items()
+        if key in results["results"]
+    ]
+    if len(ratios) >= MIN_SCALED_CASES:
+        return statistics.median(ratios)
+    return baseline["calibration_us"] / results["calibration_us"]
+
+
+def compare(results: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD,
+            noise_floor_us: float = DEFAULT_NOISE_FLOOR_US) -> typing.List[dict]:
+    # times are scaled to the baseline's machine before comparing, returns every case both runs have
+    scale = get_scale(results, baseline)
+    comparisons = []
+    for key, time_us in results["results"].items():
+        baseline_us = baseline["results"].get(key)
+        if baseline_us is None:
+            continue
+        ratio = time_us * scale / baseline_us
+        regressed = ratio > 1 + threshold and time_us * scale - baseline_us > noise_floor_us
+        comparisons.append({"case": key, "baseline_us": baseline_us, "time_us": time_us, "ratio": ratio,
+                            "regressed": regressed})
+    return comparisons
+
+
+def load_results(path: str) -> dict:
+    with open(path, "r") as f:
+        return json.loads(f.read())
+
+
+def save_results(path: str, results: dict):
+    with open(path, "w") as f:
+        f.write(json.dumps(results, indent=4, sort_keys=True) + "\n")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Time dummy-api's hot paths and compare them against a baseline")
+    parser.add_argument("--output", "-o", help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="results to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="fail when a case is slower than the baseline by more than this fraction")
+    parser.add_argument("--noise-floor", type=float, default=DEFAULT_NOISE_FLOOR_US,
+                        help="ignore cases that got slower by fewer microseconds than this")
+    parser.add_argument("--update-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--filter", "-k", help="only run cases whose key contains this string")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help="times to run every case, the median counts")
+    args = parser.parse_args()
+
+    results = run(args.filter, args.rounds)
+    if args.output:
+        save_results(args.output, results)
+    if args.update_baseline:
+        save_results(args.baseline, results)
+        print(f"Stored {len(results['results'])} results as the baseline in {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        for key, time_us in results["results"].items():
+            print(f"{key:<52} {time_us:>12.2f} us")
+        return 0
+
+    comparisons = compare(results, load_results(args.baseline), args.threshold, args.noise_floor)
+    print(f"{'case':<52} {'baseline (us)':>14} {'now (us)':>12} {'ratio':>7}")
+    for comparison in comparisons:
+        print(f"{comparison['case']:<52} {comparison['baseline_us']:>14.2f} {comparison['time_us']:>12.2f} "
+              f"{comparison['ratio']:>7.2f}{'  REGRESSED' if comparison['regressed'] else ''}")
+    regressions = [comparison for comparison in comparisons if comparison["regressed"]]
+    if regressions:
+        print(f"{len(regressions)} case(s) regressed by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+from dummy_api.profiling import DEFAULT_SAMPLE_INTERVAL, PROFILE_MODE_CPROFILE
+from dummy_api.response import RouteResponse
+from dummy_api.routes import RoutesProvider
+from dummy_api.serialization import encode_json
+
+ADMIN_PATH_PREFIX = "/_admin/"
+
+
+class AdminHandler:
+    # Endpoints for operating a running server, served under /_admin/ by both dummy_api.api and dummy_api.asgi:
+    #
+    #   GET  /_admin/metrics                                      per route metrics, Prometheus text format
+    #   POST /_admin/profile/start?mode=cprofile&rate=0.1         profile a share of the requests from now on
+    #   POST /_admin/profile/stop
+    #   GET  /_admin/profile/status
+    #   GET  /_admin/profile                                      pstats file or collapsed stacks of the last run
+    #
+    # They are off unless enabled (DUMMY_API_ADMIN=1, see dummy_api.environment), until then every one of them is a
+    # 404: anyone reaching the server could otherwise read its metrics or slow it down with profiling.
+
+    def __init__(self, route_provider: RoutesProvider, enabled: bool = False):
+        self.route_provider = route_provider
+        self.enabled = enabled
+        self.endpoints = {
+            ("GET", "metrics"): self.get_metrics,
+            ("POST", "profile/start"): self.start_profile,
+            ("POST", "profile/stop"): self.stop_profile,
+            ("GET", "profile/status"): self.get_profile_status,
+            ("GET", "profile"): self.get_profile
+        }
+
+    def is_known_path(self, path: str) -> bool:
+        return any(endpoint_path == path for method, endpoint_path in self.endpoints)
+
+    def handle(self, path: str, method: str, query_parameters: dict = None) -> RouteResponse:
+        # path is relative to /_admin/
+        if not self.enabled:
+            return self.get_error_response(404, "Not Found")
+        path = path.strip("/")
+        endpoint = self.endpoints.get(("GET" if method == "HEAD" else method, path))
+        if endpoint is None:
+            if self.is_known_path(path):
+                return self.get_error_response(405, "Method Not Allowed")
+            return self.get_error_response(404, "Not Found")
+        try:
+            return endpoint(query_parameters or {})
+        except ValueError as e:
+            return self.get_error_response(400, str(e))
+
+    @staticmethod
+    def get_error_response(status: int, message: str) -> RouteResponse:
+        return RouteResponse(message.encode("utf-8"), status=status, content_type="text/plain")
+
+    def get_metrics(self, query_parameters: dict) -> RouteResponse:
+        return self.route_provider.render_metrics()
+
+    def start_profile(self, query_parameters: dict) -> RouteResponse:
+        self.route_provider.profiler.start(
+            mode=query_parameters.get("mode", PROFILE_MODE_CPROFILE),
+            sample_rate=float(query_parameters.get("rate", 1.0)),
+            interval=float(query_parameters.get("interval", DEFAULT_SAMPLE_INTERVAL))
+        )
+        return self.get_profile_status(query_parameters)
+
+    def stop_profile(self, query_parameters: dict) -> RouteResponse:
+        self.route_provider.profiler.stop()
+        return self.get_profile_status(query_parameters)
+
+    def get_profile_status(self, query_parameters: dict) -> RouteResponse:
+        return RouteResponse(encode_json(self.route_provider.profiler.get_status()))
+
+    def get_profile(self, query_parameters: dict) -> RouteResponse:
+        body, file_name = self.route_provider.profiler.get_results()
+        content_type = "application/octet-stream" if file_name.endswith(".pstats") else "text/plain"
+        return RouteResponse(
+            body,
+            headers={"Content-Disposition": f'attachment; filename="{file_name}"'},
+            content_type=content_type
+        )
@@ -0,0 +1,179 @@
+import collections.abc
+import typing
+from dummy_api import tracing
+from dummy_api.columnar import ColumnarList, ObjectColumn, StringColumn, is_number, numpy
+from dummy_api.indexes import get_sort_key
+from dummy_api.request import QueryParameterError
+from dummy_api.views import unwrap
+
+AGGREGATE_PARAMETER = "aggregate"
+GROUP_BY_PARAMETER = "group_by"
+FUNCTION_COUNT = "count"
+FUNCTION_SUM = "sum"
+FUNCTION_MIN = "min"
+FUNCTION_MAX = "max"
+FUNCTIONS = (FUNCTION_COUNT, FUNCTION_SUM, FUNCTION_MIN, FUNCTION_MAX)
+FIELD_SEPARATOR = ":"
+
+
+class AggregationError(QueryParameterError):
+    pass
+
+
+def aggregate_values(function: str, values: list) -> typing.Any:
+    # values are those of the items that have the field, nulls left out. Only numbers are summed, min and max
+    # follow the sort order (numbers before strings).
+    if function == FUNCTION_COUNT:
+        return len(values)
+    if function == FUNCTION_SUM:
+        return sum(value for value in values if is_number(value))
+    keyed_values = [(sort_key, value) for value in values for sort_key in [get_sort_key(value)] if sort_key is not None]
+    if not keyed_values:
+        return None
+    pick = min if function == FUNCTION_MIN else max
+    return pick(keyed_values, key=lambda keyed_value: keyed_value[0])[1]
+
+
+def get_group_sort_key(group_key: typing.Any) -> tuple:
+    # groups come out in the order of their values, the null group last
+    sort_key = get_sort_key(group_key)
+    return (1,) if sort_key is None else (0,) + sort_key
+
+
+class Aggregation(typing.NamedTuple):
+    # aggregate=count,sum:score,max:born&group_by=last_name turns a list result into
+    # {"count": ..., "sum_score": ..., "max_born": ...}, or one such object per distinct last_name (including it)
+    functions: tuple
+    group_by: typing.Optional[str]
+
+    @staticmethod
+    def get_result_name(function: str, field: typing.Optional[str]) -> str:
+        return function if field is None else f"{function}_{field}"
+
+    def apply(self, result: typing.Any) -> typing.Any:
+        if not isinstance(result, collections.abc.Sequence) or isinstance(result, (str, bytes)):
+            return result
+        items = unwrap(result)
+        if isinstance(items, ColumnarList):
+            aggregated = aggregate_columnar(items, self)
+            if aggregated is not None:
+                return aggregated
+        tracing.count(tracing.COUNTER_LIST_ITEMS_SCANNED, len(items))
+        if self.group_by is None:
+            return self.aggregate_items(items)
+        groups = {}
+        for item in items:
+            group_key = item.get(self.group_by) if isinstance(item, collections.abc.Mapping) else None
+            try:
+                groups.setdefault(group_key, []).append(item)
+            except TypeError:
+                # lists and objects can't be grouped by
+                continue
+        return self.build_group_rows({group_key: self.aggregate_items(group) for group_key, group in groups.items()})
+
+    def aggregate_items(self, items: typing.Sequence) -> dict:
+        row = {}
+        for function, field in self.functions:
+            if field is None:
+                row[self.get_result_name(function, field)] = len(items)
+                continue
+            values = [item.get(field) for item in items if isinstance(item, collections.abc.Mapping)]
+            row[self.get_result_name(function, field)] = aggregate_values(
+                function, [value for value in values if value is not None]
+            )
+        return row
+
+    def build_group_rows(self, group_rows: dict) -> typing.List[dict]:
+        return [
+            {self.group_by: group_key, **group_rows[group_key]}
+            for group_key in sorted(group_rows, key=get_group_sort_key)
+        ]
+
+
+def aggregate_column(function: str, column, group_index, group_count: int) -> typing.Optional[list]:
+    # one value per group, for the records that have a value in column
+    present = column.get_present()
+    indexes = group_index[present]
+    if function == FUNCTION_COUNT:
+        return numpy.bincount(indexes, minlength=group_count).tolist()
+    if function == FUNCTION_SUM:
+        if isinstance(column, StringColumn) or column.dtype not in ("int64", "float64"):
+            return [0] * group_count
+        sums = numpy.zeros(group_count, dtype=column.dtype)
+        numpy.add.at(sums, indexes, column.get_data()[present])
+        counts = numpy.bincount(indexes, minlength=group_count)
+        return [total.item() if count else 0 for total, count in zip(sums, counts)]
+
+    values = column.get_data()[present]
+    if isinstance(column, StringColumn):
+        # codes aren't in string order, sort by the rank of each code's string instead
+        ranks = numpy.zeros(len(column.strings) or 1, dtype=numpy.intp)
+        ranks[sorted(range(len(column.strings)), key=column.strings.__getitem__)] = numpy.arange(len(column.strings))
+        order = numpy.lexsort((ranks[values], indexes))
+    else:
+        order = numpy.lexsort((values, indexes))
+    counts = numpy.bincount(indexes, minlength=group_count)
+    starts = numpy.concatenate([[0], numpy.cumsum(counts)[:-1]])
+    picks = starts if function == FUNCTION_MIN else starts + counts - 1
+    return [
+        column.decode(values[order[pick]]) if count else None for pick, count in zip(picks.tolist(), counts.tolist())
+    ]
+
+
+def aggregate_columnar(table: ColumnarList, aggregation: Aggregation) -> typing.Any:
+    # Aggregation.apply over whole columns at once, None when a column involved can only be read record by record
+    fields = [field for function, field in aggregation.functions if field is not None]
+    if aggregation.group_by is not None:
+        fields.append(aggregation.group_by)
+    if any(isinstance(table.get_column(field), ObjectColumn) for field in fields):
+        return None
+
+    group_index = numpy.zeros(table.length, dtype=numpy.intp)
+    group_keys = [None]
+    group_column = None if aggregation.group_by is None else table.get_column(aggregation.group_by)
+    if group_column is not None:
+        present = group_column.get_present()
+        unique_values, inverse = numpy.unique(group_column.get_data()[present], return_inverse=True)
+        group_keys = [group_column.decode(value) for value in unique_values]
+        # records without the field form the null group, which comes last
+        group_index[:] = len(group_keys)
+        group_index[present] = inverse
+        if not present.all():
+            group_keys.append(None)
+    group_count = len(group_keys)
+
+    columns = {}
+    for function, field in aggregation.functions:
+        name = aggregation.get_result_name(function, field)
+        column = None if field is None else table.get_column(field)
+        if field is None:
+            columns[name] = (
+                [table.length] if group_column is None else numpy.bincount(group_index, minlength=group_count).tolist()
+            )
+        elif column is None:
+            columns[name] = [aggregate_values(function, [])] * group_count
+        else:
+            columns[name] = aggregate_column(function, column, group_index, group_count)
+
+    rows = [{name: values[group] for name, values in columns.items()} for group in range(group_count)]
+    if aggregation.group_by is None:
+        return rows[0]
+    return aggregation.build_group_rows(dict(zip(group_keys, rows)))
+
+
+def get_aggregation(query_params: dict) -> typing.Optional[Aggregation]:
+    aggregate = query_params.get(AGGREGATE_PARAMETER)
+    group_by = query_params.get(GROUP_BY_PARAMETER)
+    if aggregate is None and group_by is None:
+        return None
+    functions = []
+    for function_string in (aggregate or FUNCTION_COUNT).split(","):
+        function, separator, field = function_string.strip().partition(FIELD_SEPARATOR)
+        if function not in FUNCTIONS or (separator and not field) or (function != FUNCTION_COUNT and not field):
+            raise AggregationError(
+                f"Invalid aggregate '{function_string}', expected count, count:field, sum:field, min:field or max:field"
+            )
+        functions.append((function, field or None))
+    if group_by is not None and (not group_by or "," in group_by):
+        raise AggregationError(f"'{GROUP_BY_PARAMETER}' takes a single field")
+    return Aggregation(tuple(functions), group_by)
@@ -1,6 +1,15 @@
 from dummy_api.app import app
+from dummy_api.admin import AdminHandler
+from dummy_api.batch import BATCH_PATH, BatchHandler
 from dummy_api.routes import RoutesProvider
-from flask import request, jsonify
+from dummy_api.compression import ACCEPT_ENCODING_HEADER
+from dummy_api.etags import IF_NONE_MATCH_HEADER
+from dummy_api.tracing import TRACE_HEADER, is_trace_requested
+from dummy_api.environment import (
+    get_environment_data_store, get_environment_routes_options, is_environment_admin_enabled,
+    start_environment_routes_reloader
+)
+from flask import request, Response
 import os
 
 
@@ -9,18 +18,54 @@ def index():
 
 
 def setup_routes(routes_file_path: str):
-    route_provider = RoutesProvider(routes_file_path)
+    route_provider = RoutesProvider(
+        routes_file_path,
+        data_store=get_environment_data_store(),
+        **get_environment_routes_options()
+    )
+    start_environment_routes_reloader(route_provider)
 
     def api(path):
-        response = route_provider.get_route_response_data(
+        response = route_provider.get_route_response(
             path,
             query_parameters=request.args.to_dict(),
             request_method=request.method,
-            request_body=request.json if request.method in ["POST", "PUT"] else None
+            request_body=request.json if request.method in ["POST", "PUT"] else None,
+            trace=is_trace_requested(request.headers.get(TRACE_HEADER)),
+            if_none_match=request.headers.get(IF_NONE_MATCH_HEADER),
+            accept_encoding=request.headers.get(ACCEPT_ENCODING_HEADER)
+        )
+        return Response(
+            response.get_body(),
+            status=response.get_status(),
+            headers=response.get_headers(),
+            content_type=response.content_type
+        )
+
+    # the DUMMY_API_ADMIN app config setting takes precedence over the environment variable
+    admin_enabled = app.config.get("DUMMY_API_ADMIN", is_environment_admin_enabled())
+    admin_handler = AdminHandler(route_provider, enabled=admin_enabled)
+    batch_handler = BatchHandler(route_provider)
+
+    def batch():
+        response = batch_handler.handle(request.get_json(silent=True))
+        return Response(response.get_body(), status=response.get_status(), content_type=response.content_type)
+
+    def admin(path):
+        response = admin_handler.handle(path, request.method, request.args.to_dict())
+        return Response(
+            response.get_body(),
+            status=response.get_status(),
+            headers=response.get_headers(),
+            content_type=response.content_type
         )
-        return jsonify(response)
 
     index_route = app.route("/")
     index_route(index)
+    admin_route = app.route("/_admin/<path:path>", methods=["GET", "POST"])
+    admin_route(admin)
+    # matched before the catch-all route below, Flask prefers static paths
+    batch_route = app.route(f"/api/{BATCH_PATH}", methods=["POST"])
+    batch_route(batch)
     api_route = app.route("/api/<path:path>", methods=["GET", "POST", "PUT", "DELETE"])
     api_route(api)
@@ -0,0 +1,187 @@
+import asyncio
+import functools
+import json
+import typing
+import urllib.parse
+from dummy_api.admin import ADMIN_PATH_PREFIX, AdminHandler
+from dummy_api.batch import BATCH_PATH, BatchHandler
+from dummy_api.compression import ACCEPT_ENCODING_HEADER
+from dummy_api.etags import IF_NONE_MATCH_HEADER
+from dummy_api.routes import RoutesProvider
+from dummy_api.response import RouteResponse
+from dummy_api.tracing import TRACE_HEADER, is_trace_requested
+from dummy_api.environment import (
+    get_environment_data_store, get_environment_routes_options, is_environment_admin_enabled,
+    start_environment_routes_reloader
+)
+
+API_PATH_PREFIX = "/api/"
+API_METHODS = ["GET", "POST", "PUT", "DELETE"]
+BODY_METHODS = ["POST", "PUT"]
+RESPONSE_CHUNK_SIZE = 64 * 1024
+
+
+class AsgiApp:
+    # Serves the same "/" and "/api/<path>" routes as dummy_api.api.setup_routes, for running under an ASGI server
+    # (ie `uvicorn asgi:app`). Route handling blocks (it waits on group locks and can resolve large lists) and runs
+    # in the loop's default executor, all of the network I/O (body reads, response writes) is awaited on the loop, so
+    # neither slow clients nor slow requests hold up other connections. HEAD requests are answered like GETs, without
+    # the body.
+
+    def __init__(self, route_provider: RoutesProvider, admin_enabled: bool = False):
+        self.route_provider = route_provider
+        self.admin_handler = AdminHandler(route_provider, enabled=admin_enabled)
+        self.batch_handler = BatchHandler(route_provider)
+
+    async def __call__(self, scope: dict, receive: callable, send: callable):
+        if scope["type"] == "lifespan":
+            await self.handle_lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            raise ValueError(f"Unsupported ASGI scope type '{scope['type']}'")
+
+        path = scope["path"]
+        method = scope["method"]
+        if method == "HEAD":
+            await self(dict(scope, method="GET"), receive, functools.partial(self.send_without_body, send))
+            return
+        if path == "/" and method == "GET":
+            await self.send_response(send, RouteResponse(b"Welcome to dummy-api", content_type="text/html"))
+        elif path.startswith(ADMIN_PATH_PREFIX):
+            await self.send_response(send, await self.run_blocking(functools.partial(
+                self.admin_handler.handle,
+                path[len(ADMIN_PATH_PREFIX):],
+                method,
+                self.parse_query_string(scope.get("query_string", b""))
+            )))
+        elif path == API_PATH_PREFIX + BATCH_PATH and method == "POST":
+            await self.send_response(send, await self.handle_batch_request(receive))
+        elif path.startswith(API_PATH_PREFIX) and method in API_METHODS:
+            await self.send_response(send, await self.handle_api_request(scope, receive))
+        elif path == "/" or path.startswith(API_PATH_PREFIX):
+            await self.send_response(send, self.get_error_response(405, "Method Not Allowed"))
+        else:
+            await self.send_response(send, self.get_error_response(404, "Not Found"))
+
+    async def handle_lifespan(self, receive: callable, send: callable):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def handle_api_request(self, scope: dict, receive: callable) -> RouteResponse:
+        method = scope["method"]
+        request_body = None
+        if method in BODY_METHODS:
+            try:
+                request_body = self.parse_json_body(await self.read_body(receive))
+            except ValueError:
+                return self.get_error_response(400, "Bad Request")
+
+        return await self.run_blocking(functools.partial(
+            self.route_provider.get_route_response,
+            scope["path"][len(API_PATH_PREFIX):],
+            query_parameters=self.parse_query_string(scope.get("query_string", b"")),
+            request_method=method,
+            request_body=request_body,
+            trace=is_trace_requested(self.get_header(scope, TRACE_HEADER)),
+            if_none_match=self.get_header(scope, IF_NONE_MATCH_HEADER),
+            accept_encoding=self.get_header(scope, ACCEPT_ENCODING_HEADER)
+        ))
+
+    async def handle_batch_request(self, receive: callable) -> RouteResponse:
+        try:
+            request_body = self.parse_json_body(await self.read_body(receive))
+        except ValueError:
+            return self.get_error_response(400, "Bad Request")
+        return await self.run_blocking(functools.partial(self.batch_handler.handle, request_body))
+
+    @staticmethod
+    async def run_blocking(handle: typing.Callable[[], RouteResponse]) -> RouteResponse:
+        return await asyncio.get_running_loop().run_in_executor(None, handle)
+
+    @staticmethod
+    async def send_without_body(send: callable, message: dict):
+        # the headers (Content-Length included) are those of the GET
+        if message["type"] == "http.response.body":
+            if message.get("more_body", False):
+                return
+            message = {"type": "http.response.body", "body": b"", "more_body": False}
+        await send(message)
+
+    @staticmethod
+    def get_header(scope: dict, name: str) -> typing.Optional[str]:
+        name = name.lower().encode("latin-1")
+        for header_name, value in scope.get("headers", []):
+            if header_name == name:
+                return value.decode("latin-1")
+        return None
+
+    @staticmethod
+    async def read_body(receive: callable) -> bytes:
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                break
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        return b"".join(chunks)
+
+    @staticmethod
+    def parse_json_body(body: bytes) -> typing.Any:
+        if not body:
+            return None
+        return json.loads(body)
+
+    @staticmethod
+    def parse_query_string(query_string: bytes) -> dict:
+        # first value wins for repeated keys, like werkzeug's MultiDict.to_dict
+        query_parameters = {}
+        for key, value in urllib.parse.parse_qsl(query_string.decode("latin-1"), keep_blank_values=True):
+            query_parameters.setdefault(key, value)
+        return query_parameters
+
+    @staticmethod
+    def get_error_response(status: int, message: str) -> RouteResponse:
+        return RouteResponse(message.encode("utf-8"), status=status, content_type="text/plain")
+
+    @staticmethod
+    def get_response_headers(response: RouteResponse) -> typing.List[typing.Tuple[bytes, bytes]]:
+        headers = [
+            (b"content-type", response.content_type.encode("latin-1")),
+            (b"content-length", str(len(response.get_body())).encode("latin-1"))
+        ]
+        for name, value in response.get_headers().items():
+            headers.append((name.lower().encode("latin-1"), str(value).encode("latin-1")))
+        return headers
+
+    async def send_response(self, send: callable, response: RouteResponse):
+        await send({
+            "type": "http.response.start",
+            "status": response.get_status(),
+            "headers": self.get_response_headers(response)
+        })
+        body = response.get_body()
+        # large bodies go out in chunks so the server can apply backpressure per write
+        for offset in range(0, max(len(body), 1), RESPONSE_CHUNK_SIZE):
+            chunk = body[offset:offset + RESPONSE_CHUNK_SIZE]
+            await send({
+                "type": "http.response.body",
+                "body": chunk,
+                "more_body": offset + RESPONSE_CHUNK_SIZE < len(body)
+            })
+
+
+def create_app(routes_file_path: str) -> AsgiApp:
+    route_provider = RoutesProvider(
+        routes_file_path,
+        data_store=get_environment_data_store(),
+        **get_environment_routes_options()
+    )
+    start_environment_routes_reloader(route_provider)
+    return AsgiApp(route_provider, admin_enabled=is_environment_admin_enabled())
@@ -0,0 +1,91 @@
+import threading
+import typing
+from dummy_api.columnar import convert_columnar_lists
+from dummy_api.indexes import DataGroupIndexes
+from dummy_api.query_plan import QueryPlan
+
+
+class InMemoryBackend:
+    # Default MutableDataStore backend: data groups live in this process only.
+
+    # whether this process seeds and reseeds the groups, rather than a store server (see SharedStoreBackend)
+    owns_groups = True
+
+    def __init__(self):
+        self.data_groups = {}
+        # groups that are only decoded on first access (see dummy_api.lazy_loading)
+        self.group_loaders = {}
+        self.group_loaders_lock = threading.Lock()
+        # list paths of each group stored as ColumnarLists
+        self.columnar_paths = {}
+        # called with a group's name when its data was replaced behind the data store's back (see SharedStoreBackend)
+        self.group_replaced_listener = None
+
+    def get_group(self, name: str) -> typing.Any:
+        if name in self.group_loaders:
+            return self.load_group(name)
+        return self.data_groups.get(name)
+
+    def load_group(self, name: str) -> typing.Any:
+        # readers of a group share its lock, so the first ones to get here may race to load it
+        with self.group_loaders_lock:
+            loader = self.group_loaders.get(name)
+            if loader is not None:
+                self.data_groups[name] = self.make_columnar(name, loader())
+                del self.group_loaders[name]
+            return self.data_groups.get(name)
+
+    def has_group(self, name: str) -> bool:
+        return name in self.data_groups or name in self.group_loaders
+
+    def set_group(self, name: str, data: typing.Any):
+        self.group_loaders.pop(name, None)
+        self.data_groups[name] = self.make_columnar(name, data)
+
+    def seed_group(self, name: str, data: typing.Any) -> bool:
+        if self.has_group(name):
+            return False
+        self.data_groups[name] = self.make_columnar(name, data)
+        return True
+
+    def make_columnar(self, name: str, data: typing.Any) -> typing.Any:
+        list_paths = self.columnar_paths.get(name)
+        return convert_columnar_lists(data, list_paths) if list_paths else data
+
+    def set_columnar_paths(self, name: str, list_paths: typing.List[tuple]) -> bool:
+        # True when group data already in memory was converted
+        known_paths = self.columnar_paths.setdefault(name, [])
+        new_paths = [list_path for list_path in list_paths if list_path not in known_paths]
+        known_paths.extend(new_paths)
+        if not new_paths or self.data_groups.get(name) is None:
+            return False
+        convert_columnar_lists(self.data_groups[name], new_paths)
+        return True
+
+    def seed_group_loader(self, name: str, loader: callable) -> bool:
+        if self.has_group(name):
+            return False
+        self.group_loaders[name] = loader
+        return True
+
+    def delete_group(self, name: str):
+        if self.group_loaders.pop(name, None) is None or name in self.data_groups:
+            del self.data_groups[name]
+
+    def update_group(self, name: str, query_plan: QueryPlan, update_data: typing.Any, params: dict,
+                     indexes: DataGroupIndexes = None) -> typing.Any:
+        return query_plan.update(self.get_group(name), update_data, params, indexes)
+
+    def append_group_items(self, name: str, query_plan: QueryPlan, items: list, params: dict,
+                           indexes: DataGroupIndexes = None) -> typing.Any:
+        return query_plan.append_items(self.get_group(name), items, params, indexes)
+
+    def has_remote_changes(self, name: str) -> bool:
+        return False
+
+    def discard_pending_mutations(self) -> int:
+        # recovered mutations are only kept by backends that own a mutation log themselves
+        return 0
+
+    def pull_remote_changes(self, name: str, indexes: DataGroupIndexes = None) -> typing.List[tuple]:
+        return []
@@ -0,0 +1,127 @@
+import concurrent.futures
+import itertools
+import threading
+import typing
+from dummy_api.response import RouteResponse
+from dummy_api.routes import RoutesProvider
+from dummy_api.serialization import JSON_MIMETYPE, encode_json
+
+BATCH_PATH = "_batch"
+MAX_BATCH_SIZE = 1000
+DEFAULT_BATCH_WORKERS = 4
+READ_ONLY_METHODS = frozenset(["GET"])
+SUB_REQUEST_METHODS = frozenset(["GET", "POST", "PUT", "DELETE"])
+
+
+class BatchError(ValueError):
+    pass
+
+
+class SubRequest(typing.NamedTuple):
+    # one entry of a batch: {"path": "friends/1", "method": "GET", "query": {...}, "body": {...}}, paths relative
+    # to /api/ and bodies as they would be sent on their own (ie {"payload": ...})
+    path: str
+    method: str
+    query_parameters: dict
+    request_body: typing.Optional[dict]
+
+    @staticmethod
+    def from_dict(position: int, entry: typing.Any) -> "SubRequest":
+        if not isinstance(entry, dict) or not isinstance(entry.get("path"), str):
+            raise BatchError(f"Sub-request {position} needs a path")
+        method = str(entry.get("method", "GET")).upper()
+        if method not in SUB_REQUEST_METHODS:
+            raise BatchError(f"Sub-request {position} has an unsupported method '{method}'")
+        query_parameters = entry.get("query") or {}
+        if not isinstance(query_parameters, dict):
+            raise BatchError(f"Sub-request {position} needs its query as an object")
+        path = entry["path"]
+        path = path[len("/api/"):] if path.startswith("/api/") else path
+        return SubRequest(
+            path,
+            method,
+            {name: str(value) for name, value in query_parameters.items()},
+            entry.get("body")
+        )
+
+    def is_read_only(self) -> bool:
+        return self.method in READ_ONLY_METHODS
+
+
+def parse_batch(request_body: typing.Any) -> typing.Tuple[typing.List[SubRequest], bool]:
+    # either a list of sub-requests or {"requests": [...], "parallel": true}
+    parallel = False
+    entries = request_body
+    if isinstance(request_body, dict):
+        entries = request_body.get("requests")
+        parallel = bool(request_body.get("parallel", False))
+    if not isinstance(entries, list):
+        raise BatchError("Expected a list of sub-requests")
+    if len(entries) > MAX_BATCH_SIZE:
+        raise BatchError(f"Batches are limited to {MAX_BATCH_SIZE} sub-requests")
+    return [SubRequest.from_dict(position, entry) for position, entry in enumerate(entries)], parallel
+
+
+class BatchHandler:
+    # POST /api/_batch runs many sub-requests in one round trip and answers with their results in order:
+    # [{"status": 200, "headers": {...}, "body": ...}, ...]. Sub-requests go through the same rendering as requests of
+    # their own (response cache, metrics), and one failing doesn't stop the ones after it. With "parallel": true runs
+    # of consecutive reads are spread over a thread pool, writes still wait for everything before them and hold up
+    # everything after them, so every sub-request sees the same data it would if they were sent one by one.
+
+    def __init__(self, route_provider: RoutesProvider, max_workers: int = DEFAULT_BATCH_WORKERS):
+        self.route_provider = route_provider
+        self.max_workers = max_workers
+        self.executor = None
+        self.executor_lock = threading.Lock()
+
+    def get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        if self.executor is None:
+            with self.executor_lock:
+                if self.executor is None:
+                    self.executor = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="dummy-api-batch"
+                    )
+        return self.executor
+
+    def handle(self, request_body: typing.Any) -> RouteResponse:
+        try:
+            sub_requests, parallel = parse_batch(request_body)
+        except BatchError as e:
+            return RouteResponse(encode_json({"error": True, "message": str(e)}), status=400)
+        responses = self.run_parallel(sub_requests) if parallel else [self.run(request) for request in sub_requests]
+        # sub-request bodies are JSON already and go into the batch's body as they are
+        return RouteResponse(b"[" + b",".join(self.encode_sub_response(response) for response in responses) + b"]")
+
+    def run_parallel(self, sub_requests: typing.List[SubRequest]) -> typing.List[RouteResponse]:
+        responses = []
+        for is_read_only, run in itertools.groupby(sub_requests, key=SubRequest.is_read_only):
+            run = list(run)
+            if is_read_only and len(run) > 1:
+                responses.extend(self.get_executor().map(self.run, run))
+            else:
+                responses.extend(self.run(request) for request in run)
+        return responses
+
+    def run(self, sub_request: SubRequest) -> RouteResponse:
+        try:
+            return self.route_provider.get_route_response(
+                sub_request.path,
+                request_method=sub_request.method,
+                query_parameters=sub_request.query_parameters,
+                request_body=sub_request.request_body
+            )
+        except Exception as e:
+            return RouteResponse(encode_json({"error": True, "message": str(e)}), status=500)
+
+    @staticmethod
+    def encode_sub_response(response: RouteResponse) -> bytes:
+        body = response.get_body()
+        if response.content_type != JSON_MIMETYPE:
+            body = encode_json(body.decode("utf-8"))
+        return b"".join([
+            b'{"status":', str(response.get_status()).encode("ascii"),
+            b',"headers":', encode_json(response.get_headers()),
+            b',"body":', body or b"null",
+            b"}"
+        ])
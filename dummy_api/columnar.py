@@ -0,0 +1,442 @@
+import collections.abc
+import datetime
+import re
+import typing
+
+try:
+    import numpy
+except ImportError:  # optional, without it columnar lists stay lists of dicts
+    numpy = None
+
+DATE_REGEX = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+INITIAL_CAPACITY = 16
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+MISSING = object()
+
+
+def is_columnar_available() -> bool:
+    return numpy is not None
+
+
+def is_number(value: typing.Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def is_date(value: typing.Any) -> bool:
+    if value.__class__ is not str or not DATE_REGEX.match(value):
+        return False
+    try:
+        datetime.date.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
+
+
+class ObjectColumn:
+    # values of any type in a plain list, for fields the typed columns can't hold (mixed types, nulls, nesting)
+
+    def __init__(self, values: list):
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def has(self, position: int) -> bool:
+        return self.values[position] is not MISSING
+
+    def get(self, position: int) -> typing.Any:
+        return self.values[position]
+
+    def get_values(self) -> list:
+        return list(self.values)
+
+    def set(self, position: int, value: typing.Any) -> bool:
+        self.values[position] = value
+        return True
+
+    def append(self, value: typing.Any) -> bool:
+        self.values.append(value)
+        return True
+
+    def take(self, positions: typing.Sequence[int]) -> "ObjectColumn":
+        return ObjectColumn([self.values[position] for position in positions])
+
+    def get_equal_mask(self, values: tuple) -> None:
+        return None
+
+    def get_compare_mask(self, compare: typing.Callable, bound: typing.Any) -> None:
+        return None
+
+
+class ArrayColumn:
+    # Values encoded into a growable numpy array, plus a mask of the positions that have a value at all
+    dtype = None
+
+    def __init__(self, data, present, length: int):
+        self.data = data
+        self.present = present
+        self.length = length
+
+    # stored at positions without a value
+    fill_value = 0
+
+    @classmethod
+    def from_values(cls, values: list) -> "ArrayColumn":
+        capacity = max(INITIAL_CAPACITY, len(values))
+        column = cls(numpy.zeros(capacity, dtype=cls.dtype), numpy.zeros(capacity, dtype=bool), len(values))
+        column.data[:len(values)] = [
+            column.fill_value if value is MISSING else column.encode(value) for value in values
+        ]
+        column.present[:len(values)] = [value is not MISSING for value in values]
+        return column
+
+    @staticmethod
+    def accepts(value: typing.Any) -> bool:
+        raise NotImplementedError
+
+    def encode(self, value: typing.Any) -> typing.Any:
+        return value
+
+    def decode(self, stored: typing.Any) -> typing.Any:
+        return stored.item()
+
+    def get_comparable(self, value: typing.Any) -> typing.Any:
+        # value as stored, for comparisons against the array, MISSING when no stored value can equal it
+        return self.encode(value) if self.accepts(value) else MISSING
+
+    def __len__(self) -> int:
+        return self.length
+
+    def has(self, position: int) -> bool:
+        return bool(self.present[position])
+
+    def get(self, position: int) -> typing.Any:
+        if not self.present[position]:
+            return MISSING
+        return self.decode(self.data[position])
+
+    def get_values(self) -> list:
+        return [self.get(position) for position in range(self.length)]
+
+    def get_present(self):
+        return self.present[:self.length]
+
+    def get_data(self):
+        return self.data[:self.length]
+
+    def set(self, position: int, value: typing.Any) -> bool:
+        if value is MISSING:
+            self.present[position] = False
+            return True
+        if not self.accepts(value):
+            return False
+        self.data[position] = self.encode(value)
+        self.present[position] = True
+        return True
+
+    def append(self, value: typing.Any) -> bool:
+        if value is not MISSING and not self.accepts(value):
+            return False
+        if self.length == len(self.data):
+            # doubling keeps appends amortized O(1)
+            self.data = numpy.concatenate([self.data, numpy.zeros(len(self.data), dtype=self.dtype)])
+            self.present = numpy.concatenate([self.present, numpy.zeros(len(self.present), dtype=bool)])
+        self.length += 1
+        return self.set(self.length - 1, value)
+
+    def take(self, positions) -> "ArrayColumn":
+        return self.__class__(self.get_data()[positions], self.get_present()[positions], len(positions))
+
+    def get_equal_mask(self, values: tuple):
+        comparables = [comparable for comparable in map(self.get_comparable, values) if comparable is not MISSING]
+        return numpy.isin(self.get_data(), comparables) & self.get_present()
+
+    def get_compare_mask(self, compare: typing.Callable, bound: typing.Any):
+        if not is_number(bound):
+            # numbers never compare with other types, so nothing matches
+            return numpy.zeros(self.length, dtype=bool)
+        return compare(self.get_data(), bound) & self.get_present()
+
+
+class IntColumn(ArrayColumn):
+    dtype = "int64"
+
+    @staticmethod
+    def accepts(value: typing.Any) -> bool:
+        return value.__class__ is int and INT64_MIN <= value <= INT64_MAX
+
+    def get_comparable(self, value: typing.Any) -> typing.Any:
+        return value if is_number(value) else MISSING
+
+
+class FloatColumn(ArrayColumn):
+    dtype = "float64"
+
+    @staticmethod
+    def accepts(value: typing.Any) -> bool:
+        return value.__class__ is float
+
+    def get_comparable(self, value: typing.Any) -> typing.Any:
+        return value if is_number(value) else MISSING
+
+
+class DateColumn(ArrayColumn):
+    # ISO dates, read back as the same strings
+    dtype = "datetime64[D]"
+    fill_value = "1970-01-01"
+
+    @staticmethod
+    def accepts(value: typing.Any) -> bool:
+        return is_date(value)
+
+    def encode(self, value: typing.Any) -> typing.Any:
+        return numpy.datetime64(value, "D")
+
+    def decode(self, stored: typing.Any) -> typing.Any:
+        return str(stored)
+
+    def get_compare_mask(self, compare: typing.Callable, bound: typing.Any):
+        if isinstance(bound, str) and not is_date(bound):
+            # strings compare as strings, which only the generic check does
+            return None
+        if not isinstance(bound, str):
+            return numpy.zeros(self.length, dtype=bool)
+        return compare(self.get_data(), self.encode(bound)) & self.get_present()
+
+
+class StringColumn(ArrayColumn):
+    # Dictionary encoded: every distinct string is kept once, the array holds each position's code. Columns taken
+    # from one another share the dictionary, which only ever grows.
+    dtype = "int32"
+
+    def __init__(self, data, present, length: int, strings: list = None, codes: dict = None):
+        super().__init__(data, present, length)
+        self.strings = [] if strings is None else strings
+        self.codes = {} if codes is None else codes
+
+    @staticmethod
+    def accepts(value: typing.Any) -> bool:
+        return value.__class__ is str
+
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.strings)
+            self.strings.append(value)
+        return code
+
+    def decode(self, stored: typing.Any) -> str:
+        return self.strings[stored]
+
+    def get_comparable(self, value: typing.Any) -> typing.Any:
+        return self.codes.get(value, MISSING) if isinstance(value, str) else MISSING
+
+    def take(self, positions) -> "StringColumn":
+        return StringColumn(
+            self.get_data()[positions], self.get_present()[positions], len(positions), self.strings, self.codes
+        )
+
+    def get_string_mask(self, string_matches: typing.Callable[[str], bool]):
+        # the check runs once per distinct string, rows pick their result up by code
+        code_matches = numpy.array([string_matches(string) for string in self.strings] or [False], dtype=bool)
+        return code_matches[self.get_data()] & self.get_present()
+
+    def get_compare_mask(self, compare: typing.Callable, bound: typing.Any):
+        if not isinstance(bound, str):
+            return numpy.zeros(self.length, dtype=bool)
+        return self.get_string_mask(lambda string: compare(string, bound))
+
+
+COLUMN_TYPES = (IntColumn, FloatColumn, DateColumn, StringColumn)
+
+
+def build_column(values: list) -> typing.Union[ArrayColumn, ObjectColumn]:
+    # the first typed column every value fits in, dates before strings
+    present_values = [value for value in values if value is not MISSING]
+    for column_type in COLUMN_TYPES:
+        if present_values and all(column_type.accepts(value) for value in present_values):
+            return column_type.from_values(values)
+    return ObjectColumn(values)
+
+
+class ColumnarRow(collections.abc.MutableMapping):
+    # One record of a ColumnarList, reads and writes go straight to its columns
+    __slots__ = ("table", "position")
+
+    def __init__(self, table: "ColumnarList", position: int):
+        self.table = table
+        self.position = position
+
+    def __getitem__(self, field: str) -> typing.Any:
+        value = self.table.get_value(self.position, field)
+        if value is MISSING:
+            raise KeyError(field)
+        return value
+
+    def get(self, field: str, default: typing.Any = None) -> typing.Any:
+        value = self.table.get_value(self.position, field)
+        return default if value is MISSING else value
+
+    def __contains__(self, field: typing.Any) -> bool:
+        column = self.table.columns.get(field)
+        return column is not None and column.has(self.position)
+
+    def __setitem__(self, field: str, value: typing.Any):
+        self.table.set_value(self.position, field, value)
+
+    def __delitem__(self, field: str):
+        if field not in self:
+            raise KeyError(field)
+        self.table.set_value(self.position, field, MISSING)
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter([field for field, column in self.table.columns.items() if column.has(self.position)])
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({dict(self)!r})"
+
+
+class ColumnarList(collections.abc.MutableSequence):
+    # A list of records stored as one column per field (see build_column), which takes far less memory than a list
+    # of dicts and lets filters and aggregations run over whole columns at once. It reads and appends like the list
+    # it replaces, items are ColumnarRows. Only records (mappings) can be stored.
+
+    def __init__(self, columns: dict, length: int):
+        self.columns = columns
+        self.length = length
+
+    @classmethod
+    def from_records(cls, records: typing.Sequence) -> typing.Optional["ColumnarList"]:
+        # None when some item isn't a record
+        if numpy is None or not all(record.__class__ is dict for record in records):
+            return None
+        fields = dict.fromkeys(field for record in records for field in record)
+        return cls({field: build_column([record.get(field, MISSING) for record in records]) for field in fields},
+                   len(records))
+
+    def get_value(self, position: int, field: str) -> typing.Any:
+        column = self.columns.get(field)
+        return MISSING if column is None else column.get(position)
+
+    def set_value(self, position: int, field: str, value: typing.Any):
+        column = self.columns.get(field)
+        if column is not None and column.set(position, value):
+            return
+        if column is None and value is MISSING:
+            return
+        # the value doesn't fit the field's column, which is rebuilt as one it does fit in
+        values = [MISSING] * self.length if column is None else column.get_values()
+        values[position] = value
+        self.columns[field] = build_column(values)
+
+    def get_column(self, field: str) -> typing.Optional[typing.Union[ArrayColumn, ObjectColumn]]:
+        return self.columns.get(field)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index) -> typing.Any:
+        if isinstance(index, slice):
+            return [ColumnarRow(self, position) for position in range(*index.indices(self.length))]
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("list index out of range")
+        return ColumnarRow(self, index)
+
+    def __iter__(self) -> typing.Iterator[ColumnarRow]:
+        return (ColumnarRow(self, position) for position in range(self.length))
+
+    def __setitem__(self, index: int, record: typing.Mapping):
+        row = self[index]
+        if not isinstance(record, collections.abc.Mapping):
+            raise ValueError("Columnar lists can only hold objects")
+        for field in list(self.columns):
+            self.set_value(row.position, field, record.get(field, MISSING))
+        for field in record:
+            if field not in self.columns:
+                self.set_value(row.position, field, record[field])
+
+    def append(self, record: typing.Mapping):
+        if not isinstance(record, collections.abc.Mapping):
+            raise ValueError("Columnar lists can only hold objects")
+        for field, column in list(self.columns.items()):
+            value = record.get(field, MISSING)
+            if not column.append(value):
+                self.columns[field] = build_column(column.get_values() + [value])
+        self.length += 1
+        for field in record:
+            if field not in self.columns:
+                self.columns[field] = build_column([MISSING] * (self.length - 1) + [record[field]])
+
+    def insert(self, index: int, record: typing.Mapping):
+        if index >= self.length:
+            self.append(record)
+            return
+        records = self.to_records()
+        records.insert(index, record)
+        self.replace_records(records)
+
+    def __delitem__(self, index):
+        records = self.to_records()
+        del records[index]
+        self.replace_records(records)
+
+    def replace_records(self, records: list):
+        replacement = ColumnarList.from_records([dict(record) for record in records])
+        if replacement is None:
+            raise ValueError("Columnar lists can only hold objects")
+        self.columns, self.length = replacement.columns, replacement.length
+
+    def take(self, positions) -> "ColumnarList":
+        # a new columnar list of the records at positions (a numpy array), in that order
+        return ColumnarList({field: column.take(positions) for field, column in self.columns.items()}, len(positions))
+
+    def to_records(self) -> typing.List[dict]:
+        return [dict(row) for row in self]
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, collections.abc.Sequence) or len(other) != self.length:
+            return False
+        return all(row == other_item for row, other_item in zip(self, other))
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.length} records, fields={list(self.columns)!r})"
+
+
+def select_records(table: ColumnarList, conditions: typing.Iterable[tuple]) -> typing.Optional[ColumnarList]:
+    # The records meeting every (field, values, compare) condition, compare being None for equality with any of
+    # values, checked a whole column at a time. None when some column can only be checked record by record.
+    mask = numpy.ones(table.length, dtype=bool)
+    for field, values, compare in conditions:
+        column = table.get_column(field)
+        if column is None:
+            # no record has the field
+            return table.take(numpy.zeros(0, dtype=numpy.intp))
+        column_mask = column.get_equal_mask(values) if compare is None else column.get_compare_mask(compare, values[0])
+        if column_mask is None:
+            return None
+        mask &= column_mask
+    return table.take(numpy.flatnonzero(mask))
+
+
+def convert_columnar_lists(data: typing.Any, list_paths: typing.Iterable[tuple]) -> typing.Any:
+    # replaces the lists of records at list_paths of a data group with ColumnarLists, in place
+    for list_path in list_paths:
+        parent = data
+        for key in list_path[:-1]:
+            parent = parent.get(key) if isinstance(parent, dict) else None
+        if not isinstance(parent, dict) or not list_path:
+            continue
+        records = parent.get(list_path[-1])
+        if records.__class__ is list:
+            columnar_list = ColumnarList.from_records(records)
+            if columnar_list is not None:
+                parent[list_path[-1]] = columnar_list
+    return data
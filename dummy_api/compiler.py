@@ -0,0 +1,281 @@
+import argparse
+import contextlib
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import stat
+import struct
+import tempfile
+import typing
+from dummy_api.lazy_loading import paused_garbage_collection
+from dummy_api.query_plan import QueryPlan, compile_query_path
+from dummy_api.route_matching import RouteTrie
+from dummy_api.validators import RoutesFileValidator
+
+ARTIFACT_FORMAT_VERSION = 5
+ARTIFACT_SUFFIX = ".compiled"
+ARTIFACT_MAGIC = b"DUMMYAPI"
+# magic, format version, then the source fingerprint: size, mtime_ns and the raw sha256 digest
+HEADER_FORMAT = "<8sIQq32s"
+HASH_CHUNK_SIZE = 1024 * 1024
+OFFSET_FORMAT = "<Q"
+DEFAULT_ROUTE_PATTERN = "/**"
+
+
+class RouteSpec(typing.NamedTuple):
+    # everything RoutesProvider needs to build a Route, without the objects bound to a data store
+    path: str
+    name: str
+    methods: typing.List[str]
+    group_name: str
+    query_path: str
+    default: typing.Any
+    index_targets: typing.List[tuple]
+    sorted_index_targets: typing.List[tuple] = ()
+    # list paths stored as dummy_api.columnar.ColumnarLists, "columnar": true on a route
+    columnar_targets: typing.List[tuple] = ()
+
+
+class SourceFingerprint(typing.NamedTuple):
+    size: int
+    mtime_ns: int
+    sha256: str
+
+
+class CompiledRouteTable(typing.NamedTuple):
+    fingerprint: SourceFingerprint
+    raw_route_data: dict
+    route_specs: typing.List[RouteSpec]
+    # entries are positions in route_specs, the default route comes last
+    route_trie: RouteTrie
+    # (offset, length) of every data group's pickle in the artifact
+    group_spans: dict
+
+
+class RouteTableArtifact:
+    # A compiled routes file: a fixed size header, one pickle per data group, the route table pickle and the route
+    # table's offset. Opening it only loads the route table, data groups are unpickled when they are first read, like
+    # dummy_api.lazy_loading.RoutesFileIndex does for the routes file itself.
+
+    def __init__(self, artifact_path: str, route_table: CompiledRouteTable, buffer: mmap.mmap):
+        # buffer maps the file the route table was read from (or written to), which may have been replaced since
+        self.artifact_path = artifact_path
+        self.route_table = route_table
+        self.buffer = buffer
+
+    def get_group_names(self) -> typing.List[str]:
+        return list(self.route_table.group_spans)
+
+    def load_group(self, group_name: str) -> typing.Any:
+        offset, length = self.route_table.group_spans[group_name]
+        with paused_garbage_collection():
+            return pickle.loads(self.buffer[offset:offset + length])
+
+    def get_group_loader(self, group_name: str) -> callable:
+        return lambda: self.load_group(group_name)
+
+    def close(self):
+        self.buffer.close()
+
+
+def get_filter_index_targets(query_plan: QueryPlan, fields: typing.List[str]) -> typing.List[tuple]:
+    # "indexes": ["last_name"] (hash indexes) or "sorted_indexes": ["born"] on a route whose result is a list found
+    # through literal keys index the list for filtering and sorting (see dummy_api.filtering and dummy_api.sorting)
+    list_path = query_plan.get_result_path({}) if not query_plan.parameter_names else None
+    return [] if not list_path else [(list_path, field) for field in fields]
+
+
+def get_columnar_targets(query_plan: QueryPlan) -> typing.List[tuple]:
+    list_path = query_plan.get_result_path({}) if not query_plan.parameter_names else None
+    return [list_path] if list_path else []
+
+
+def get_route_spec(route_config_entry: dict) -> RouteSpec:
+    name = route_config_entry.get("name")
+    route_data = route_config_entry.get("data")
+    query_path = route_data.get("reference", {}).get("find", "")
+    query_plan = compile_query_path(query_path)
+    return RouteSpec(
+        route_config_entry.get("path"),
+        name,
+        route_config_entry.get("methods", ["GET"]),
+        route_data.get("reference", {}).get("source", name),
+        query_path,
+        route_config_entry.get("default"),
+        query_plan.get_index_targets() + get_filter_index_targets(query_plan, route_config_entry.get("indexes", [])),
+        get_filter_index_targets(query_plan, route_config_entry.get("sorted_indexes", [])),
+        get_columnar_targets(query_plan) if route_config_entry.get("columnar") else []
+    )
+
+
+def get_route_specs(raw_route_data: dict) -> typing.List[RouteSpec]:
+    return [get_route_spec(route_config_entry) for route_config_entry in raw_route_data.get("routes", [])]
+
+
+def build_route_spec_trie(route_specs: typing.List[RouteSpec]) -> RouteTrie:
+    route_trie = RouteTrie()
+    for position, route_spec in enumerate(route_specs):
+        route_trie.add(route_spec.path, position)
+    route_trie.add(DEFAULT_ROUTE_PATTERN, len(route_specs))
+    return route_trie
+
+
+def get_artifact_path(file_path: str) -> str:
+    return file_path + ARTIFACT_SUFFIX
+
+
+def get_source_fingerprint(file_path: str) -> SourceFingerprint:
+    file_stat = os.stat(file_path)
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return SourceFingerprint(file_stat.st_size, file_stat.st_mtime_ns, digest.hexdigest())
+
+
+def write_artifact(artifact_path: str, fingerprint: SourceFingerprint, raw_route_data: dict,
+                   route_specs: typing.List[RouteSpec]) -> RouteTableArtifact:
+    # Every compile writes a temporary file of its own and moves it into place, so workers compiling the same stale
+    # artifact at once never write into each other's files. The last move wins, and each worker serves from the file
+    # it wrote either way.
+    file_descriptor, temporary_path = tempfile.mkstemp(
+        prefix=os.path.basename(artifact_path) + ".",
+        suffix=".tmp",
+        dir=os.path.dirname(os.path.abspath(artifact_path))
+    )
+    try:
+        route_table, buffer = write_artifact_file(file_descriptor, fingerprint, raw_route_data, route_specs)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+    try:
+        os.replace(temporary_path, artifact_path)
+    except OSError:
+        # another compile's artifact is in place and can't be replaced (ie it is mapped on Windows), it is as good
+        with contextlib.suppress(OSError):
+            os.remove(temporary_path)
+    return RouteTableArtifact(artifact_path, route_table, buffer)
+
+
+def write_artifact_file(file_descriptor: int, fingerprint: SourceFingerprint, raw_route_data: dict,
+                        route_specs: typing.List[RouteSpec]) -> typing.Tuple[CompiledRouteTable, mmap.mmap]:
+    with open(file_descriptor, "w+b") as f:
+        # the header is plain bytes, so a stale or foreign artifact is rejected without unpickling anything
+        f.write(pack_header(fingerprint))
+        group_spans = {}
+        for group_dict in raw_route_data.get("data_groups", []):
+            if group_dict.get("group_name") in group_spans:
+                # the first group with a name wins, as when seeding from the routes file
+                continue
+            offset = f.tell()
+            f.write(pickle.dumps(group_dict.get("data"), protocol=pickle.HIGHEST_PROTOCOL))
+            group_spans[group_dict.get("group_name")] = (offset, f.tell() - offset)
+
+        route_table_offset = f.tell()
+        route_table = CompiledRouteTable(
+            fingerprint,
+            {"routes": raw_route_data.get("routes", [])},
+            route_specs,
+            build_route_spec_trie(route_specs),
+            group_spans
+        )
+        pickle.dump(route_table, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.write(struct.pack(OFFSET_FORMAT, route_table_offset))
+        f.flush()
+        return route_table, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def compile_routes_file(file_path: str, artifact_path: str = None) -> RouteTableArtifact:
+    fingerprint = get_source_fingerprint(file_path)
+    with paused_garbage_collection():
+        with open(file_path, "r") as f:
+            raw_route_data = json.loads(f.read())
+    if not RoutesFileValidator.validate_file_data(raw_route_data):
+        raise ValueError(f"Invalid routes file '{file_path}'")
+
+    artifact_path = artifact_path or get_artifact_path(file_path)
+    return write_artifact(artifact_path, fingerprint, raw_route_data, get_route_specs(raw_route_data))
+
+
+def pack_header(fingerprint: SourceFingerprint) -> bytes:
+    return struct.pack(
+        HEADER_FORMAT,
+        ARTIFACT_MAGIC,
+        ARTIFACT_FORMAT_VERSION,
+        fingerprint.size,
+        fingerprint.mtime_ns,
+        bytes.fromhex(fingerprint.sha256)
+    )
+
+
+def read_header(f: typing.BinaryIO) -> typing.Optional[SourceFingerprint]:
+    # None for anything that isn't an artifact of the current format
+    try:
+        magic, format_version, size, mtime_ns, digest = struct.unpack(
+            HEADER_FORMAT, f.read(struct.calcsize(HEADER_FORMAT))
+        )
+    except struct.error:
+        return None
+    if magic != ARTIFACT_MAGIC or format_version != ARTIFACT_FORMAT_VERSION:
+        return None
+    return SourceFingerprint(size, mtime_ns, digest.hex())
+
+
+def is_trusted_artifact(artifact_stat: os.stat_result) -> bool:
+    # Artifacts are pickles, which run code when loaded: only ones owned by this process's user and writable by
+    # nobody else are, or anyone able to drop a file next to the routes file could run code in the server
+    if artifact_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        return False
+    return not hasattr(os, "geteuid") or artifact_stat.st_uid == os.geteuid()
+
+
+def load_artifact(file_path: str, artifact_path: str = None) -> typing.Optional[RouteTableArtifact]:
+    # Returns None unless the artifact is trusted (see is_trusted_artifact) and was compiled from the file as it is now
+    artifact_path = artifact_path or get_artifact_path(file_path)
+    if not os.path.exists(artifact_path):
+        return None
+    with open(artifact_path, "rb") as f:
+        # checked on the opened file, so it can't be swapped for another one in between
+        if not is_trusted_artifact(os.fstat(f.fileno())):
+            return None
+        fingerprint = read_header(f)
+        if fingerprint is None:
+            return None
+        file_stat = os.stat(file_path)
+        if (fingerprint.size, fingerprint.mtime_ns) != (file_stat.st_size, file_stat.st_mtime_ns):
+            return None
+        if fingerprint != get_source_fingerprint(file_path):
+            return None
+        # a truncated or partly written artifact has a valid header but no valid route table
+        try:
+            f.seek(-struct.calcsize(OFFSET_FORMAT), os.SEEK_END)
+            f.seek(struct.unpack(OFFSET_FORMAT, f.read(struct.calcsize(OFFSET_FORMAT)))[0])
+            with paused_garbage_collection():
+                route_table = pickle.load(f)
+        except (struct.error, pickle.UnpicklingError, EOFError, OSError, ValueError, TypeError):
+            return None
+        return RouteTableArtifact(artifact_path, route_table, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def load_or_compile_artifact(file_path: str, artifact_path: str = None) -> RouteTableArtifact:
+    artifact = load_artifact(file_path, artifact_path)
+    if artifact is None:
+        artifact = compile_routes_file(file_path, artifact_path)
+    return artifact
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile a dummy-api routes file into a startup artifact")
+    parser.add_argument("routes_file")
+    parser.add_argument("--output", "-o", help=f"artifact path, defaults to the routes file path + '{ARTIFACT_SUFFIX}'")
+    args = parser.parse_args()
+
+    artifact = compile_routes_file(args.routes_file, args.output)
+    print(f"Compiled {len(artifact.route_table.route_specs)} routes and {len(artifact.get_group_names())} data groups "
+          f"to {artifact.artifact_path}")
+
+
+if __name__ == "__main__":
+    main()
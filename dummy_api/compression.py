@@ -0,0 +1,57 @@
+import functools
+import gzip
+import typing
+import zlib
+
+ACCEPT_ENCODING_HEADER = "Accept-Encoding"
+CONTENT_ENCODING_HEADER = "Content-Encoding"
+VARY_HEADER = "Vary"
+ENCODING_GZIP = "gzip"
+ENCODING_DEFLATE = "deflate"
+ANY_ENCODING = "*"
+# bodies smaller than this go out as they are, compressing them saves next to nothing
+DEFAULT_COMPRESSION_THRESHOLD = 1024
+# variants are compressed once per data version, so this is about size more than speed
+COMPRESSION_LEVEL = 6
+# clients send a handful of distinct Accept-Encoding headers over and over
+ACCEPT_ENCODING_CACHE_SIZE = 256
+# in order of preference when a client accepts several equally
+COMPRESSORS = {
+    # mtime=0 keeps the output the same for the same body
+    ENCODING_GZIP: lambda body: gzip.compress(body, compresslevel=COMPRESSION_LEVEL, mtime=0),
+    # HTTP's deflate is the zlib format (RFC 9110 8.4.1.2)
+    ENCODING_DEFLATE: lambda body: zlib.compress(body, COMPRESSION_LEVEL)
+}
+
+
+def parse_quality(parameters: str) -> float:
+    for parameter in parameters.split(";"):
+        name, _, value = parameter.strip().partition("=")
+        if name.strip().lower() == "q":
+            try:
+                return float(value)
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+@functools.lru_cache(maxsize=ACCEPT_ENCODING_CACHE_SIZE)
+def choose_encoding(accept_encoding: typing.Optional[str]) -> typing.Optional[str]:
+    # The supported encoding the client prefers (RFC 9110 12.5.3), None when the body should go out as it is
+    if not accept_encoding:
+        return None
+    qualities = {}
+    for coding in accept_encoding.split(","):
+        name, _, parameters = coding.partition(";")
+        qualities[name.strip().lower()] = parse_quality(parameters)
+    any_quality = qualities.get(ANY_ENCODING, 0.0)
+    encoding, quality = None, 0.0
+    for candidate in COMPRESSORS:
+        candidate_quality = qualities.get(candidate, any_quality)
+        if candidate_quality > quality:
+            encoding, quality = candidate, candidate_quality
+    return encoding
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    return COMPRESSORS[encoding](body)
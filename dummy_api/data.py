@@ -1,16 +1,30 @@
+import contextlib
+import threading
 import typing
 import re
-from dummy_api.request import RouteRequest
+import warnings
+from dummy_api.columnar import is_columnar_available
+from dummy_api.list_query import ListQuery
+from dummy_api.request import RequestBodyError, RouteRequest
+from dummy_api.query_plan import QueryPlan, compile_query_path
+from dummy_api.indexes import DataGroupIndexes
+from dummy_api.views import make_read_only
+from dummy_api.versions import DataVersions
+from dummy_api.locks import ReadWriteLock
+from dummy_api.backends import InMemoryBackend
+from dummy_api.persistence import (
+    MutationLog, OPERATION_APPEND, OPERATION_DELETE, OPERATION_SET, OPERATION_UPDATE, discard_pending_mutations,
+    replay_mutations, replay_pending_mutations
+)
+from dummy_api.serialization import encode_json
 
 
 class DataPathQuery:
-    LIST_QUERY_PARAMETER_REGEX = r"\[(?P<query>(?P<field>\w+)=(?P<value>[^\]]+))\]"
     LIST_QUERY_PARAMETER_CONSTRAINT_REGEX = r"\[(?P<query>(?P<field>\w+)=(?P<value>\{[^\]]+\}))\]"
-    LIST_QUERY_SPLIT_REGEX = r"([\w_]+(?:\[[^\]]+])?)(?:\.|$)"
-    KEY_QUERY_REGEX = r"(?P<key_value>\{[\w\d_]+\})"
 
     def __init__(self, query_string: str):
         self.query_string = query_string
+        self.query_plan: QueryPlan = compile_query_path(query_string)
 
     def has_parameters(self) -> bool:
         return "{" in self.query_string
@@ -24,42 +38,6 @@ class DataPathQuery:
         cleaned_results = [value.strip("{}") for value in self.get_parameter_constraints()]
         return cleaned_results
 
-    @staticmethod
-    def get_concrete_query_string(parameterized_query_string: str, **kwargs) -> str:
-        concrete_query_string = parameterized_query_string
-        for field, value in kwargs.items():
-            #  TODO: Better handle non-string data
-            concrete_query_string = concrete_query_string.replace("{" + field + "}", str(value))
-        return concrete_query_string
-
-    def is_list_query_term(self, query_term: str) -> bool:
-        return bool(re.search(self.LIST_QUERY_PARAMETER_REGEX, query_term))
-
-    def resolve_dict_query_term(self, data_to_query: dict, query_term: str, **kwargs) -> typing.Any:
-        return data_to_query.get(query_term)
-
-    def normalized_query_compare(self, data_value: typing.Any, queried_value: str) -> bool:
-        normalized_queried_value = queried_value
-        return data_value == normalized_queried_value
-
-    def get_concrete_query_value(self, query_request_value: str, **kwargs):
-        is_parameterized_value = "{" in query_request_value
-        if is_parameterized_value:
-            return kwargs.get(query_request_value.strip("{}"))
-        if query_request_value.isdigit():
-            return int(query_request_value)
-        return query_request_value.strip("'\"")
-
-    def resolve_list_query_term(self, list_to_query: typing.List[dict], query_term, **kwargs) -> typing.Any:
-        parameter_match = re.search(self.LIST_QUERY_PARAMETER_REGEX, query_term)
-        for item in list_to_query:
-            query_requested_field = parameter_match.group("field")
-            query_requested_value = parameter_match.group("value")
-            concrete_value = self.get_concrete_query_value(query_requested_value, **kwargs)
-            if self.normalized_query_compare(item.get(query_requested_field), concrete_value):
-                return item
-        raise ValueError("Matching value not found in list")
-
     def validate_params(self, **kwargs):
         passed_params_set = set(kwargs.keys())
         required_params_set = set(self.get_required_parameter_names())
@@ -67,109 +45,65 @@ class DataPathQuery:
             raise ValueError("Missing required parameters in list query")
         return True
 
-    def get_query_tokens(self, **kwargs) -> typing.List[str]:
-        query_string = self.get_concrete_query_string(self.query_string, **kwargs)
-        query_pieces = re.split(self.LIST_QUERY_SPLIT_REGEX, query_string)
-        query_pieces = [x for x in query_pieces if x and x != "."]
-        return query_pieces
+    def update_dict(self, dict_to_update: dict, update_data: typing.Any, **kwargs) -> dict:
+        return self.query_plan.update(dict_to_update, update_data, kwargs)
 
-    def is_root_query(self, **kwargs) -> bool:
-        return len(self.get_query_tokens(**kwargs)) == 0
+    def append_to_dict(self, dict_to_update: dict, items: list, **kwargs) -> dict:
+        return self.query_plan.append_items(dict_to_update, items, kwargs)
 
-    def get_list_name_and_query_term_from_token(self, token: str) -> typing.List[str]:
-        item_name, list_query = token.split("[", 1)
-        return [item_name, f"[{list_query}"]
-
-    def update_dict(self, dict_to_update: dict, update_data: typing.Any, **kwargs) -> dict:
-        self.validate_params(**kwargs)
-        query_pieces = self.get_query_tokens(**kwargs)
-        result = dict_to_update
-        if not query_pieces:
-            raise ValueError("Must provide a query path for updates, cannot replace entire object")
-        last_piece = query_pieces[-1]
-        for query_piece in query_pieces[:-1]:
-            if not result:
-                raise ValueError("Could not find value to update")
-            if self.is_list_query_term(query_piece):
-                item_name, list_query = self.get_list_name_and_query_term_from_token(query_piece)
-                try:
-                    result = self.resolve_list_query_term(result.get(item_name), list_query, **kwargs)
-                except ValueError:
-                    return {}
-            else:
-                result = self.resolve_dict_query_term(result, query_piece, **kwargs)
-
-        if self.is_list_query_term(last_piece):
-            item_name, list_query = self.get_list_name_and_query_term_from_token(last_piece)
-            item: dict = self.resolve_list_query_term(result.get(item_name), list_query, **kwargs)
-            item.clear()  # POST
-            item.update(update_data)
-            return dict_to_update
-
-        if result and last_piece in result and isinstance(result[last_piece], list):
-            # Introspecting the types of data here to make a guess at whether we are posting a new "entity"
-            # or replacing a field value. Life would be easier if we draw a clear line between PUT and POST behaviors.
-            # ie POST will ALWAYS append to arrays, PUT will always replace (may seem backwards but bear in mind that
-            # POSTing will primarily be done against entity list routes where it makes sense that it should append).
-            # May be most cleanly resolved by adding new route properties, perhaps defining array/dict behavior with
-            # append/extend rules. Requires more routes but gives more control.
-            if len(result[last_piece]) > 0 and isinstance(result[last_piece][0], dict):
-                result[last_piece].append(update_data)
-            else:
-                result[last_piece] = update_data
-        else:
-            result[last_piece] = update_data
-
-        return dict_to_update
-
-    def is_key_query_term(self, query_piece) -> bool:
-        return bool(re.search(self.KEY_QUERY_REGEX, query_piece))
-
-    def get_key_query_pieces(self, query_piece) -> str:
-        m = re.match(self.KEY_QUERY_REGEX, query_piece)
-        if m is None:
-            raise ValueError("Could not parse key value out of string")
-        return m.group("key_value")
-
-    def resolve_key_query_term(self, dict_to_query: dict, key_value_term: str, **kwargs) -> typing.Any:
-        return dict_to_query.get(kwargs.get(key_value_term.strip("{}")))
-
-    def query_dict(self, dict_to_query: dict, copy=True, **kwargs):
-        self.validate_params(**kwargs)
-
-        query_pieces = self.get_query_tokens(**kwargs)
-        result = dict_to_query.copy() if copy else dict_to_query
-        for query_piece in query_pieces:
-            if not result:
-                return None
-            if self.is_list_query_term(query_piece):
-                # TODO: This logic is a bit gross, use cleaner pattern matching
-                item_name, list_query = query_piece.split("[", 1)
-                try:
-                    result = self.resolve_list_query_term(result.get(item_name), f"[{list_query}", **kwargs)
-                except ValueError:
-                    return None
-            elif self.is_key_query_term(query_piece):
-                item_name, key_value = self.get_key_query_pieces(query_piece)
-                result = self.resolve_key_query_term(result.get(item_name), key_value, **kwargs)
-            else:
-                result = self.resolve_dict_query_term(result, query_piece, **kwargs)
-        return result
+    def query_dict(self, dict_to_query: dict, read_only=True, **kwargs):
+        if "copy" in kwargs:
+            # read_only used to be copy, copy=False handing out the data itself
+            warnings.warn("query_dict(copy=...) is deprecated, use read_only=...", DeprecationWarning, stacklevel=2)
+            read_only = bool(kwargs.pop("copy"))
+        result = self.query_plan.query(dict_to_query, kwargs)
+        return make_read_only(result) if read_only else result
 
 
 class DataResolver:
 
-    def __init__(self, name: str, data_provider: callable, query_path: str = "", default=None):
+    def __init__(self, name: str, data_provider: callable, query_path: str = "", default=None,
+                 index_provider: callable = None, version_provider: callable = None, lock_provider: callable = None):
         self.name = name
         self.data_provider = data_provider
         self.query_path = query_path
         self.default = default
+        self.index_provider = index_provider
+        self.version_provider = version_provider
+        self.lock_provider = lock_provider
+
+    @property
+    def query_plan(self) -> QueryPlan:
+        return compile_query_path(self.query_path)
+
+    def read_lock(self) -> typing.ContextManager:
+        return self.lock_provider().read() if self.lock_provider else contextlib.nullcontext()
 
     def get_data(self, **kwargs) -> typing.Any:
-        base_data = self.data_provider(**kwargs)  # TODO: respect query path and pull appropriate data
-        data_path = DataPathQuery(self.query_path)
-        result = data_path.query_dict(base_data, **kwargs)
-        return self.default if result is None else result
+        return self.resolve(kwargs)
+
+    def resolve(self, params: dict, list_query: ListQuery = None) -> typing.Any:
+        result = self.find(params, list_query)
+        return self.get_default() if result is None else result
+
+    def find(self, params: dict, list_query: ListQuery = None) -> typing.Any:
+        # None when the query path leads nowhere, resolve answers those with the default
+        with self.read_lock():
+            base_data = self.data_provider(**params)  # TODO: respect query path and pull appropriate data
+            indexes = self.index_provider() if self.index_provider else None
+            query_plan = self.query_plan
+            result = query_plan.query(base_data, params, indexes)
+            if result is not None and list_query is not None:
+                result = list_query.apply(result, indexes, query_plan.get_result_path(params))
+        return None if result is None else make_read_only(result)
+
+    def get_default(self) -> typing.Any:
+        return make_read_only(self.default)
+
+    def get_version_token(self, **kwargs) -> typing.Optional[int]:
+        if self.version_provider is None:
+            return None
+        return self.version_provider(self.query_plan.get_dependency_path(kwargs))
 
     def __call__(self, **kwargs) -> typing.Any:
         return self.get_data(**kwargs)
@@ -182,32 +116,83 @@ class DataMutator:
             data_ref_provider: callable,
             delete_fn: callable = None,
             replace_fn: callable = None,
-            query_path: str = ""
+            query_path: str = "",
+            index_provider: callable = None,
+            mutation_listener: callable = None,
+            lock_provider: callable = None,
+            update_fn: callable = None,
+            append_fn: callable = None
     ):
         self.data_ref_provider = data_ref_provider
         self.delete_fn = delete_fn
         self.replace_fn = replace_fn
+        self.update_fn = update_fn
+        self.append_fn = append_fn
         self.query_path = query_path
+        self.index_provider = index_provider
+        self.mutation_listener = mutation_listener
+        self.lock_provider = lock_provider
+
+    @property
+    def query_plan(self) -> QueryPlan:
+        return compile_query_path(self.query_path)
 
     def get_data(self, **kwargs) -> dict:
         base_data = self.data_ref_provider()  # TODO: respect query path and pull appropriate data
-        data_path = DataPathQuery(self.query_path)
-        return data_path.query_dict(base_data, copy=False, **kwargs)
+        return self.query_plan.query(base_data, kwargs)
 
     def get_object_to_update(self, **kwargs) -> dict:
         base_data = self.data_ref_provider(**kwargs)
 
-    def update_data(self, new_data: dict, **kwargs) -> dict:
-        data_path = DataPathQuery(self.query_path)
-        if data_path.is_root_query(**kwargs):
-            return self.replace_fn(new_data)
-
-        next_to_last_query_path = ".".join(self.query_path.split(".")[:-1])
-        next_to_last_data_path = DataPathQuery(next_to_last_query_path)
-        # base_data = next_to_last_data_path.query_dict(self.data_ref_provider(), copy=False, **kwargs)
+    def write_lock(self) -> typing.ContextManager:
+        return self.lock_provider().write() if self.lock_provider else contextlib.nullcontext()
 
-        updated_data_source = data_path.update_dict(self.data_ref_provider(), new_data, **kwargs)
-        return next_to_last_data_path.query_dict(updated_data_source, **kwargs)
+    def update_data(self, new_data: dict, **kwargs) -> dict:
+        query_plan = self.query_plan
+        if query_plan.is_root():
+            return make_read_only(self.replace_fn(new_data))
+
+        indexes = self.index_provider() if self.index_provider else None
+        dependency_path = query_plan.get_dependency_path(kwargs)
+        with self.write_lock():
+            try:
+                if self.update_fn:
+                    updated_data_source = self.update_fn(query_plan, new_data, kwargs, indexes)
+                else:
+                    updated_data_source = query_plan.update(self.data_ref_provider(), new_data, kwargs, indexes)
+            finally:
+                # a failed update may still have partially changed the data
+                if self.mutation_listener:
+                    self.mutation_listener(dependency_path)
+            result = query_plan.get_parent().query(updated_data_source, kwargs, indexes)
+        return make_read_only(result)
+
+    def append_items(self, items: typing.Any, **kwargs) -> dict:
+        # Bulk POST: the valid items are appended in one mutation (one lock acquisition, one index update, one version
+        # bump), the others are reported by their position in items and left out
+        if not isinstance(items, list):
+            raise RequestBodyError("Bulk appends take a list of objects")
+        query_plan = self.query_plan
+        if query_plan.is_root():
+            raise ValueError("Must provide a query path for updates, cannot replace entire object")
+        errors = [
+            {"index": position, "message": "Expected an object"}
+            for position, item in enumerate(items) if not isinstance(item, dict)
+        ]
+        valid_items = [item for item in items if isinstance(item, dict)] if errors else items
+        if valid_items:
+            indexes = self.index_provider() if self.index_provider else None
+            dependency_path = query_plan.get_dependency_path(kwargs)
+            with self.write_lock():
+                try:
+                    if self.append_fn:
+                        self.append_fn(query_plan, valid_items, kwargs, indexes)
+                    else:
+                        query_plan.append_items(self.data_ref_provider(), valid_items, kwargs, indexes)
+                finally:
+                    if self.mutation_listener:
+                        self.mutation_listener(dependency_path)
+        return {"appended": len(valid_items), "errors": errors}
 
     def delete(self) -> None:
         return self.delete_fn()
@@ -218,27 +203,198 @@ class DataMutator:
 
 class MutableDataStore:
 
-    def __init__(self):
+    def __init__(self, backend: InMemoryBackend = None):
         self.data_resolvers = {}
-        self.data_groups = {}
+        self.backend = InMemoryBackend() if backend is None else backend
+        self.group_indexes = {}
+        self.versions = DataVersions()
+        self.group_locks = {}
+        self.group_locks_lock = threading.Lock()
+        self.mutation_log = None
+        self.recovered_state = None
+        self.deleted_groups = set()
+        self.backend.group_replaced_listener = lambda group_name: self.versions.bump((group_name,))
+
+    @property
+    def data_groups(self) -> dict:
+        return self.backend.data_groups
+
+    @property
+    def owns_groups(self) -> bool:
+        return self.backend.owns_groups
 
     def build_data_resolver(self, name: str, query_path: str = "", default_data: typing.Any = None) -> DataResolver:
         def data_resolver_fn(**kwargs) -> typing.Any:
-            return self.data_groups.get(name)
-
-        resolver = DataResolver(name, data_resolver_fn, query_path, default=default_data)
+            return self.backend.get_group(name)
+
+        resolver = DataResolver(
+            name,
+            data_resolver_fn,
+            query_path,
+            default=default_data,
+            index_provider=self.get_index_provider(name),
+            version_provider=self.get_version_provider(name),
+            lock_provider=self.get_lock_provider(name)
+        )
         return resolver
 
+    def get_group_lock(self, group_name: str) -> ReadWriteLock:
+        # one lock per group: reads of different groups never contend, and only writes to a group block its reads
+        group_lock = self.group_locks.get(group_name)
+        if group_lock is None:
+            with self.group_locks_lock:
+                group_lock = self.group_locks.setdefault(group_name, ReadWriteLock())
+        return group_lock
+
+    def sync_group(self, group_name: str):
+        # Bring the group up to date with changes made by other processes sharing the backend. Threads already
+        # holding the group's lock keep the snapshot they started with.
+        group_lock = self.get_group_lock(group_name)
+        if group_lock.is_held_by_current_thread() or not self.backend.has_remote_changes(group_name):
+            return
+        with group_lock.write():
+            for data_path in self.backend.pull_remote_changes(group_name, self.get_group_indexes(group_name)):
+                self.versions.bump((group_name,) + data_path)
+
+    def get_synced_group_lock(self, group_name: str) -> ReadWriteLock:
+        self.sync_group(group_name)
+        return self.get_group_lock(group_name)
+
+    def get_lock_provider(self, group_name: str) -> callable:
+        return lambda: self.get_synced_group_lock(group_name)
+
+    def get_group_indexes(self, group_name: str) -> typing.Optional[DataGroupIndexes]:
+        return self.group_indexes.get(group_name)
+
+    def get_index_provider(self, group_name: str) -> callable:
+        return lambda: self.group_indexes.get(group_name)
+
+    def get_version_token(self, group_name: str, data_path: tuple = ()) -> int:
+        self.sync_group(group_name)
+        return self.versions.get_token((group_name,) + data_path)
+
+    def get_version_provider(self, group_name: str) -> callable:
+        return lambda data_path: self.get_version_token(group_name, data_path)
+
+    def get_mutation_listener(self, group_name: str) -> callable:
+        return lambda data_path: self.versions.bump((group_name,) + data_path)
+
+    def register_query_indexes(self, group_name: str, query_path: str) -> DataGroupIndexes:
+        # index every list predicate of the query that can be reached through literal keys
+        return self.register_index_targets(group_name, compile_query_path(query_path).get_index_targets())
+
+    def register_index_targets(self, group_name: str, index_targets: typing.List[tuple],
+                               sorted_index_targets: typing.List[tuple] = ()) -> DataGroupIndexes:
+        group_indexes = self.group_indexes.setdefault(group_name, DataGroupIndexes())
+        for list_path, field in index_targets:
+            group_indexes.register_index(list_path, field)
+        for list_path, field in sorted_index_targets:
+            group_indexes.register_sorted_index(list_path, field)
+        return group_indexes
+
+    def retain_index_targets(self, group_targets: typing.List[tuple]):
+        # (group name, index targets, sorted index targets) of every route, indexes no route asks for are dropped
+        index_targets = {}
+        for group_name, group_index_targets, group_sorted_index_targets in group_targets:
+            targets = index_targets.setdefault(group_name, (set(), set()))
+            targets[0].update(group_index_targets)
+            targets[1].update(group_sorted_index_targets)
+        self.group_indexes = {
+            group_name: self.group_indexes.get(group_name, DataGroupIndexes()).retain(*targets)
+            for group_name, targets in index_targets.items()
+        }
+
+    def register_columnar_targets(self, group_name: str, list_paths: typing.List[tuple]):
+        # lists of records at list_paths are stored as dummy_api.columnar.ColumnarLists from now on
+        if not list_paths or not is_columnar_available():
+            return
+        with self.get_group_lock(group_name).write():
+            if self.backend.set_columnar_paths(group_name, list_paths):
+                self.versions.bump((group_name,))
+
+    def enable_mutation_log(self, mutation_log: MutationLog):
+        # restores the groups recorded in the log, groups seeded afterwards only fill in the ones it doesn't know
+        recovered_state = mutation_log.recover()
+        for group_name in replay_mutations(self.backend, recovered_state):
+            self.versions.bump((group_name,))
+        self.deleted_groups = recovered_state.deleted_groups
+        self.recovered_state = recovered_state
+        self.mutation_log = mutation_log
+        mutation_log.start(self.get_snapshot)
+        return self
+
+    def record_mutation(self, operation: str, group_name: str, query_string: str = None, data: typing.Any = None,
+                        params: dict = None):
+        if self.mutation_log:
+            self.mutation_log.append(operation, group_name, query_string, data, params)
+
+    def discard_pending_mutations(self) -> int:
+        # logged mutations of groups that weren't seeded, see dummy_api.persistence.discard_pending_mutations
+        discarded_count = self.backend.discard_pending_mutations()
+        if self.recovered_state:
+            discarded_count += discard_pending_mutations(self.recovered_state)
+        return discarded_count
+
+    def get_snapshot(self) -> typing.Optional[dict]:
+        if self.recovered_state and self.recovered_state.pending_records:
+            # logged updates to groups that haven't been seeded yet would be lost
+            return None
+        snapshot = {}
+        for group_name in list(self.data_groups) + list(self.deleted_groups):
+            with self.get_group_lock(group_name).read():
+                seq = self.mutation_log.get_last_seq()
+                data = self.backend.get_group(group_name) if self.backend.has_group(group_name) else None
+                snapshot[group_name] = (seq, None if data is None else encode_json(data))
+        return snapshot
+
     def add_data_group(self, name: str, data: dict):
-        self.data_groups[name] = data
+        with self.get_group_lock(name).write():
+            self.backend.set_group(name, data)
+            self.deleted_groups.discard(name)
+            self.record_mutation(OPERATION_SET, name, data=data)
+            self.versions.bump((name,))
+        return self
+
+    def remove_data_group(self, name: str):
+        with self.get_group_lock(name).write():
+            if self.backend.has_group(name):
+                self.backend.delete_group(name)
+            self.deleted_groups.add(name)
+            self.record_mutation(OPERATION_DELETE, name)
+            self.versions.bump((name,))
+        return self
+
+    def seed_data_group(self, name: str, data: dict):
+        # like add_data_group, but keeps the data a shared backend or the mutation log may already hold for the group
+        with self.get_group_lock(name).write():
+            if name not in self.deleted_groups and self.backend.seed_group(name, data):
+                if self.recovered_state:
+                    replay_pending_mutations(self.backend, self.recovered_state, name)
+                self.versions.bump((name,))
+        return self
+
+    def seed_data_group_loader(self, name: str, loader: callable):
+        # like seed_data_group, for groups that are only decoded when they are first read
+        with self.get_group_lock(name).write():
+            if name not in self.deleted_groups and self.backend.seed_group_loader(name, loader):
+                if self.recovered_state:
+                    replay_pending_mutations(self.backend, self.recovered_state, name)
+                self.versions.bump((name,))
         return self
 
     def build_resolver_for_data_group(self, data_group_name: str, data_group_data: dict, query_path: str = ""):
         def data_resolver_fn(**kwargs) -> typing.Any:
-            return self.data_groups.get(data_group_name)
+            return self.backend.get_group(data_group_name)
 
         self.add_data_group(data_group_name, data_group_data)
-        resolver = DataResolver(data_group_name, data_resolver_fn, query_path)
+        resolver = DataResolver(
+            data_group_name,
+            data_resolver_fn,
+            query_path,
+            index_provider=self.get_index_provider(data_group_name),
+            version_provider=self.get_version_provider(data_group_name),
+            lock_provider=self.get_lock_provider(data_group_name)
+        )
         self.add_resolver(data_group_name, resolver)
         return resolver
 
@@ -247,24 +403,55 @@ class MutableDataStore:
 
     def get_mutator_delete(self, group_name: str) -> callable:
         def mutator_delete() -> None:
-            del self.data_groups[group_name]
+            with self.get_synced_group_lock(group_name).write():
+                self.backend.delete_group(group_name)
+                self.deleted_groups.add(group_name)
+                self.record_mutation(OPERATION_DELETE, group_name)
+                self.versions.bump((group_name,))
             return None
 
         return mutator_delete
 
     def get_mutator_replace(self, group_name: str) -> callable:
         def mutator_update(new_data: dict) -> dict:
-            self.data_groups[group_name] = new_data
-            return self.data_groups.get(group_name)
+            with self.get_synced_group_lock(group_name).write():
+                self.backend.set_group(group_name, new_data)
+                self.deleted_groups.discard(group_name)
+                self.record_mutation(OPERATION_SET, group_name, data=new_data)
+                self.versions.bump((group_name,))
+                return self.backend.get_group(group_name)
+
+        return mutator_update
+
+    def get_mutator_update(self, group_name: str) -> callable:
+        def mutator_update(query_plan: QueryPlan, new_data: typing.Any, params: dict, indexes) -> typing.Any:
+            try:
+                return self.backend.update_group(group_name, query_plan, new_data, params, indexes)
+            finally:
+                self.record_mutation(OPERATION_UPDATE, group_name, query_plan.query_string, new_data, params)
 
         return mutator_update
 
+    def get_mutator_append(self, group_name: str) -> callable:
+        def mutator_append(query_plan: QueryPlan, items: list, params: dict, indexes) -> typing.Any:
+            try:
+                return self.backend.append_group_items(group_name, query_plan, items, params, indexes)
+            finally:
+                self.record_mutation(OPERATION_APPEND, group_name, query_plan.query_string, items, params)
+
+        return mutator_append
+
     def get_group_mutator(self, name: str, query_path: str = "") -> DataMutator:
         return DataMutator(
-            lambda: self.data_groups.get(name),
+            lambda: self.backend.get_group(name),
             query_path=query_path,
             delete_fn=self.get_mutator_delete(name),
-            replace_fn=self.get_mutator_replace(name)
+            replace_fn=self.get_mutator_replace(name),
+            index_provider=self.get_index_provider(name),
+            mutation_listener=self.get_mutation_listener(name),
+            lock_provider=self.get_lock_provider(name),
+            update_fn=self.get_mutator_update(name),
+            append_fn=self.get_mutator_append(name)
         )
 
     def get_resolver_by_name(self, name: str) -> DataResolver:
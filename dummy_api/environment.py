@@ -0,0 +1,67 @@
+import gc
+import os
+import typing
+from dummy_api.compression import DEFAULT_COMPRESSION_THRESHOLD
+from dummy_api.data import MutableDataStore
+from dummy_api.persistence import get_environment_mutation_log
+from dummy_api.reloading import DEFAULT_POLL_INTERVAL, RoutesReloader
+from dummy_api.routes import RoutesProvider
+from dummy_api.shared_store import connect_shared_data_store, get_environment_authkey, parse_address
+
+
+def get_environment_data_store() -> MutableDataStore:
+    # Workers share a store when DUMMY_API_STORE_ADDRESS points at a running `python -m dummy_api.shared_store`, which
+    # then owns persistence as well. Otherwise DUMMY_API_DATA_DIR turns on the mutation log for this process.
+    address = os.environ.get("DUMMY_API_STORE_ADDRESS")
+    if address:
+        authkey = get_environment_authkey()
+        if not authkey:
+            raise ValueError("DUMMY_API_STORE_ADDRESS needs DUMMY_API_STORE_AUTHKEY or DUMMY_API_STORE_AUTHKEY_FILE")
+        return connect_shared_data_store(parse_address(address), authkey)
+
+    data_store = MutableDataStore()
+    mutation_log = get_environment_mutation_log()
+    if mutation_log:
+        data_store.enable_mutation_log(mutation_log)
+    return data_store
+
+
+def get_environment_routes_options() -> dict:
+    # DUMMY_API_LAZY_DATA=1 decodes data groups on first access, DUMMY_API_LAZY_DATA=mmap also maps the routes file.
+    # DUMMY_API_ROUTES_ARTIFACT=1 starts from the compiled artifact (see dummy_api.compiler). DUMMY_API_METRICS=0 turns
+    # off the per route metrics served on /_admin/metrics. DUMMY_API_TRACE=1 adds a Server-Timing header to every
+    # response, otherwise only requests sending an X-Dummy-Api-Trace header get one. DUMMY_API_COMPRESSION_THRESHOLD
+    # is the size in bytes from which cached bodies are sent compressed, "off" never compresses them.
+    lazy_data = os.environ.get("DUMMY_API_LAZY_DATA", "").lower()
+    compression_threshold = os.environ.get("DUMMY_API_COMPRESSION_THRESHOLD", str(DEFAULT_COMPRESSION_THRESHOLD))
+    return {
+        "lazy_data": lazy_data not in ["", "0", "false"],
+        "use_mmap": lazy_data == "mmap",
+        "use_artifact": os.environ.get("DUMMY_API_ROUTES_ARTIFACT", "").lower() not in ["", "0", "false"],
+        "collect_metrics": os.environ.get("DUMMY_API_METRICS", "1").lower() not in ["", "0", "false"],
+        "trace_requests": os.environ.get("DUMMY_API_TRACE", "").lower() not in ["", "0", "false"],
+        "compression_threshold": None if compression_threshold.lower() == "off" else int(compression_threshold)
+    }
+
+
+def freeze_environment_heap():
+    # DUMMY_API_GC_FREEZE=1 moves everything alive once the app is set up (routes, data groups) out of the cyclic
+    # garbage collector's reach for good, so its full collections stop rescanning them. Only call it once, at startup:
+    # whatever is alive at that point is never collected.
+    if os.environ.get("DUMMY_API_GC_FREEZE", "").lower() not in ["", "0", "false"]:
+        gc.freeze()
+
+
+def is_environment_admin_enabled() -> bool:
+    # DUMMY_API_ADMIN=1 serves the /_admin/ endpoints (metrics and profiling, see dummy_api.admin)
+    return os.environ.get("DUMMY_API_ADMIN", "").lower() not in ["", "0", "false"]
+
+
+def start_environment_routes_reloader(route_provider: RoutesProvider) -> typing.Optional[RoutesReloader]:
+    # DUMMY_API_RELOAD=1 applies changes to the routes file without a restart, checking for them every
+    # DUMMY_API_RELOAD_INTERVAL seconds. Workers sharing a store only reload their routes, the store server started
+    # with the same variables (or --reload) reseeds the data groups.
+    if os.environ.get("DUMMY_API_RELOAD", "").lower() in ["", "0", "false"]:
+        return None
+    poll_interval = float(os.environ.get("DUMMY_API_RELOAD_INTERVAL", DEFAULT_POLL_INTERVAL))
+    return RoutesReloader(route_provider, poll_interval=poll_interval).start()
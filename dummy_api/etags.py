@@ -0,0 +1,32 @@
+import secrets
+import typing
+
+ETAG_HEADER = "ETag"
+IF_NONE_MATCH_HEADER = "If-None-Match"
+WEAK_PREFIX = "W/"
+ANY_ETAG = "*"
+
+
+def new_etag_prefix() -> str:
+    # Version tokens start over in every process and don't cover route changes, so ETags carry a prefix drawn when
+    # the routes are (re)built: an ETag from before a restart or reload never matches again
+    return secrets.token_hex(4)
+
+
+def format_etag(prefix: str, version_token: int) -> str:
+    return f'"{prefix}-{version_token}"'
+
+
+def matches_if_none_match(if_none_match: typing.Optional[str], etag: str) -> bool:
+    # If-None-Match holds "*" or a list of ETags, compared weakly (RFC 9110 13.1.2)
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == ANY_ETAG:
+            return True
+        if candidate.startswith(WEAK_PREFIX):
+            candidate = candidate[len(WEAK_PREFIX):]
+        if candidate == etag:
+            return True
+    return False
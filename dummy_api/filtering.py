@@ -0,0 +1,194 @@
+import collections.abc
+import json
+import operator
+import typing
+from dummy_api import tracing
+from dummy_api.aggregation import AGGREGATE_PARAMETER, GROUP_BY_PARAMETER
+from dummy_api.columnar import ColumnarList, select_records
+from dummy_api.indexes import DataGroupIndexes, get_equality_key
+from dummy_api.pagination import CURSOR_PARAMETER, LIMIT_PARAMETER, OFFSET_PARAMETER
+from dummy_api.projection import FIELDS_PARAMETER
+from dummy_api.sorting import SORT_PARAMETER
+from dummy_api.views import unwrap
+
+OPERATOR_SEPARATOR = "__"
+OPERATOR_EQ = "eq"
+OPERATOR_IN = "in"
+RANGE_OPERATORS = {"gt": operator.gt, "gte": operator.ge, "lt": operator.lt, "lte": operator.le}
+OPERATORS = frozenset([OPERATOR_EQ, OPERATOR_IN, *RANGE_OPERATORS])
+MISSING = object()
+# query parameters that mean something else, parameters starting with an underscore are ignored too (ie cache busters)
+RESERVED_PARAMETERS = frozenset([
+    LIMIT_PARAMETER, OFFSET_PARAMETER, CURSOR_PARAMETER, FIELDS_PARAMETER, SORT_PARAMETER, AGGREGATE_PARAMETER,
+    GROUP_BY_PARAMETER
+])
+# range operator: (is a lower bound, includes the bound)
+RANGE_BOUNDS = {"gt": (True, False), "gte": (True, True), "lt": (False, False), "lte": (False, True)}
+
+
+def parse_filter_value(query_value: str) -> typing.Any:
+    # numbers, booleans and null as JSON would read them, anything else is a string
+    try:
+        value = json.loads(query_value)
+    except ValueError:
+        return query_value
+    return query_value if isinstance(value, (list, dict)) else value
+
+
+def get_equality_values(query_value: str) -> tuple:
+    # ?id=7 matches 7 as well as "7"
+    value = parse_filter_value(query_value)
+    return (value,) if value == query_value else (value, query_value)
+
+
+class Condition(typing.NamedTuple):
+    field: str
+    operator: str
+    # the values an item may equal (eq, in) or the single bound it is compared against
+    values: tuple
+
+    def matches(self, item: typing.Any) -> bool:
+        if not isinstance(item, collections.abc.Mapping) or self.field not in item:
+            return False
+        item_value = item[self.field]
+        if self.operator in (OPERATOR_EQ, OPERATOR_IN):
+            keys = tuple(map(get_equality_key, self.values))
+            if isinstance(item_value, list):
+                # list valued fields match when they contain the value (?tags=nautical)
+                return any(get_equality_key(element) in keys for element in item_value)
+            return get_equality_key(item_value) in keys
+        try:
+            return RANGE_OPERATORS[self.operator](item_value, self.values[0])
+        except TypeError:
+            return False
+
+    def get_predicate(self) -> typing.Callable[[typing.Any], bool]:
+        # matches() for scans, which call it for every item: plain dict items skip the generic checks, that alone
+        # makes scans about ten times faster
+        field, values, matches = self.field, self.values, self.matches
+        if self.operator in (OPERATOR_EQ, OPERATOR_IN):
+            # equality keys inlined, see get_equality_key
+            keys = tuple(map(get_equality_key, values))
+
+            def predicate(item: typing.Any) -> bool:
+                if item.__class__ is dict:
+                    item_value = item.get(field, MISSING)
+                    if item_value.__class__ is list:
+                        for element in item_value:
+                            if (element.__class__ is bool, element) in keys:
+                                return True
+                        return False
+                    return (item_value.__class__ is bool, item_value) in keys
+                return matches(item)
+            return predicate
+
+        compare = RANGE_OPERATORS[self.operator]
+        bound = values[0]
+
+        def range_predicate(item: typing.Any) -> bool:
+            if item.__class__ is dict:
+                item_value = item.get(field, MISSING)
+                if item_value is MISSING:
+                    return False
+                try:
+                    return compare(item_value, bound)
+                except TypeError:
+                    return False
+            return matches(item)
+        return range_predicate
+
+
+def is_range_condition(condition: Condition) -> bool:
+    return condition.operator in RANGE_OPERATORS
+
+
+class ListFilter(typing.NamedTuple):
+    # Items of a list result that meet every condition, in list order. Equality and membership conditions on fields
+    # with a hash index and range conditions on fields with a sorted index narrow the candidates down through the
+    # indexes, the rest are checked by scanning.
+    conditions: tuple
+
+    def select(self, items: typing.Iterable) -> list:
+        # one pass per condition, each over what the previous ones left, equality and membership go first as they
+        # tend to narrow things down the most
+        conditions = sorted(self.conditions, key=is_range_condition)
+        selected = items
+        for condition in conditions:
+            predicate = condition.get_predicate()
+            selected = [item for item in selected if predicate(item)]
+        return list(selected)
+
+    def get_candidate_positions(self, items: typing.Sequence, indexes: typing.Optional[DataGroupIndexes],
+                                list_path: typing.Optional[tuple]) -> typing.Optional[typing.List[int]]:
+        if indexes is None or list_path is None:
+            return None
+        positions = None
+        for condition in sorted(self.conditions, key=is_range_condition):
+            if positions is not None and is_range_condition(condition):
+                # ranges tend to match far more items than equality, checking the candidates is cheaper
+                break
+            condition_positions = self.find_condition_positions(condition, items, indexes, list_path)
+            if condition_positions is None:
+                continue
+            tracing.count(tracing.COUNTER_INDEX_LOOKUPS)
+            if positions is None:
+                positions = condition_positions
+            else:
+                positions = sorted(set(positions).intersection(condition_positions))
+        return positions
+
+    @staticmethod
+    def find_condition_positions(condition: Condition, items: typing.Sequence, indexes: DataGroupIndexes,
+                                 list_path: tuple) -> typing.Optional[typing.List[int]]:
+        if condition.operator in (OPERATOR_EQ, OPERATOR_IN):
+            index = indexes.get_index(list_path, condition.field)
+            return None if index is None else index.find_all_positions(items, condition.values)
+        sorted_index = indexes.get_sorted_index(list_path, condition.field)
+        if sorted_index is None:
+            return None
+        is_lower, inclusive = RANGE_BOUNDS[condition.operator]
+        if is_lower:
+            return sorted_index.find_range_positions(items, lower=condition.values[0], include_lower=inclusive)
+        return sorted_index.find_range_positions(items, upper=condition.values[0], include_upper=inclusive)
+
+    def apply(self, result: typing.Any, indexes: DataGroupIndexes = None, list_path: tuple = None) -> typing.Any:
+        # list_path is where the list sits in its data group, indexes are only looked up when it is known
+        if not isinstance(result, collections.abc.Sequence) or isinstance(result, (str, bytes)):
+            return result
+        items = unwrap(result)
+        positions = self.get_candidate_positions(items, indexes, list_path)
+        if positions is None:
+            tracing.count(tracing.COUNTER_LIST_ITEMS_SCANNED, len(items))
+            if isinstance(items, ColumnarList):
+                selected = select_records(items, [
+                    (condition.field, condition.values, RANGE_OPERATORS.get(condition.operator))
+                    for condition in self.conditions
+                ])
+                if selected is not None:
+                    return selected
+            return self.select(items)
+        # candidates are checked against every condition, which also covers an index that went stale
+        tracing.count(tracing.COUNTER_LIST_ITEMS_SCANNED, len(positions))
+        return self.select([items[position] for position in positions])
+
+
+def get_condition(name: str, query_value: str) -> Condition:
+    # ?last_name=Stevenson, ?age__gte=18, ?id__in=1,2,3 - a name whose suffix isn't an operator is a plain field
+    field, separator, operator_name = name.rpartition(OPERATOR_SEPARATOR)
+    if not separator or not field or operator_name not in OPERATORS:
+        field, operator_name = name, OPERATOR_EQ
+    if operator_name == OPERATOR_IN:
+        return Condition(field, operator_name, tuple(
+            value for query_value_part in query_value.split(",") for value in get_equality_values(query_value_part)
+        ))
+    if operator_name == OPERATOR_EQ:
+        return Condition(field, operator_name, get_equality_values(query_value))
+    return Condition(field, operator_name, (parse_filter_value(query_value),))
+
+
+def get_list_filter(query_params: dict) -> typing.Optional[ListFilter]:
+    conditions = tuple(
+        get_condition(name, query_value) for name, query_value in sorted(query_params.items())
+        if name not in RESERVED_PARAMETERS and not name.startswith("_")
+    )
+    return ListFilter(conditions) if conditions else None
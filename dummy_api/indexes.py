@@ -0,0 +1,287 @@
+import bisect
+import collections.abc
+import math
+import threading
+import typing
+
+UNINDEXED = object()
+# sort key ranks, numbers come before strings
+RANK_NUMBER = 0
+RANK_STRING = 1
+
+
+def get_sort_key(value: typing.Any) -> typing.Optional[tuple]:
+    # (rank, value), None for values that can't be ordered (null, lists, objects)
+    if isinstance(value, (int, float)):
+        return RANK_NUMBER, value
+    if isinstance(value, str):
+        return RANK_STRING, value
+    return None
+
+
+def get_item_sort_key(item: typing.Any, field: str) -> typing.Optional[tuple]:
+    return get_sort_key(item.get(field)) if isinstance(item, collections.abc.Mapping) else None
+
+
+def get_equality_key(value: typing.Any) -> tuple:
+    # True == 1 and both hash alike, keys keep booleans apart so ?active=true doesn't match 1 (like columnar lists)
+    return value.__class__ is bool, value
+
+
+class HashIndex:
+    # Maps a field value (its equality key) to the (ascending) positions of the list items holding it. The index is
+    # bound to the list object it was built from and rebuilds itself whenever it is handed a different list.
+
+    def __init__(self, field: str):
+        self.field = field
+        self.source = None
+        self.positions = {}
+        self.values = []
+        # items whose value can't be indexed (lists, non-mapping items), lookups can't rule those out
+        self.unindexed_count = 0
+        # lookups sync the index lazily, so concurrent readers of a group can still race on it
+        self.lock = threading.RLock()
+
+    def get_item_value(self, item: typing.Any) -> typing.Any:
+        if not isinstance(item, collections.abc.Mapping):
+            return UNINDEXED
+        value = item.get(self.field)
+        try:
+            hash(value)
+        except TypeError:
+            return UNINDEXED
+        return value
+
+    def rebuild(self, source: typing.Sequence):
+        self.source = source
+        self.positions = {}
+        self.values = []
+        self.unindexed_count = 0
+        self.add_items(source, 0)
+
+    def add_items(self, source: typing.Sequence, start: int):
+        for position in range(start, len(source)):
+            value = self.get_item_value(source[position])
+            self.values.append(value)
+            if value is UNINDEXED:
+                self.unindexed_count += 1
+            else:
+                self.positions.setdefault(get_equality_key(value), []).append(position)
+
+    def sync(self, source: typing.Sequence):
+        with self.lock:
+            self.sync_unlocked(source)
+
+    def sync_unlocked(self, source: typing.Sequence):
+        if source is not self.source or len(source) < len(self.values):
+            self.rebuild(source)
+        elif len(source) > len(self.values):
+            # items appended since the last sync, index only the new tail
+            self.add_items(source, len(self.values))
+
+    def update_position(self, source: typing.Sequence, position: int):
+        with self.lock:
+            self.update_position_unlocked(source, position)
+
+    def update_position_unlocked(self, source: typing.Sequence, position: int):
+        if source is not self.source or position >= len(self.values):
+            self.sync_unlocked(source)
+            return
+        old_value = self.values[position]
+        new_value = self.get_item_value(source[position])
+        if old_value is UNINDEXED:
+            self.unindexed_count -= 1
+        else:
+            old_positions = self.positions.get(get_equality_key(old_value), [])
+            if position in old_positions:
+                old_positions.remove(position)
+            if not old_positions:
+                self.positions.pop(get_equality_key(old_value), None)
+        self.values[position] = new_value
+        if new_value is UNINDEXED:
+            self.unindexed_count += 1
+        else:
+            bisect.insort(self.positions.setdefault(get_equality_key(new_value), []), position)
+
+    def is_consistent(self, source: typing.Sequence, position: int, key: tuple) -> bool:
+        if position >= len(source):
+            return False
+        item = source[position]
+        return isinstance(item, collections.abc.Mapping) and get_equality_key(item.get(self.field)) == key
+
+    def find_positions(self, source: typing.Sequence, value: typing.Any) -> typing.Optional[typing.List[int]]:
+        key = get_equality_key(value)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        with self.lock:
+            self.sync_unlocked(source)
+            positions = self.positions.get(key, [])
+            if positions and not self.is_consistent(source, positions[0], key):
+                # the list was changed behind the index's back (ie not through a DataMutator)
+                self.rebuild(source)
+                positions = self.positions.get(key, [])
+            return list(positions)
+
+    def find_all_positions(self, source: typing.Sequence,
+                           values: typing.Iterable) -> typing.Optional[typing.List[int]]:
+        # ascending positions of the items holding any of the values, None when the index can't tell for sure
+        positions = set()
+        for value in values:
+            value_positions = self.find_positions(source, value)
+            if value_positions is None:
+                return None
+            positions.update(value_positions)
+        with self.lock:
+            if self.unindexed_count:
+                return None
+        return sorted(positions)
+
+
+class SortedIndex:
+    # (rank, value, position) entries of the items of a list in the order of a field, plus the ascending positions of
+    # the items whose value can't be ordered. Bound to its list like HashIndex. The entries and unordered lists are
+    # replaced rather than changed in place, so readers keep a consistent snapshot of the order they were handed
+    # while the index moves on.
+
+    def __init__(self, field: str):
+        self.field = field
+        self.source = None
+        self.entries = []
+        self.unordered = []
+        self.item_keys = []
+        self.lock = threading.RLock()
+
+    def rebuild(self, source: typing.Sequence):
+        self.source = source
+        self.item_keys = []
+        self.entries = []
+        self.unordered = []
+        self.add_items(source, 0)
+
+    def add_items(self, source: typing.Sequence, start: int):
+        new_keys = [get_item_sort_key(source[position], self.field) for position in range(start, len(source))]
+        self.item_keys.extend(new_keys)
+        entries = list(self.entries)
+        entries.extend(key + (position,) for position, key in enumerate(new_keys, start) if key is not None)
+        # the existing entries are a sorted run already, which sorting takes advantage of
+        entries.sort()
+        self.entries = entries
+        self.unordered = self.unordered + [position for position, key in enumerate(new_keys, start) if key is None]
+
+    def sync(self, source: typing.Sequence):
+        with self.lock:
+            self.sync_unlocked(source)
+
+    def sync_unlocked(self, source: typing.Sequence):
+        if source is not self.source or len(source) < len(self.item_keys):
+            self.rebuild(source)
+        elif len(source) > len(self.item_keys):
+            self.add_items(source, len(self.item_keys))
+
+    def update_position(self, source: typing.Sequence, position: int):
+        with self.lock:
+            if source is not self.source or position >= len(self.item_keys):
+                self.sync_unlocked(source)
+                return
+            old_key = self.item_keys[position]
+            new_key = get_item_sort_key(source[position], self.field)
+            if old_key == new_key:
+                return
+            self.item_keys[position] = new_key
+            entries = list(self.entries)
+            unordered = list(self.unordered)
+            if old_key is None:
+                unordered.remove(position)
+            else:
+                del entries[bisect.bisect_left(entries, old_key + (position,))]
+            if new_key is None:
+                bisect.insort(unordered, position)
+            else:
+                bisect.insort(entries, new_key + (position,))
+            self.entries = entries
+            self.unordered = unordered
+
+    def is_consistent(self, source: typing.Sequence) -> bool:
+        # spot checks both ends, like HashIndex does for the items it finds
+        for rank, value, position in self.entries[:1] + self.entries[-1:]:
+            if position >= len(source) or get_item_sort_key(source[position], self.field) != (rank, value):
+                return False
+        return True
+
+    def get_entries(self, source: typing.Sequence) -> typing.Tuple[list, list]:
+        # (entries, unordered positions), neither is changed afterwards
+        with self.lock:
+            self.sync_unlocked(source)
+            if not self.is_consistent(source):
+                # the list was changed behind the index's back (ie not through a DataMutator)
+                self.rebuild(source)
+            return self.entries, self.unordered
+
+    def find_range_positions(self, source: typing.Sequence, lower: typing.Any = None, upper: typing.Any = None,
+                             include_lower: bool = True,
+                             include_upper: bool = True) -> typing.Optional[typing.List[int]]:
+        # ascending positions of the items between the bounds, by binary search. Bounds only match values of their
+        # own rank, as comparing numbers with strings matches nothing. None when the bounds can't be ordered.
+        bounds = [get_sort_key(bound) for bound in (lower, upper) if bound is not None]
+        if not bounds or None in bounds or len({rank for rank, value in bounds}) > 1:
+            return None
+        rank = bounds[0][0]
+        entries, unordered = self.get_entries(source)
+        start = bisect.bisect_left(entries, (rank,))
+        end = bisect.bisect_left(entries, (rank + 1,))
+        # (rank, value) sorts before every entry of that value, (rank, value, inf) after them
+        if lower is not None:
+            lower_key = (rank, lower) if include_lower else (rank, lower, math.inf)
+            start = max(start, bisect.bisect_left(entries, lower_key))
+        if upper is not None:
+            upper_key = (rank, upper, math.inf) if include_upper else (rank, upper)
+            end = min(end, bisect.bisect_left(entries, upper_key))
+        return sorted(entry[2] for entry in entries[start:end])
+
+
+class DataGroupIndexes:
+
+    def __init__(self):
+        self.indexes = {}
+        self.sorted_indexes = {}
+
+    def register_index(self, list_path: tuple, field: str) -> HashIndex:
+        return self.indexes.setdefault((list_path, field), HashIndex(field))
+
+    def register_sorted_index(self, list_path: tuple, field: str) -> SortedIndex:
+        return self.sorted_indexes.setdefault((list_path, field), SortedIndex(field))
+
+    def get_index(self, list_path: tuple, field: str) -> typing.Optional[HashIndex]:
+        return self.indexes.get((list_path, field))
+
+    def get_sorted_index(self, list_path: tuple, field: str) -> typing.Optional[SortedIndex]:
+        return self.sorted_indexes.get((list_path, field))
+
+    def get_list_indexes(self, list_path: tuple) -> typing.List[typing.Union[HashIndex, SortedIndex]]:
+        return [
+            index for indexes in (self.indexes, self.sorted_indexes)
+            for (path, field), index in indexes.items() if path == list_path
+        ]
+
+    def has_indexes(self) -> bool:
+        return len(self.indexes) > 0 or len(self.sorted_indexes) > 0
+
+    def retain(self, index_targets: typing.Iterable[tuple],
+               sorted_index_targets: typing.Iterable[tuple]) -> "DataGroupIndexes":
+        # a copy holding only the given targets, the ones already registered keep the index built for them
+        group_indexes = DataGroupIndexes()
+        for list_path, field in index_targets:
+            group_indexes.indexes[(list_path, field)] = self.register_index(list_path, field)
+        for list_path, field in sorted_index_targets:
+            group_indexes.sorted_indexes[(list_path, field)] = self.register_sorted_index(list_path, field)
+        return group_indexes
+
+    def record_append(self, list_path: tuple, source: typing.Sequence):
+        for index in self.get_list_indexes(list_path):
+            index.sync(source)
+
+    def record_item_change(self, list_path: tuple, source: typing.Sequence, position: int):
+        for index in self.get_list_indexes(list_path):
+            index.update_position(source, position)
@@ -0,0 +1,231 @@
+import contextlib
+import gc
+import json
+import mmap
+import re
+import typing
+
+WHITESPACE_REGEX = re.compile(rb"[ \t\n\r]*")
+STRING_REGEX = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+STRING_TAIL_REGEX = re.compile(rb'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+# strings are matched whole so brackets inside them are skipped
+STRUCTURE_REGEX = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]', re.DOTALL)
+SCALAR_REGEX = re.compile(rb"[^,\]}\s]+")
+SCAN_CHUNK_SIZE = 64 * 1024
+MIN_SCAN_CHUNK_SIZE = 256
+NON_STRUCTURE_BYTES = bytes(byte for byte in range(256) if byte not in b'[]{}"')
+
+
+class RoutesFileFormatError(ValueError):
+    pass
+
+
+@contextlib.contextmanager
+def paused_garbage_collection():
+    # Decoding allocates millions of objects that all survive, which makes the cyclic collector rescan the growing
+    # heap over and over for nothing. Pausing it typically halves decode times.
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+class JsonSpanScanner:
+    # Finds where JSON values start and end in a buffer without decoding them. The buffer can be bytes or an mmap,
+    # only the values that are asked for get decoded.
+
+    def __init__(self, buffer: typing.Union[bytes, mmap.mmap]):
+        self.buffer = buffer
+
+    def skip_whitespace(self, position: int) -> int:
+        return WHITESPACE_REGEX.match(self.buffer, position).end()
+
+    def peek(self, position: int) -> bytes:
+        position = self.skip_whitespace(position)
+        return self.buffer[position:position + 1]
+
+    def expect(self, position: int, token: bytes) -> int:
+        position = self.skip_whitespace(position)
+        if self.buffer[position:position + 1] != token:
+            raise RoutesFileFormatError(f"Expected {token.decode()!r} at byte {position}")
+        return position + 1
+
+    def skip_value(self, position: int) -> int:
+        position = self.skip_whitespace(position)
+        first = self.buffer[position:position + 1]
+        if first == b'"':
+            return self.skip_string(position)
+        if first not in (b"{", b"["):
+            match = SCALAR_REGEX.match(self.buffer, position)
+            if match is None:
+                raise RoutesFileFormatError(f"Expected a value at byte {position}")
+            return match.end()
+
+        return self.skip_container(position)
+
+    def skip_container(self, position: int) -> int:
+        # Walking every token from Python is several times slower than json.loads, so whole chunks are skipped with
+        # bytes operations instead: blank out escapes, keep only brackets and quotes, drop string contents and cancel
+        # out matched brackets. The chunk the container closes in is halved until it is small enough to be walked
+        # token by token.
+        depth = 1
+        in_string = False
+        chunk_start = position + 1
+        chunk_size = SCAN_CHUNK_SIZE
+        buffer_size = len(self.buffer)
+        while True:
+            if chunk_start >= buffer_size:
+                raise RoutesFileFormatError(f"Unterminated value starting at byte {position}")
+            chunk_end = min(chunk_start + chunk_size, buffer_size)
+            while self.buffer[chunk_end - 1:chunk_end] == b"\\" and chunk_end < buffer_size:
+                # never split an escape sequence between chunks
+                chunk_end += 1
+            chunk = self.buffer[chunk_start:chunk_end]
+            if b"\\" in chunk:
+                chunk = chunk.replace(b"\\\\", b"__").replace(b'\\"', b"__")
+
+            # with escapes blanked out every quote opens or closes a string, so string contents are every other part
+            parts = chunk.translate(None, NON_STRUCTURE_BYTES).split(b'"')
+            unmatched = self.cancel_matched_brackets(b"".join(parts[1::2] if in_string else parts[0::2]))
+            closing_count = len(unmatched) - len(unmatched.lstrip(b"]}"))
+            if closing_count >= depth:
+                if chunk_size <= MIN_SCAN_CHUNK_SIZE:
+                    break
+                chunk_size //= 2
+                continue
+            depth += len(unmatched) - 2 * closing_count
+            in_string ^= len(parts) % 2 == 0
+            chunk_start = chunk_end
+
+        if in_string:
+            chunk_start = self.skip_string_tail(chunk_start)
+        for match in STRUCTURE_REGEX.finditer(self.buffer, chunk_start):
+            token = match.group()
+            if token in (b"{", b"["):
+                depth += 1
+            elif token in (b"}", b"]"):
+                depth -= 1
+                if depth == 0:
+                    return match.end()
+        raise RoutesFileFormatError(f"Unterminated value starting at byte {position}")
+
+    @staticmethod
+    def cancel_matched_brackets(brackets: bytes) -> bytes:
+        # what's left is the chunk's unmatched closing brackets followed by its unmatched opening ones
+        while True:
+            reduced = brackets.replace(b"{}", b"").replace(b"[]", b"")
+            if len(reduced) == len(brackets):
+                return reduced
+            brackets = reduced
+
+    def skip_string_tail(self, position: int) -> int:
+        # position is inside a string, returns the position after its closing quote
+        match = STRING_TAIL_REGEX.match(self.buffer, position)
+        if match is None:
+            raise RoutesFileFormatError(f"Unterminated string at byte {position}")
+        return match.end()
+
+    def skip_string(self, position: int) -> int:
+        match = STRING_REGEX.match(self.buffer, position)
+        if match is None:
+            raise RoutesFileFormatError(f"Unterminated string at byte {position}")
+        return match.end()
+
+    def decode(self, start: int, end: int) -> typing.Any:
+        with paused_garbage_collection():
+            return json.loads(self.buffer[start:end])
+
+    def iter_object_spans(self, position: int, scan_members: dict = None) -> typing.Iterator[typing.Tuple[str, int, int]]:
+        # Yields (key, value start, value end) for every member of the object starting at position. Values of the
+        # keys in scan_members are scanned by that callable (returning the value's end) instead of being skipped.
+        scan_members = scan_members or {}
+        position = self.expect(position, b"{")
+        if self.peek(position) == b"}":
+            return
+        while True:
+            key_start = self.skip_whitespace(position)
+            key_end = self.skip_string(key_start)
+            key = self.decode(key_start, key_end)
+            value_start = self.skip_whitespace(self.expect(key_end, b":"))
+            value_end = scan_members.get(key, self.skip_value)(value_start)
+            yield key, value_start, value_end
+            if self.peek(value_end) == b"}":
+                return
+            position = self.expect(value_end, b",")
+
+    def iter_array_spans(self, position: int, scan_item: callable = None) -> typing.Iterator[typing.Tuple[int, int]]:
+        scan_item = scan_item or self.skip_value
+        position = self.expect(position, b"[")
+        if self.peek(position) == b"]":
+            return
+        while True:
+            value_start = self.skip_whitespace(position)
+            value_end = scan_item(value_start)
+            yield value_start, value_end
+            if self.peek(value_end) == b"]":
+                return
+            position = self.expect(value_end, b",")
+
+
+class RoutesFileIndex:
+    # Index of a routes file: the routes themselves are decoded right away, every data group is only located. A group's
+    # data is decoded when its loader is first called, so groups nobody requests are never materialized. With
+    # use_mmap the file is mapped instead of read, and only the pages of groups that do get loaded are touched.
+
+    def __init__(self, file_path: str, use_mmap: bool = False):
+        self.file_path = file_path
+        self.file = open(file_path, "rb")
+        if use_mmap:
+            self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.buffer = self.file.read()
+            self.file.close()
+        self.scanner = JsonSpanScanner(self.buffer)
+        self.routes = []
+        self.group_spans = {}
+        self.build()
+
+    def build(self):
+        # every byte is only scanned once: data_groups is walked while the top level object is
+        for key, start, end in self.scanner.iter_object_spans(0, {"data_groups": self.add_group_spans}):
+            if key == "routes":
+                self.routes = self.scanner.decode(start, end)
+
+    def add_group_spans(self, position: int) -> int:
+        end = self.scanner.expect(position, b"[")
+        for group_start, end in self.scanner.iter_array_spans(position, self.add_group_span):
+            pass
+        return self.scanner.expect(end, b"]")
+
+    def add_group_span(self, position: int) -> int:
+        group_name = None
+        data_span = None
+        end = self.scanner.expect(position, b"{")
+        for key, start, end in self.scanner.iter_object_spans(position):
+            if key == "group_name":
+                group_name = self.scanner.decode(start, end)
+            elif key == "data":
+                data_span = (start, end)
+        # same as the eager loader: a group without data still exists, holding None
+        self.group_spans.setdefault(group_name, data_span)
+        return self.scanner.expect(end, b"}")
+
+    def get_group_names(self) -> typing.List[str]:
+        return list(self.group_spans)
+
+    def load_group(self, group_name: str) -> typing.Any:
+        data_span = self.group_spans[group_name]
+        if data_span is None:
+            return None
+        return self.scanner.decode(*data_span)
+
+    def get_group_loader(self, group_name: str) -> callable:
+        return lambda: self.load_group(group_name)
+
+    def close(self):
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+            self.file.close()
@@ -0,0 +1,32 @@
+import typing
+from dummy_api.aggregation import Aggregation, get_aggregation
+from dummy_api.filtering import ListFilter, get_list_filter
+from dummy_api.indexes import DataGroupIndexes
+from dummy_api.sorting import SortOrder, get_sort_order
+
+
+class ListQuery(typing.NamedTuple):
+    # What a GET's query parameters ask of a list result, on top of the route's query: filter it, aggregate what's
+    # left and sort that. Paging and projection happen later, on the response (see Route.find_data).
+    list_filter: typing.Optional[ListFilter]
+    aggregation: typing.Optional[Aggregation]
+    sort_order: typing.Optional[SortOrder]
+
+    @staticmethod
+    def from_query_params(query_params: dict) -> typing.Optional["ListQuery"]:
+        list_query = ListQuery(
+            get_list_filter(query_params), get_aggregation(query_params), get_sort_order(query_params)
+        )
+        return None if list_query == (None, None, None) else list_query
+
+    def apply(self, result: typing.Any, indexes: DataGroupIndexes = None, list_path: tuple = None) -> typing.Any:
+        # list_path is where result sits in its data group, only the group's own lists are covered by its indexes
+        if self.list_filter is not None:
+            result = self.list_filter.apply(result, indexes, list_path)
+            list_path = None
+        if self.aggregation is not None:
+            result = self.aggregation.apply(result)
+            list_path = None
+        if self.sort_order is not None:
+            result = self.sort_order.apply(result, indexes, list_path)
+        return result
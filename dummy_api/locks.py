@@ -0,0 +1,78 @@
+import contextlib
+import threading
+
+
+class ReadWriteLock:
+    # Many concurrent readers or a single writer. Waiting writers block new readers so a steady stream of reads
+    # can't starve writes. Both sides are reentrant, and a thread holding the write lock may also read, but a
+    # thread holding only a read lock can't upgrade to a write lock.
+
+    def __init__(self):
+        self.condition = threading.Condition(threading.Lock())
+        self.active_readers = 0
+        self.waiting_writers = 0
+        self.writer = None
+        self.writer_depth = 0
+        self.local = threading.local()
+
+    def is_held_by_current_thread(self) -> bool:
+        return getattr(self.local, "read_depth", 0) > 0 or self.writer == threading.get_ident()
+
+    def acquire_read(self):
+        read_depth = getattr(self.local, "read_depth", 0)
+        if read_depth > 0 or self.writer == threading.get_ident():
+            self.local.read_depth = read_depth + 1
+            return
+        with self.condition:
+            while self.writer is not None or self.waiting_writers > 0:
+                self.condition.wait()
+            self.active_readers += 1
+        self.local.read_depth = 1
+        self.local.counted_reader = True
+
+    def release_read(self):
+        self.local.read_depth -= 1
+        if self.local.read_depth == 0 and getattr(self.local, "counted_reader", False):
+            self.local.counted_reader = False
+            with self.condition:
+                self.active_readers -= 1
+                if self.active_readers == 0:
+                    self.condition.notify_all()
+
+    def acquire_write(self):
+        current_thread = threading.get_ident()
+        if self.writer == current_thread:
+            self.writer_depth += 1
+            return
+        if getattr(self.local, "read_depth", 0) > 0:
+            raise RuntimeError("Cannot upgrade a read lock to a write lock")
+        with self.condition:
+            self.waiting_writers += 1
+            while self.writer is not None or self.active_readers > 0:
+                self.condition.wait()
+            self.waiting_writers -= 1
+            self.writer = current_thread
+            self.writer_depth = 1
+
+    def release_write(self):
+        self.writer_depth -= 1
+        if self.writer_depth == 0:
+            with self.condition:
+                self.writer = None
+                self.condition.notify_all()
+
+    @contextlib.contextmanager
+    def read(self):
+        self.acquire_read()
+        try:
+            yield self
+        finally:
+            self.release_read()
+
+    @contextlib.contextmanager
+    def write(self):
+        self.acquire_write()
+        try:
+            yield self
+        finally:
+            self.release_write()
@@ -0,0 +1,179 @@
+import itertools
+import threading
+import time
+import typing
+from bisect import bisect_left
+
+# upper bounds in seconds, the last bucket (+Inf) catches everything above
+LATENCY_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+    2.5
+)
+PHASE_MATCH = "match"
+PHASE_RESOLVE = "resolve"
+PHASE_SERIALIZE = "serialize"
+PHASE_TOTAL = "total"
+RESULT_OK = "ok"
+RESULT_NOT_FOUND = "not_found"
+RESULT_NOT_MODIFIED = "not_modified"
+RESULT_BAD_REQUEST = "bad_request"
+RESULT_ERROR = "error"
+METRIC_PREFIX = "dummy_api"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class RequestTimings:
+    # perf_counter readings taken as a request goes through RoutesProvider.render_request, resolved and serialized
+    # stay None when the body came from the response cache or wasn't needed (304, bad requests), cache_hit tells
+    # which of those it was. not_found is set when the route had nothing to answer with.
+    __slots__ = ("started", "matched", "resolved", "serialized", "cache_hit", "not_found")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.matched = None
+        self.resolved = None
+        self.serialized = None
+        self.cache_hit = False
+        self.not_found = False
+
+
+class Histogram:
+    __slots__ = ("bucket_counts", "sum")
+
+    def __init__(self):
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.bucket_counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+
+    def get_cumulative_counts(self) -> typing.List[int]:
+        return list(itertools.accumulate(self.bucket_counts))
+
+
+class RouteMetrics:
+    # Everything recorded for one route and request method. A request is recorded under a single lock acquisition,
+    # and routes never contend with each other.
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.results = {}
+        self.cache_hits = 0
+        self.match = Histogram()
+        self.resolve = Histogram()
+        self.serialize = Histogram()
+        self.total = Histogram()
+
+    def get_phases(self) -> typing.Dict[str, Histogram]:
+        return {
+            PHASE_MATCH: self.match,
+            PHASE_RESOLVE: self.resolve,
+            PHASE_SERIALIZE: self.serialize,
+            PHASE_TOTAL: self.total
+        }
+
+    def record(self, result: str, timings: RequestTimings, finished: float):
+        # runs on every request: Histogram.observe is inlined, method calls cost about as much as the rest of it
+        match_s = timings.matched - timings.started
+        total_s = finished - timings.started
+        with self.lock:
+            self.results[result] = self.results.get(result, 0) + 1
+            self.match.bucket_counts[bisect_left(LATENCY_BUCKETS, match_s)] += 1
+            self.match.sum += match_s
+            if timings.cache_hit:
+                self.cache_hits += 1
+            elif timings.serialized is not None:
+                resolve_s = timings.resolved - timings.matched
+                serialize_s = timings.serialized - timings.resolved
+                self.resolve.bucket_counts[bisect_left(LATENCY_BUCKETS, resolve_s)] += 1
+                self.resolve.sum += resolve_s
+                self.serialize.bucket_counts[bisect_left(LATENCY_BUCKETS, serialize_s)] += 1
+                self.serialize.sum += serialize_s
+            self.total.bucket_counts[bisect_left(LATENCY_BUCKETS, total_s)] += 1
+            self.total.sum += total_s
+
+
+def escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def format_labels(labels: dict) -> str:
+    return "{" + ",".join(f'{name}="{escape_label_value(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def format_value(value: typing.Union[int, float]) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    # Per route and request method request counts and latency histograms of every phase of a request, rendered in
+    # the Prometheus text exposition format. Routes are labelled by their pattern, so the number of series is bounded
+    # by the routes file rather than by the requests made.
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.route_metrics = {}
+        self.lock = threading.Lock()
+
+    def get_route_metrics(self, route_pattern: str, method: str) -> RouteMetrics:
+        route_metrics = self.route_metrics.get((route_pattern, method))
+        if route_metrics is None:
+            with self.lock:
+                route_metrics = self.route_metrics.setdefault((route_pattern, method), RouteMetrics())
+        return route_metrics
+
+    def record_request(self, route_pattern: str, method: str, result: str, timings: RequestTimings):
+        if not self.enabled:
+            return
+        finished = time.perf_counter()
+        route_metrics = self.route_metrics.get((route_pattern, method))
+        if route_metrics is None:
+            route_metrics = self.get_route_metrics(route_pattern, method)
+        route_metrics.record(result, timings, finished)
+
+    def render(self, response_cache_stats: dict = None) -> bytes:
+        requests_name = f"{METRIC_PREFIX}_requests_total"
+        cache_hits_name = f"{METRIC_PREFIX}_response_cache_hits_total"
+        duration_name = f"{METRIC_PREFIX}_request_duration_seconds"
+        lines = [
+            f"# HELP {requests_name} Requests handled, by route pattern, method and result.",
+            f"# TYPE {requests_name} counter"
+        ]
+        route_snapshots = []
+        for (route_pattern, method), route_metrics in sorted(self.route_metrics.items()):
+            with route_metrics.lock:
+                route_snapshots.append((
+                    {"route": route_pattern, "method": method},
+                    dict(route_metrics.results),
+                    route_metrics.cache_hits,
+                    {phase: (histogram.get_cumulative_counts(), histogram.sum)
+                     for phase, histogram in route_metrics.get_phases().items()}
+                ))
+
+        for labels, results, cache_hits, phases in route_snapshots:
+            for result, count in sorted(results.items()):
+                lines.append(f"{requests_name}{format_labels({**labels, 'result': result})} {count}")
+        lines += [
+            f"# HELP {cache_hits_name} Requests answered from the response cache, by route pattern and method.",
+            f"# TYPE {cache_hits_name} counter"
+        ]
+        for labels, results, cache_hits, phases in route_snapshots:
+            lines.append(f"{cache_hits_name}{format_labels(labels)} {cache_hits}")
+        lines += [
+            f"# HELP {duration_name} Time spent in each phase of a request (match, resolve, serialize and total).",
+            f"# TYPE {duration_name} histogram"
+        ]
+        for labels, results, cache_hits, phases in route_snapshots:
+            for phase, (cumulative_counts, total) in phases.items():
+                phase_labels = {**labels, "phase": phase}
+                for upper_bound, bucket_count in zip(LATENCY_BUCKETS + ("+Inf",), cumulative_counts):
+                    bucket_labels = format_labels({**phase_labels, "le": upper_bound})
+                    lines.append(f"{duration_name}_bucket{bucket_labels} {bucket_count}")
+                lines.append(f"{duration_name}_sum{format_labels(phase_labels)} {format_value(total)}")
+                lines.append(f"{duration_name}_count{format_labels(phase_labels)} {cumulative_counts[-1]}")
+
+        for name, value in sorted((response_cache_stats or {}).items()):
+            metric_name = f"{METRIC_PREFIX}_response_cache_{name}"
+            lines += [f"# TYPE {metric_name} gauge", f"{metric_name} {format_value(value)}"]
+        return ("\n".join(lines) + "\n").encode("utf-8")
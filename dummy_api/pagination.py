@@ -0,0 +1,113 @@
+import base64
+import binascii
+import collections.abc
+import json
+import typing
+from dummy_api.request import QueryParameterError
+from dummy_api.views import unwrap
+
+LIMIT_PARAMETER = "limit"
+OFFSET_PARAMETER = "offset"
+CURSOR_PARAMETER = "cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# items are expected to carry a unique id under this key, cursors use it to find their place again
+CURSOR_ANCHOR_FIELD = "id"
+
+
+class PaginationError(QueryParameterError):
+    pass
+
+
+class PageRequest(typing.NamedTuple):
+    limit: typing.Optional[int]
+    offset: int
+    cursor: typing.Optional[typing.Tuple[int, typing.Any]]
+
+    @staticmethod
+    def from_query_params(query_params: dict) -> typing.Optional["PageRequest"]:
+        # None when the request doesn't ask for a page, so the whole list is returned as before
+        if not any(name in query_params for name in (LIMIT_PARAMETER, OFFSET_PARAMETER, CURSOR_PARAMETER)):
+            return None
+        if OFFSET_PARAMETER in query_params and CURSOR_PARAMETER in query_params:
+            raise PaginationError(f"Use either '{OFFSET_PARAMETER}' or '{CURSOR_PARAMETER}', not both")
+        limit = query_params.get(LIMIT_PARAMETER)
+        cursor = query_params.get(CURSOR_PARAMETER)
+        return PageRequest(
+            None if limit is None else parse_count(LIMIT_PARAMETER, limit),
+            parse_count(OFFSET_PARAMETER, query_params.get(OFFSET_PARAMETER, "0")),
+            None if cursor is None else decode_cursor(cursor)
+        )
+
+
+class Page(typing.NamedTuple):
+    items: typing.Sequence
+    total_count: int
+    next_cursor: typing.Optional[str]
+
+    def get_headers(self) -> dict:
+        headers = {TOTAL_COUNT_HEADER: str(self.total_count)}
+        if self.next_cursor is not None:
+            headers[NEXT_CURSOR_HEADER] = self.next_cursor
+        return headers
+
+
+def parse_count(name: str, value: str) -> int:
+    try:
+        count = int(value)
+    except ValueError:
+        raise PaginationError(f"'{name}' must be a whole number") from None
+    if count < 0:
+        raise PaginationError(f"'{name}' must not be negative")
+    return count
+
+
+def encode_cursor(position: int, anchor: typing.Any) -> str:
+    return base64.urlsafe_b64encode(json.dumps([position, anchor]).encode("utf-8")).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> typing.Tuple[int, typing.Any]:
+    try:
+        position, anchor = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError, binascii.Error):
+        raise PaginationError("Invalid cursor") from None
+    if not isinstance(position, int) or position < 0:
+        raise PaginationError("Invalid cursor")
+    return position, anchor
+
+
+def get_anchor(item: typing.Any) -> typing.Any:
+    if not isinstance(item, collections.abc.Mapping):
+        return None
+    anchor = item.get(CURSOR_ANCHOR_FIELD)
+    return anchor if isinstance(anchor, (str, int, float, bool)) else None
+
+
+def find_cursor_start(items: typing.Sequence, position: int, anchor: typing.Any) -> int:
+    # A cursor points just past the item it was taken after. Appends never move items, so that item is normally
+    # still right before the position; if items were removed or inserted ahead of it, it is looked up again.
+    if anchor is None or (0 < position <= len(items) and get_anchor(items[position - 1]) == anchor):
+        return min(position, len(items))
+    for item_position, item in enumerate(items):
+        if get_anchor(item) == anchor:
+            return item_position + 1
+    # the item is gone, the position is the best guess left
+    return min(position, len(items))
+
+
+def paginate(result: typing.Any, page_request: PageRequest) -> typing.Any:
+    # Only list results are paged. Slicing the read-only view only copies the references of the page's items,
+    # and only those items get serialized.
+    if not isinstance(result, collections.abc.Sequence) or isinstance(result, (str, bytes)):
+        return result
+    items = unwrap(result)
+    total_count = len(items)
+    if page_request.cursor is None:
+        start = min(page_request.offset, total_count)
+    else:
+        start = find_cursor_start(items, *page_request.cursor)
+    end = total_count if page_request.limit is None else min(start + page_request.limit, total_count)
+    next_cursor = None
+    if end < total_count:
+        next_cursor = encode_cursor(end, get_anchor(items[end - 1]) if end > 0 else None)
+    return Page(result[start:end], total_count, next_cursor)
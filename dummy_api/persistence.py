@@ -0,0 +1,292 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import typing
+from dummy_api.backends import InMemoryBackend
+from dummy_api.indexes import DataGroupIndexes
+from dummy_api.query_plan import QueryPlan, compile_query_path
+from dummy_api.serialization import encode_json
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COMMIT_INTERVAL = 0.01
+DEFAULT_SNAPSHOT_INTERVAL = 10000
+SNAPSHOT_FILE_NAME = "snapshot.jsonl"
+SEGMENT_PREFIX = "mutations-"
+SEGMENT_SUFFIX = ".log"
+
+OPERATION_UPDATE = "update"
+OPERATION_SET = "set"
+OPERATION_DELETE = "delete"
+# bulk POSTs, see QueryPlan.append_items
+OPERATION_APPEND = "append"
+
+
+class RecoveredState(typing.NamedTuple):
+    groups: dict
+    deleted_groups: set
+    records: list
+    # records for groups that only exist once they are seeded from the routes file, by group name
+    pending_records: dict
+
+
+class MutationLog:
+    # Append-only log of data group mutations plus a compacted snapshot, kept in one directory.
+    #
+    # Appends only encode the record and queue it, a background thread writes and fsyncs whatever queued up since its
+    # last pass in one go (group commit). Every snapshot_interval records the same thread rotates to a new log segment,
+    # asks the owner for a snapshot of every group and drops the segments the snapshot covers, so recovery only ever
+    # replays the records written since the last snapshot.
+    #
+    # Snapshot lines carry the sequence number of the last record already applied to that group, owners have to take
+    # it (get_last_seq) while holding the group's write-excluding lock and append a group's records under that same
+    # lock.
+
+    def __init__(self, directory: str, commit_interval: float = DEFAULT_COMMIT_INTERVAL,
+                 snapshot_interval: int = DEFAULT_SNAPSHOT_INTERVAL):
+        self.directory = directory
+        self.commit_interval = commit_interval
+        self.snapshot_interval = snapshot_interval
+        self.lock = threading.Lock()
+        self.commit_condition = threading.Condition(self.lock)
+        self.pending = []
+        self.last_seq = 0
+        self.committed_seq = 0
+        self.records_since_snapshot = 0
+        self.segment_file = None
+        self.snapshot_fn = None
+        self.commit_thread = None
+        self.closed = False
+        os.makedirs(directory, exist_ok=True)
+
+    def get_snapshot_path(self) -> str:
+        return os.path.join(self.directory, SNAPSHOT_FILE_NAME)
+
+    def get_segment_path(self, first_seq: int) -> str:
+        return os.path.join(self.directory, f"{SEGMENT_PREFIX}{first_seq:020d}{SEGMENT_SUFFIX}")
+
+    def get_segment_paths(self) -> typing.List[typing.Tuple[int, str]]:
+        segments = []
+        for file_name in os.listdir(self.directory):
+            if file_name.startswith(SEGMENT_PREFIX) and file_name.endswith(SEGMENT_SUFFIX):
+                first_seq = int(file_name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+                segments.append((first_seq, os.path.join(self.directory, file_name)))
+        return sorted(segments)
+
+    def get_last_seq(self) -> int:
+        return self.last_seq
+
+    @staticmethod
+    def read_lines(path: str) -> typing.Iterator[dict]:
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # a torn write at the tail of the file, nothing after it was ever acknowledged as committed
+                    return
+
+    def recover(self) -> RecoveredState:
+        groups = {}
+        deleted_groups = set()
+        group_seqs = {}
+        if os.path.exists(self.get_snapshot_path()):
+            for entry in self.read_lines(self.get_snapshot_path()):
+                group_seqs[entry["group"]] = entry["seq"]
+                self.last_seq = max(self.last_seq, entry["seq"])
+                if entry.get("deleted"):
+                    deleted_groups.add(entry["group"])
+                else:
+                    groups[entry["group"]] = entry["data"]
+
+        records = []
+        for first_seq, path in self.get_segment_paths():
+            for record in self.read_lines(path):
+                self.last_seq = max(self.last_seq, record["seq"])
+                if record["seq"] > group_seqs.get(record["group"], 0):
+                    records.append(record)
+        self.committed_seq = self.last_seq
+        self.records_since_snapshot = len(records)
+        return RecoveredState(groups, deleted_groups, records, {})
+
+    def start(self, snapshot_fn: callable = None):
+        self.snapshot_fn = snapshot_fn
+        self.segment_file = open(self.get_segment_path(self.last_seq + 1), "ab")
+        self.commit_thread = threading.Thread(target=self.run_commits, name="dummy-api-mutation-log", daemon=True)
+        self.commit_thread.start()
+        atexit.register(self.close)
+
+    def append(self, operation: str, group_name: str, query_string: str = None, data: typing.Any = None,
+               params: dict = None) -> int:
+        record = {"op": operation, "group": group_name}
+        if query_string is not None:
+            record["query"] = query_string
+            record["params"] = params or {}
+        if operation != OPERATION_DELETE:
+            record["data"] = data
+        with self.lock:
+            self.last_seq += 1
+            record["seq"] = self.last_seq
+            # encoded right away, the data is live and may be changed again before the commit thread gets to it
+            self.pending.append(encode_json(record) + b"\n")
+            self.records_since_snapshot += 1
+            self.commit_condition.notify_all()
+            return self.last_seq
+
+    def flush(self, timeout: float = None) -> bool:
+        # blocks until every record appended so far is on disk
+        with self.lock:
+            target_seq = self.last_seq
+            self.commit_condition.notify_all()
+            return self.commit_condition.wait_for(lambda: self.committed_seq >= target_seq or self.closed, timeout)
+
+    def run_commits(self):
+        while True:
+            with self.lock:
+                self.commit_condition.wait_for(lambda: self.pending or self.closed)
+                if self.closed and not self.pending:
+                    return
+            # let more appends pile up so they share a single fsync
+            time.sleep(self.commit_interval)
+            self.commit_pending()
+            if self.snapshot_fn and self.records_since_snapshot >= self.snapshot_interval:
+                self.write_snapshot()
+
+    def commit_pending(self, rotate: bool = False) -> int:
+        with self.lock:
+            pending, self.pending = self.pending, []
+            seq = self.last_seq
+            if rotate:
+                self.records_since_snapshot = 0
+        if pending:
+            self.segment_file.write(b"".join(pending))
+            self.segment_file.flush()
+            os.fsync(self.segment_file.fileno())
+        if rotate:
+            self.segment_file.close()
+            self.segment_file = open(self.get_segment_path(seq + 1), "ab")
+        with self.lock:
+            self.committed_seq = max(self.committed_seq, seq)
+            self.commit_condition.notify_all()
+        return seq
+
+    def write_snapshot(self):
+        # Everything up to the rotation point ends up in the snapshot, because every group's snapshot seq is taken
+        # after it. Records appended while the snapshot is taken go to the new segment and are replayed (or skipped
+        # by seq) on recovery.
+        rotated_seq = self.commit_pending(rotate=True)
+        group_snapshots = self.snapshot_fn()
+        if group_snapshots is None:
+            # the owner can't take one yet, try again after the next snapshot_interval records
+            return
+        snapshot_path = self.get_snapshot_path()
+        temporary_path = snapshot_path + ".tmp"
+        with open(temporary_path, "wb") as f:
+            for group_name, (seq, encoded_data) in group_snapshots.items():
+                if encoded_data is None:
+                    f.write(encode_json({"group": group_name, "seq": seq, "deleted": True}) + b"\n")
+                else:
+                    header = encode_json({"group": group_name, "seq": seq})
+                    f.write(header[:-1] + b',"data":' + encoded_data + b"}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary_path, snapshot_path)
+        self.sync_directory()
+        for first_seq, path in self.get_segment_paths():
+            if first_seq <= rotated_seq:
+                os.remove(path)
+
+    def sync_directory(self):
+        if hasattr(os, "O_DIRECTORY"):
+            directory_fd = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(directory_fd)
+            finally:
+                os.close(directory_fd)
+
+    def close(self):
+        if self.commit_thread is None:
+            return
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.commit_condition.notify_all()
+        self.commit_thread.join()
+        self.commit_pending()
+        self.segment_file.close()
+
+
+def replay_record(backend: InMemoryBackend, record: dict, deleted_groups: set):
+    group_name = record["group"]
+    if record["op"] == OPERATION_DELETE:
+        if backend.has_group(group_name):
+            backend.delete_group(group_name)
+        deleted_groups.add(group_name)
+    elif record["op"] == OPERATION_SET:
+        backend.set_group(group_name, record["data"])
+        deleted_groups.discard(group_name)
+    else:
+        try:
+            apply_group_change(
+                backend, group_name, record["op"], compile_query_path(record["query"]), record["data"], record["params"]
+            )
+        except Exception:
+            # updates are logged even when they fail part way, replaying them fails at the same point
+            logger.warning(
+                "Could not replay %s of group '%s' (seq %s)", record["op"], group_name, record.get("seq"), exc_info=True
+            )
+
+
+def apply_group_change(backend: InMemoryBackend, group_name: str, operation: str, query_plan: QueryPlan,
+                       data: typing.Any, params: dict, indexes: DataGroupIndexes = None) -> typing.Any:
+    # updates and bulk appends, the changes that are replayed rather than stored whole
+    if operation == OPERATION_APPEND:
+        return backend.append_group_items(group_name, query_plan, data, params, indexes)
+    return backend.update_group(group_name, query_plan, data, params, indexes)
+
+
+def replay_mutations(backend: InMemoryBackend, state: RecoveredState) -> typing.Set[str]:
+    # Applies recovered state straight to the backend, returns the names of the groups it changed. Updates to groups
+    # the backend doesn't hold yet are kept in state.pending_records until the group gets seeded.
+    changed_groups = set(state.groups) | state.deleted_groups
+    for group_name, data in state.groups.items():
+        backend.set_group(group_name, data)
+    for record in state.records:
+        group_name = record["group"]
+        if group_name in state.pending_records or (
+                record["op"] in (OPERATION_UPDATE, OPERATION_APPEND) and not backend.has_group(group_name)):
+            state.pending_records.setdefault(group_name, []).append(record)
+            continue
+        changed_groups.add(group_name)
+        replay_record(backend, record, state.deleted_groups)
+    return changed_groups
+
+
+def replay_pending_mutations(backend: InMemoryBackend, state: RecoveredState, group_name: str) -> bool:
+    # called once a group has been seeded, returns whether anything was replayed
+    records = state.pending_records.pop(group_name, [])
+    for record in records:
+        replay_record(backend, record, state.deleted_groups)
+    return len(records) > 0
+
+
+def discard_pending_mutations(state: RecoveredState) -> int:
+    # Called once seeding is done: groups that weren't seeded by then (ie their route was removed) never will be, and
+    # keeping their records would keep snapshots from being taken for good
+    discarded_count = 0
+    for group_name, records in state.pending_records.items():
+        logger.warning("Discarding %d logged mutations of group '%s', which was never seeded", len(records), group_name)
+        discarded_count += len(records)
+    state.pending_records.clear()
+    return discarded_count
+
+
+def get_environment_mutation_log() -> typing.Optional[MutationLog]:
+    data_directory = os.environ.get("DUMMY_API_DATA_DIR")
+    if not data_directory:
+        return None
+    return MutationLog(data_directory)
@@ -0,0 +1,164 @@
+import collections
+import contextlib
+import cProfile
+import marshal
+import math
+import os
+import random
+import sys
+import threading
+import typing
+
+PROFILE_MODE_CPROFILE = "cprofile"
+PROFILE_MODE_STACKS = "stacks"
+PROFILE_MODES = [PROFILE_MODE_CPROFILE, PROFILE_MODE_STACKS]
+DEFAULT_SAMPLE_INTERVAL = 0.001
+
+
+def get_frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def get_collapsed_stack(frame) -> str:
+    names = []
+    while frame is not None:
+        names.append(get_frame_name(frame))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class RequestProfiler:
+    # Profiles a sample of the requests going through RoutesProvider.render_request, switched on and off at runtime.
+    #
+    # cprofile mode runs sampled requests under one cProfile.Profile, so the stats add up across requests. Only one
+    # profiler can be active in a process, sampled requests that arrive while another one is being profiled are
+    # skipped. stacks mode has a background thread look at the stacks of the threads serving sampled requests every
+    # interval seconds, and counts them in the collapsed format flame graph tools read.
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.profile_lock = threading.Lock()
+        self.active = False
+        self.mode = None
+        self.sample_rate = 1.0
+        self.interval = DEFAULT_SAMPLE_INTERVAL
+        self.profile = None
+        self.stack_counts = collections.Counter()
+        self.sampled_requests = 0
+        self.profiled_threads = {}
+        self.stop_event = threading.Event()
+        self.sampler_thread = None
+
+    def start(self, mode: str = PROFILE_MODE_CPROFILE, sample_rate: float = 1.0,
+              interval: float = DEFAULT_SAMPLE_INTERVAL):
+        # discards the results of the previous run
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode '{mode}', expected one of {', '.join(PROFILE_MODES)}")
+        if not 0 < sample_rate <= 1:
+            raise ValueError("The sample rate must be in (0, 1]")
+        if not 0 < interval < math.inf:
+            # the sampler thread would never sleep and take a whole core
+            raise ValueError("The sample interval must be a positive number of seconds")
+        self.stop()
+        with self.lock:
+            self.mode = mode
+            self.sample_rate = sample_rate
+            self.interval = interval
+            self.profile = cProfile.Profile() if mode == PROFILE_MODE_CPROFILE else None
+            self.stack_counts = collections.Counter()
+            self.sampled_requests = 0
+            if mode == PROFILE_MODE_STACKS:
+                self.stop_event = threading.Event()
+                self.sampler_thread = threading.Thread(
+                    target=self.run_sampler, name="dummy-api-stack-sampler", daemon=True
+                )
+                self.sampler_thread.start()
+            self.active = True
+
+    def stop(self):
+        with self.lock:
+            self.active = False
+            self.stop_event.set()
+            sampler_thread, self.sampler_thread = self.sampler_thread, None
+        if sampler_thread is not None:
+            sampler_thread.join()
+
+    def should_sample(self) -> bool:
+        return self.active and (self.sample_rate >= 1 or random.random() < self.sample_rate)
+
+    @contextlib.contextmanager
+    def profile_request(self):
+        if self.mode == PROFILE_MODE_STACKS:
+            thread_id = threading.get_ident()
+            with self.lock:
+                self.sampled_requests += 1
+                self.profiled_threads[thread_id] = self.profiled_threads.get(thread_id, 0) + 1
+            try:
+                yield
+            finally:
+                with self.lock:
+                    self.profiled_threads[thread_id] -= 1
+                    if not self.profiled_threads[thread_id]:
+                        del self.profiled_threads[thread_id]
+            return
+
+        profile = self.profile
+        if profile is None or not self.profile_lock.acquire(blocking=False):
+            yield
+            return
+        try:
+            try:
+                profile.enable()
+            except ValueError:
+                # some other profiler or coverage tool already holds the interpreter's profiling hooks
+                yield
+                return
+            self.sampled_requests += 1
+            try:
+                yield
+            finally:
+                profile.disable()
+        finally:
+            self.profile_lock.release()
+
+    def run_sampler(self):
+        stop_event = self.stop_event
+        while not stop_event.wait(self.interval):
+            with self.lock:
+                thread_ids = list(self.profiled_threads)
+            if not thread_ids:
+                continue
+            frames = sys._current_frames()
+            stacks = [get_collapsed_stack(frames[thread_id]) for thread_id in thread_ids if thread_id in frames]
+            with self.lock:
+                self.stack_counts.update(stacks)
+
+    def get_status(self) -> dict:
+        return {
+            "active": self.active,
+            "mode": self.mode,
+            "sample_rate": self.sample_rate,
+            "sampled_requests": self.sampled_requests
+        }
+
+    def get_pstats(self) -> bytes:
+        # the format pstats.Stats loads from a file
+        if self.profile is None:
+            raise ValueError("No cprofile results, start profiling in cprofile mode first")
+        with self.profile_lock:
+            self.profile.create_stats()
+            return marshal.dumps(self.profile.stats)
+
+    def get_collapsed_stacks(self) -> bytes:
+        if self.mode != PROFILE_MODE_STACKS:
+            raise ValueError("No stack samples, start profiling in stacks mode first")
+        with self.lock:
+            stack_counts = self.stack_counts.copy()
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(stack_counts.items())).encode("utf-8")
+
+    def get_results(self) -> typing.Tuple[bytes, str]:
+        # (results, file name) of the current or last run
+        if self.mode == PROFILE_MODE_STACKS:
+            return self.get_collapsed_stacks(), "profile.collapsed"
+        return self.get_pstats(), "profile.pstats"
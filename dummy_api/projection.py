@@ -0,0 +1,60 @@
+import collections.abc
+import functools
+import typing
+from dummy_api.request import QueryParameterError
+from dummy_api.views import make_read_only, unwrap
+
+FIELDS_PARAMETER = "fields"
+PROJECTION_CACHE_SIZE = 1024
+
+
+class ProjectionError(QueryParameterError):
+    pass
+
+
+class Projection(typing.NamedTuple):
+    # fields="id,name.first,address" compiles to {"id": None, "name": {"first": None}, "address": None}, None
+    # selecting the whole value
+    fields: str
+    tree: dict
+
+    def apply(self, value: typing.Any) -> typing.Any:
+        return project(value, self.tree)
+
+
+def project(value: typing.Any, tree: dict) -> typing.Any:
+    # Only the selected branches are built, lists are projected item by item. Selected values are the live data
+    # wrapped read-only, so they get encoded straight from it and nothing left out is ever copied or encoded.
+    value = unwrap(value)
+    if isinstance(value, collections.abc.Mapping):
+        projected = {}
+        for key, subtree in tree.items():
+            if key in value:
+                projected[key] = make_read_only(value[key]) if subtree is None else project(value[key], subtree)
+        return projected
+    if isinstance(value, collections.abc.Sequence) and not isinstance(value, (str, bytes)):
+        return [project(item, tree) for item in value]
+    return value
+
+
+@functools.lru_cache(maxsize=PROJECTION_CACHE_SIZE)
+def compile_projection(fields: str) -> Projection:
+    tree = {}
+    for field in fields.split(","):
+        path = field.strip().split(".")
+        if not all(path):
+            raise ProjectionError(f"Invalid field '{field}' in '{FIELDS_PARAMETER}'")
+        node = tree
+        for key in path[:-1]:
+            if key in node and node[key] is None:
+                # the whole value is selected already
+                break
+            node = node.setdefault(key, {})
+        else:
+            node[path[-1]] = None
+    return Projection(fields, tree)
+
+
+def get_projection(query_params: dict) -> typing.Optional[Projection]:
+    fields = query_params.get(FIELDS_PARAMETER)
+    return None if fields is None else compile_projection(fields)
@@ -0,0 +1,300 @@
+import collections.abc
+import functools
+import re
+import typing
+from dummy_api import tracing
+from dummy_api.indexes import DataGroupIndexes, get_equality_key
+from dummy_api.request import RequestBodyError
+
+LIST_STEP_REGEX = re.compile(r"^(?P<key>[^\[]+)\[(?P<field>\w+)=(?P<value>[^\]]+)\]$")
+PARAMETER_REGEX = re.compile(r"\{(?P<name>[\w\d_]+)\}")
+QUERY_PLAN_CACHE_SIZE = 1024
+
+
+def coerce_query_value(query_value: str) -> typing.Any:
+    if query_value.isdigit():
+        return int(query_value)
+    return query_value.strip("'\"")
+
+
+class ParameterSlot(typing.NamedTuple):
+    name: str
+
+    def resolve(self, params: dict) -> str:
+        # route parameters are substituted as strings, matching the old string-templating behavior
+        return str(params[self.name])
+
+
+class TemplateSlot(typing.NamedTuple):
+    template: str
+    names: tuple
+
+    def resolve(self, params: dict) -> str:
+        concrete_value = self.template
+        for name in self.names:
+            concrete_value = concrete_value.replace("{" + name + "}", str(params[name]))
+        return concrete_value
+
+
+def compile_template(template: str) -> typing.Any:
+    names = tuple(PARAMETER_REGEX.findall(template))
+    if not names:
+        return template
+    if len(names) == 1 and template == "{" + names[0] + "}":
+        return ParameterSlot(names[0])
+    return TemplateSlot(template, names)
+
+
+def get_template_parameter_names(template: typing.Any) -> tuple:
+    if isinstance(template, ParameterSlot):
+        return (template.name,)
+    if isinstance(template, TemplateSlot):
+        return template.names
+    return ()
+
+
+def resolve_template(template: typing.Any, params: dict) -> typing.Any:
+    if isinstance(template, (ParameterSlot, TemplateSlot)):
+        return template.resolve(params)
+    return template
+
+
+class KeyStep(typing.NamedTuple):
+    key: typing.Any
+
+    def get_parameter_names(self) -> tuple:
+        return get_template_parameter_names(self.key)
+
+    def get_key(self, params: dict) -> str:
+        return resolve_template(self.key, params)
+
+    def resolve(self, data: typing.Any, params: dict) -> typing.Any:
+        if not isinstance(data, collections.abc.Mapping):
+            return None
+        return data.get(self.get_key(params))
+
+
+class ListStep(typing.NamedTuple):
+    key: typing.Any
+    field: str
+    value: typing.Any
+
+    def get_parameter_names(self) -> tuple:
+        return get_template_parameter_names(self.key) + get_template_parameter_names(self.value)
+
+    def get_key(self, params: dict) -> str:
+        return resolve_template(self.key, params)
+
+    def get_value(self, params: dict) -> typing.Any:
+        if isinstance(self.value, (ParameterSlot, TemplateSlot)):
+            return coerce_query_value(self.value.resolve(params))
+        return self.value
+
+    def get_list(self, data: typing.Any, key: str) -> typing.Optional[typing.Sequence]:
+        if not isinstance(data, collections.abc.Mapping):
+            return None
+        list_to_query = data.get(key)
+        return list_to_query if isinstance(list_to_query, collections.abc.Sequence) else None
+
+    def find(self, data: typing.Any, params: dict, indexes: DataGroupIndexes = None,
+             path: tuple = None) -> typing.Optional[typing.Tuple[int, dict]]:
+        key = self.get_key(params)
+        list_to_query = self.get_list(data, key)
+        if list_to_query is None:
+            return None
+        value = self.get_value(params)
+        if indexes is not None and path is not None:
+            index = indexes.get_index(path + (key,), self.field)
+            positions = index.find_positions(list_to_query, value) if index is not None else None
+            if positions is not None:
+                tracing.count(tracing.COUNTER_INDEX_LOOKUPS)
+                return (positions[0], list_to_query[positions[0]]) if positions else None
+        key = get_equality_key(value)
+        for position, item in enumerate(list_to_query):
+            if isinstance(item, collections.abc.Mapping) and get_equality_key(item.get(self.field)) == key:
+                tracing.count(tracing.COUNTER_LIST_ITEMS_SCANNED, position + 1)
+                return position, item
+        tracing.count(tracing.COUNTER_LIST_ITEMS_SCANNED, len(list_to_query))
+        return None
+
+    def resolve(self, data: typing.Any, params: dict, indexes: DataGroupIndexes = None,
+                path: tuple = None) -> typing.Any:
+        found = self.find(data, params, indexes, path)
+        return None if found is None else found[1]
+
+
+def compile_step(token: str) -> typing.Union[KeyStep, ListStep]:
+    list_match = LIST_STEP_REGEX.match(token)
+    if list_match is None:
+        return KeyStep(compile_template(token))
+    value = compile_template(list_match.group("value"))
+    return ListStep(
+        compile_template(list_match.group("key")),
+        list_match.group("field"),
+        coerce_query_value(value) if isinstance(value, str) else value
+    )
+
+
+def split_query_path(query_string: str) -> typing.List[str]:
+    tokens = []
+    current_token = []
+    depth = 0
+    for char in query_string:
+        if char in "[{":
+            depth += 1
+        elif char in "]}":
+            depth -= 1
+        if char == "." and depth == 0:
+            tokens.append("".join(current_token))
+            current_token = []
+        else:
+            current_token.append(char)
+    tokens.append("".join(current_token))
+    return [token for token in tokens if token]
+
+
+class QueryPlan(typing.NamedTuple):
+    tokens: tuple
+    steps: tuple
+    parameter_names: frozenset
+
+    @property
+    def query_string(self) -> str:
+        return ".".join(self.tokens)
+
+    def is_root(self) -> bool:
+        return len(self.steps) == 0
+
+    def get_parent(self) -> "QueryPlan":
+        return compile_query_path(".".join(self.tokens[:-1]))
+
+    def validate_params(self, params: dict) -> bool:
+        if not self.parameter_names.issubset(params.keys()):
+            raise ValueError("Missing required parameters in query")
+        return True
+
+    def get_dependency_path(self, params: dict) -> tuple:
+        # Concrete keys the query depends on, up to and including the first list. List predicates are left out,
+        # any mutation of a list may change which of its items a predicate selects.
+        self.validate_params(params)
+        path = ()
+        for step in self.steps:
+            path += (step.get_key(params),)
+            if isinstance(step, ListStep):
+                break
+        return path
+
+    def get_result_path(self, params: dict) -> typing.Optional[tuple]:
+        # concrete keys leading to the result, None when a list predicate picks it
+        if any(isinstance(step, ListStep) for step in self.steps):
+            return None
+        return tuple(step.get_key(params) for step in self.steps)
+
+    def get_index_targets(self) -> typing.List[typing.Tuple[tuple, str]]:
+        # (list path, field) pairs of list predicates reachable through literal keys only, which are the
+        # predicates a DataGroupIndexes can serve regardless of the route parameters
+        path = ()
+        for step in self.steps:
+            if not isinstance(step.key, str):
+                break
+            if isinstance(step, ListStep):
+                return [(path + (step.key,), step.field)]
+            path += (step.key,)
+        return []
+
+    def query(self, data: typing.Any, params: dict, indexes: DataGroupIndexes = None) -> typing.Any:
+        self.validate_params(params)
+        result = data
+        path = () if indexes is not None and indexes.has_indexes() else None
+        for step in self.steps:
+            if not result:
+                return None
+            if isinstance(step, ListStep):
+                result = step.resolve(result, params, indexes, path)
+                path = None
+            else:
+                key = step.get_key(params)
+                result = result.get(key) if isinstance(result, collections.abc.Mapping) else None
+                path = None if path is None else path + (key,)
+        return result
+
+    def update(self, data: dict, update_data: typing.Any, params: dict, indexes: DataGroupIndexes = None) -> dict:
+        self.validate_params(params)
+        if self.is_root():
+            raise ValueError("Must provide a query path for updates, cannot replace entire object")
+        result = data
+        path = () if indexes is not None and indexes.has_indexes() else None
+        changed_item = None
+        for step in self.steps[:-1]:
+            if not result:
+                raise ValueError("Could not find value to update")
+            if isinstance(step, ListStep):
+                found = step.find(result, params, indexes, path)
+                if found is None:
+                    return {}
+                if path is not None:
+                    list_path = path + (step.get_key(params),)
+                    changed_item = (list_path, result.get(list_path[-1]), found[0])
+                result = found[1]
+                path = None
+            else:
+                key = step.get_key(params)
+                result = step.resolve(result, params)
+                path = None if path is None else path + (key,)
+
+        last_step = self.steps[-1]
+        if isinstance(last_step, ListStep):
+            found = last_step.find(result, params, indexes, path)
+            if found is None:
+                raise ValueError("Matching value not found in list")
+            item = found[1]
+            item.clear()  # POST
+            item.update(update_data)
+            if path is not None:
+                list_path = path + (last_step.get_key(params),)
+                indexes.record_item_change(list_path, result.get(list_path[-1]), found[0])
+            return data
+
+        if not isinstance(result, collections.abc.MutableMapping):
+            raise ValueError("Could not find value to update")
+        key = last_step.get_key(params)
+        existing_value = result.get(key)
+        if isinstance(existing_value, collections.abc.MutableSequence):
+            # Introspecting the types of data here to make a guess at whether we are posting a new "entity"
+            # or replacing a field value. Life would be easier if we draw a clear line between PUT and POST behaviors.
+            # ie POST will ALWAYS append to arrays, PUT will always replace (may seem backwards but bear in mind that
+            # POSTing will primarily be done against entity list routes where it makes sense that it should append).
+            # May be most cleanly resolved by adding new route properties, perhaps defining array/dict behavior with
+            # append/extend rules. Requires more routes but gives more control.
+            if len(existing_value) > 0 and isinstance(existing_value[0], collections.abc.Mapping):
+                existing_value.append(update_data)
+                if path is not None:
+                    indexes.record_append(path + (key,), existing_value)
+            else:
+                result[key] = update_data
+        else:
+            result[key] = update_data
+        if changed_item is not None:
+            indexes.record_item_change(*changed_item)
+        return data
+
+    def append_items(self, data: dict, items: list, params: dict, indexes: DataGroupIndexes = None) -> dict:
+        # Bulk POST: appends items to the list the query points at in one go, its indexes catch up once at the end
+        self.validate_params(params)
+        target = self.query(data, params, indexes)
+        if not isinstance(target, collections.abc.MutableSequence) or (
+                len(target) > 0 and not isinstance(target[0], collections.abc.Mapping)):
+            raise RequestBodyError("Could not find a list of objects to append to")
+        target.extend(items)
+        list_path = self.get_result_path(params)
+        if indexes is not None and list_path is not None:
+            indexes.record_append(list_path, target)
+        return data
+
+
+@functools.lru_cache(maxsize=QUERY_PLAN_CACHE_SIZE)
+def compile_query_path(query_string: str) -> QueryPlan:
+    tokens = tuple(split_query_path(query_string or ""))
+    steps = tuple(compile_step(token) for token in tokens)
+    parameter_names = frozenset(name for step in steps for name in step.get_parameter_names())
+    return QueryPlan(tokens, steps, parameter_names)
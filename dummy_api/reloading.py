@@ -0,0 +1,208 @@
+import contextlib
+import hashlib
+import logging
+import os
+import threading
+import typing
+from dummy_api.compiler import get_route_spec
+from dummy_api.lazy_loading import RoutesFileIndex
+from dummy_api.routes import Route, RoutesProvider
+from dummy_api.serialization import encode_json
+from dummy_api.validators import RoutesFileValidator
+
+DEFAULT_POLL_INTERVAL = 1.0
+
+logger = logging.getLogger(__name__)
+
+
+class RoutesFileState(typing.NamedTuple):
+    # (size, mtime_ns) of the file the state was read from
+    file_stat: typing.Optional[tuple]
+    # every route config entry, encoded, in file order
+    route_keys: typing.List[bytes]
+    # digest of the raw bytes of every data group's data, None for groups without data
+    group_digests: dict
+
+
+class ReloadSummary(typing.NamedTuple):
+    built_routes: int
+    removed_routes: int
+    changed_groups: typing.List[str]
+    removed_groups: typing.List[str]
+
+
+def get_file_stat(file_path: str) -> typing.Optional[tuple]:
+    try:
+        file_stat = os.stat(file_path)
+    except FileNotFoundError:
+        # editors that save by renaming briefly leave no file behind
+        return None
+    return file_stat.st_size, file_stat.st_mtime_ns
+
+
+def get_routes_file_state(file_stat: typing.Optional[tuple], routes_file_index: RoutesFileIndex) -> RoutesFileState:
+    group_digests = {}
+    for group_name, data_span in routes_file_index.group_spans.items():
+        if data_span is None:
+            group_digests[group_name] = None
+        else:
+            group_digests[group_name] = hashlib.sha1(routes_file_index.buffer[data_span[0]:data_span[1]]).digest()
+    return RoutesFileState(
+        file_stat,
+        [encode_json(route_config_entry) for route_config_entry in routes_file_index.routes],
+        group_digests
+    )
+
+
+class RoutesFileWatcher:
+    # Polls a routes file and hands every new version of it to apply(), once it indexed and validated. A file that
+    # fails to index or validate leaves everything as it was.
+
+    def __init__(self, file_path: str, poll_interval: float = DEFAULT_POLL_INTERVAL):
+        self.file_path = file_path
+        self.poll_interval = poll_interval
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.watch_thread = None
+        self.state = self.read_state()[0]
+
+    def read_state(self) -> typing.Tuple[RoutesFileState, RoutesFileIndex]:
+        # stat first: a write landing while the file is indexed shows up as a change on the next check
+        file_stat = get_file_stat(self.file_path)
+        routes_file_index = RoutesFileIndex(self.file_path)
+        return get_routes_file_state(file_stat, routes_file_index), routes_file_index
+
+    def has_file_changed(self) -> bool:
+        file_stat = get_file_stat(self.file_path)
+        return file_stat is not None and file_stat != self.state.file_stat
+
+    def check(self) -> typing.Optional[ReloadSummary]:
+        if not self.has_file_changed():
+            return None
+        return self.reload()
+
+    def reload(self) -> ReloadSummary:
+        with self.lock:
+            try:
+                state, routes_file_index = self.read_state()
+                self.validate(routes_file_index)
+            except ValueError:
+                # don't retry until the file changes again
+                self.state = self.state._replace(file_stat=get_file_stat(self.file_path))
+                raise
+            summary = self.apply(state, routes_file_index)
+            self.state = state
+            return summary
+
+    @staticmethod
+    def validate(routes_file_index: RoutesFileIndex):
+        file_data = {
+            "routes": routes_file_index.routes,
+            "data_groups": [{"group_name": group_name} for group_name in routes_file_index.get_group_names()]
+        }
+        if not RoutesFileValidator.validate_file_data(file_data):
+            raise ValueError(f"Invalid routes file '{routes_file_index.file_path}'")
+
+    def apply(self, state: RoutesFileState, routes_file_index: RoutesFileIndex) -> ReloadSummary:
+        raise NotImplementedError
+
+    def start(self):
+        self.watch_thread = threading.Thread(target=self.run_watch, name="dummy-api-routes-reloader", daemon=True)
+        self.watch_thread.start()
+        return self
+
+    def run_watch(self):
+        while not self.stop_event.wait(self.poll_interval):
+            try:
+                summary = self.check()
+            except Exception:
+                logger.exception("Could not reload routes file '%s'", self.file_path)
+                continue
+            if summary is not None:
+                logger.info("Reloaded routes file '%s': %s", self.file_path, summary)
+
+    def stop(self):
+        self.stop_event.set()
+        if self.watch_thread is not None:
+            self.watch_thread.join()
+
+    def get_group_changes(self, state: RoutesFileState) -> typing.Tuple[typing.List[str], typing.List[str]]:
+        # (changed groups, removed groups) since the state the file was last read in
+        changed_groups = [
+            group_name for group_name, digest in state.group_digests.items()
+            if group_name not in self.state.group_digests or self.state.group_digests[group_name] != digest
+        ]
+        removed_groups = [
+            group_name for group_name in self.state.group_digests if group_name not in state.group_digests
+        ]
+        return changed_groups, removed_groups
+
+
+class RoutesReloader(RoutesFileWatcher):
+    # Applies changes to a RoutesProvider's routes file while it keeps serving.
+    #
+    # The new file is only indexed (see dummy_api.lazy_loading), and compared against the state it was last read in:
+    # data groups whose bytes changed are decoded and replaced, groups that are gone are removed and every other
+    # group keeps its data, runtime mutations included. Routes whose config entry is unchanged are reused as they
+    # are, so the response cache stays warm for them. Groups are replaced and routes swapped while the write locks of
+    # the changed groups are held, so requests see either the old data under the old routes or the new data under
+    # the new ones. With a shared store (see dummy_api.shared_store) the store server reseeds the groups, workers
+    # only reload their routes.
+
+    def __init__(self, route_provider: RoutesProvider, poll_interval: float = DEFAULT_POLL_INTERVAL):
+        self.route_provider = route_provider
+        super().__init__(route_provider.file_path, poll_interval)
+
+    @property
+    def data_store(self):
+        return self.route_provider.main_data_store
+
+    def apply(self, state: RoutesFileState, routes_file_index: RoutesFileIndex) -> ReloadSummary:
+        changed_groups, removed_groups = self.get_group_changes(state) if self.data_store.owns_groups else ([], [])
+        # decoded before taking any lock, requests only wait for the swap itself
+        changed_data = {group_name: routes_file_index.load_group(group_name) for group_name in changed_groups}
+        with contextlib.ExitStack() as group_locks:
+            for group_name in sorted(set(changed_groups) | set(removed_groups)):
+                group_locks.enter_context(self.data_store.get_group_lock(group_name).write())
+            for group_name, data in changed_data.items():
+                self.data_store.add_data_group(group_name, data)
+            built_routes, removed_routes = self.reload_routes(state, routes_file_index.routes)
+            for group_name in removed_groups:
+                self.data_store.remove_data_group(group_name)
+        return ReloadSummary(built_routes, removed_routes, changed_groups, removed_groups)
+
+    def reload_routes(self, state: RoutesFileState, raw_routes: typing.List[dict]) -> typing.Tuple[int, int]:
+        if state.route_keys == self.state.route_keys:
+            return 0, 0
+
+        # the default route always comes last and never changes
+        old_routes = self.route_provider.routes
+        old_raw_routes = self.route_provider.raw_route_data.get("routes", [])
+        reusable_routes = {}
+        for route_key, route in zip(self.state.route_keys, old_routes[:-1]):
+            reusable_routes.setdefault(route_key, []).append(route)
+
+        routes: typing.List[Route] = []
+        route_specs = [get_route_spec(route_config_entry) for route_config_entry in raw_routes]
+        built_routes = 0
+        for route_key, route_spec in zip(state.route_keys, route_specs):
+            if reusable_routes.get(route_key):
+                routes.append(reusable_routes[route_key].pop(0))
+            else:
+                routes.append(self.route_provider.build_route(route_spec))
+                built_routes += 1
+        routes.append(old_routes[-1])
+        self.route_provider.set_routes(routes, raw_routes)
+        # indexes only the removed or edited routes were looking up would otherwise be kept up to date for nothing
+        self.data_store.retain_index_targets([
+            (route_spec.group_name, route_spec.index_targets, route_spec.sorted_index_targets)
+            for route_spec in route_specs
+        ])
+
+        # resolvers are also registered under their route's name, drop the ones no route has anymore
+        route_names = {route_config_entry.get("name") for route_config_entry in raw_routes}
+        for route_config_entry in old_raw_routes:
+            if route_config_entry.get("name") not in route_names:
+                self.data_store.data_resolvers.pop(route_config_entry.get("name"), None)
+        removed_routes = sum(len(routes_left) for routes_left in reusable_routes.values())
+        return built_routes, removed_routes
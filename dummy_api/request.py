@@ -1,3 +1,21 @@
+import typing
+
+
+class BadRequestError(ValueError):
+    # a request that can't be served as it was sent, answered with a 400
+    pass
+
+
+class QueryParameterError(BadRequestError):
+    # a query parameter the request can't be served with
+    pass
+
+
+class RequestBodyError(BadRequestError):
+    # a request body the route can't apply
+    pass
+
+
 class RouteRequest:
 
     def __init__(
@@ -5,12 +23,21 @@ class RouteRequest:
             request_path: str = None,
             request_method: str = None,
             query_parameters: dict = None,
-            request_body: dict = None
+            request_body: dict = None,
+            trace: bool = False,
+            if_none_match: str = None,
+            accept_encoding: str = None
     ):
         self.request_path = request_path
         self.request_method = request_method or "GET"
         self.query_parameters = query_parameters or {}
         self.request_body = request_body or {}
+        # traced requests report where their time went in a Server-Timing header, see dummy_api.tracing
+        self.trace = trace
+        # the If-None-Match header, GETs whose data hasn't changed since are answered with a 304
+        self.if_none_match = if_none_match
+        # the Accept-Encoding header, large cached bodies are sent compressed when the client accepts it
+        self.accept_encoding = accept_encoding
 
     def get_query_params(self) -> dict:
         return self.query_parameters.copy() if self.query_parameters else {}
@@ -23,3 +50,12 @@ class RouteRequest:
 
     def get_request_body(self) -> dict:
         return self.request_body
+
+    def is_traced(self) -> bool:
+        return self.trace
+
+    def get_if_none_match(self) -> typing.Optional[str]:
+        return self.if_none_match
+
+    def get_accept_encoding(self) -> typing.Optional[str]:
+        return self.accept_encoding
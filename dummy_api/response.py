@@ -0,0 +1,19 @@
+from dummy_api.serialization import JSON_MIMETYPE
+
+
+class RouteResponse:
+
+    def __init__(self, body: bytes, status: int = 200, headers: dict = None, content_type: str = JSON_MIMETYPE):
+        self.body = body
+        self.status = status
+        self.headers = headers or {}
+        self.content_type = content_type
+
+    def get_body(self) -> bytes:
+        return self.body
+
+    def get_status(self) -> int:
+        return self.status
+
+    def get_headers(self) -> dict:
+        return self.headers
@@ -0,0 +1,106 @@
+import collections
+import threading
+import typing
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+ENTRY_OVERHEAD_BYTES = 256  # rough per-entry cost of the key, entry object and bookkeeping
+
+
+class CacheEntry:
+    __slots__ = ("token", "body", "headers", "variants", "size", "not_found")
+
+    def __init__(self, token: typing.Any, body: bytes, headers: dict = None, not_found: bool = False):
+        self.token = token
+        self.body = body
+        self.headers = headers or {}
+        self.not_found = not_found
+        # the body compressed by content encoding (see dummy_api.compression), added as clients ask for them
+        self.variants = {}
+        headers_size = sum(len(name) + len(value) for name, value in self.headers.items())
+        self.size = len(body) + headers_size + ENTRY_OVERHEAD_BYTES
+
+
+class ResponseCache:
+    # LRU cache of encoded response bodies and their headers, bounded by the total size of the stored entries.
+    # Entries carry the data version token they were rendered at and are dropped when looked up with a newer token.
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = collections.OrderedDict()
+        self.current_bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def get(self, key: typing.Hashable, token: typing.Any) -> typing.Optional[bytes]:
+        entry = self.get_entry(key, token)
+        return None if entry is None else entry.body
+
+    def get_entry(self, key: typing.Hashable, token: typing.Any) -> typing.Optional[CacheEntry]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.token != token:
+                self.remove_entry(key, entry)
+                self.invalidations += 1
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: typing.Hashable, token: typing.Any, body: bytes, headers: dict = None,
+            not_found: bool = False) -> CacheEntry:
+        # the entry is returned even when it is too large to be kept
+        entry = CacheEntry(token, body, headers, not_found)
+        if entry.size > self.max_bytes:
+            return entry
+        with self.lock:
+            existing_entry = self.entries.get(key)
+            if existing_entry is not None:
+                self.remove_entry(key, existing_entry)
+            self.entries[key] = entry
+            self.current_bytes += entry.size
+            self.evict()
+        return entry
+
+    def add_variant(self, key: typing.Hashable, entry: CacheEntry, encoding: str, body: bytes):
+        # Entries that were dropped or replaced in the meantime are left alone, their variants would never be read
+        with self.lock:
+            if self.entries.get(key) is not entry or encoding in entry.variants:
+                return
+            entry.variants[encoding] = body
+            entry.size += len(body)
+            self.current_bytes += len(body)
+            self.evict()
+
+    def evict(self):
+        while self.current_bytes > self.max_bytes:
+            evicted_key, evicted_entry = next(iter(self.entries.items()))
+            self.remove_entry(evicted_key, evicted_entry)
+            self.evictions += 1
+
+    def remove_entry(self, key: typing.Hashable, entry: CacheEntry):
+        del self.entries[key]
+        self.current_bytes -= entry.size
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.current_bytes = 0
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+                "entries": len(self.entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes
+            }
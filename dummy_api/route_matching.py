@@ -8,8 +8,11 @@ class RouteConstraint:
         self.route_pattern = route_pattern
         self.request_methods = request_methods or ["GET", "PATCH", "PUT", "POST", "DELETE"]
 
+    def does_request_method_match(self, route_request: RouteRequest) -> bool:
+        return route_request.get_request_method() in self.request_methods
+
     def does_request_match(self, route_request: RouteRequest) -> bool:
-        if route_request.get_request_method() not in self.request_methods:
+        if not self.does_request_method_match(route_request):
             return False
 
         return RouteMatcher.does_request_path_match_route_pattern(
@@ -73,3 +76,81 @@ class RouteMatcher:
         if len(tokenized_request) > i + 1:  # are there further unmatched tokens?
             return False
         return True
+
+
+class RouteTrieNode:
+
+    def __init__(self):
+        self.literal_children = {}
+        self.parameter_children = {}
+        self.wildcard_child = None
+        self.routes = []
+        self.catch_all_routes = []
+
+
+class RouteTrie:
+    # Patterns keep their registration order so a single walk returns the same route that a linear,
+    # first-match-wins scan over RouteConstraint.does_request_match would have returned.
+
+    def __init__(self):
+        self.root = RouteTrieNode()
+        self.size = 0
+
+    def add(self, route_pattern: str, entry: typing.Any):
+        order = self.size
+        self.size += 1
+        node = self.root
+        for route_token in RouteMatcher.tokenize_route_pattern(route_pattern):
+            if route_token == "**":
+                # everything after a "**" is ignored by RouteMatcher, so the route terminates here
+                node.catch_all_routes.append((order, entry))
+                return
+            if route_token == "*":
+                if node.wildcard_child is None:
+                    node.wildcard_child = RouteTrieNode()
+                node = node.wildcard_child
+            elif route_token.startswith("{"):
+                node = node.parameter_children.setdefault(route_token.strip("{}"), RouteTrieNode())
+            else:
+                node = node.literal_children.setdefault(route_token, RouteTrieNode())
+        node.routes.append((order, entry))
+
+    def get_candidates(self, request_path: str) -> typing.List[typing.Tuple[int, typing.Any, tuple]]:
+        tokenized_request = RouteMatcher.tokenize_request_path(request_path)
+        candidates = []
+        self._collect_candidates(self.root, tokenized_request, 0, (), candidates)
+        candidates.sort(key=lambda candidate: candidate[0])
+        return candidates
+
+    def match(self, request_path: str, accept: callable = None) -> typing.Optional[typing.Tuple[typing.Any, dict]]:
+        for order, entry, params in self.get_candidates(request_path):
+            if accept is None or accept(entry):
+                return entry, dict(params)
+        return None
+
+    def _collect_candidates(self, node: RouteTrieNode, tokenized_request: list, index: int, params: tuple,
+                            candidates: list):
+        for order, entry in node.catch_all_routes:
+            candidates.append((order, entry, params))
+        if index >= len(tokenized_request):
+            # RouteMatcher lets trailing "*" tokens match missing request tokens
+            for order, entry in node.routes:
+                candidates.append((order, entry, params))
+            if node.wildcard_child is not None:
+                self._collect_candidates(node.wildcard_child, tokenized_request, index + 1, params, candidates)
+            return
+
+        request_token = tokenized_request[index]
+        literal_child = node.literal_children.get(request_token)
+        if literal_child is not None:
+            self._collect_candidates(literal_child, tokenized_request, index + 1, params, candidates)
+        for parameter_name, parameter_child in node.parameter_children.items():
+            self._collect_candidates(
+                parameter_child,
+                tokenized_request,
+                index + 1,
+                params + ((parameter_name, request_token),),
+                candidates
+            )
+        if node.wildcard_child is not None:
+            self._collect_candidates(node.wildcard_child, tokenized_request, index + 1, params, candidates)
@@ -1,82 +1,239 @@
+import contextlib
 import json
+import time
 from dummy_api.data import MutableDataStore, DataResolver, DataMutator
-from dummy_api.route_matching import RouteConstraint
-from dummy_api.request import RouteRequest
+from dummy_api.list_query import ListQuery
+from dummy_api.lazy_loading import RoutesFileIndex, paused_garbage_collection
+from dummy_api.compiler import (
+    RouteSpec, RouteTableArtifact, compile_routes_file, get_route_specs, load_or_compile_artifact
+)
+from dummy_api.compression import (
+    ACCEPT_ENCODING_HEADER, CONTENT_ENCODING_HEADER, DEFAULT_COMPRESSION_THRESHOLD, VARY_HEADER, choose_encoding,
+    compress
+)
+from dummy_api.etags import ETAG_HEADER, WEAK_PREFIX, format_etag, matches_if_none_match, new_etag_prefix
+from dummy_api.metrics import (
+    MetricsRegistry, PROMETHEUS_CONTENT_TYPE, RESULT_BAD_REQUEST, RESULT_ERROR, RESULT_NOT_FOUND, RESULT_NOT_MODIFIED,
+    RESULT_OK, RequestTimings
+)
+from dummy_api.pagination import Page, PageRequest, paginate
+from dummy_api.profiling import RequestProfiler
+from dummy_api.projection import get_projection
+from dummy_api.tracing import SERVER_TIMING_HEADER, traced_request
+from dummy_api.route_matching import RouteConstraint, RouteTrie
+from dummy_api.request import BadRequestError, RouteRequest
+from dummy_api.response import RouteResponse
+from dummy_api.response_cache import CacheEntry, ResponseCache
+from dummy_api.serialization import encode_json
 import typing
 
+BULK_FIELD = "bulk"
+
+
+class RetiredRouteError(Exception):
+    pass
+
 
 class Route:
     def __init__(self, constraint: RouteConstraint, data_resolver: DataResolver, data_mutator: DataMutator = None):
         self.constraint = constraint
         self.data_resolver = data_resolver
         self.data_mutator = data_mutator
+        # set once a reload replaced the route, see RoutesProvider.set_routes
+        self.retired = False
 
     def can_handle_request(self, request: RouteRequest) -> bool:
         return self.constraint.does_request_match(request)
 
-    def handle_request(self, request: RouteRequest) -> typing.Any:
+    def can_handle_request_method(self, request: RouteRequest) -> bool:
+        return self.constraint.does_request_method_match(request)
+
+    def get_request_parameters(self, request: RouteRequest, params: dict = None) -> dict:
+        if params is not None:
+            return params
+        return self.constraint.get_constraint_parameters_from_request(request)
+
+    def handle_request(self, request: RouteRequest, params: dict = None) -> typing.Any:
+        # None when there is nothing to answer with, see get_default_data
         if request.get_request_method() == "GET":
-            return self.get_data(request)
+            return self.find_data(request, params)
         elif request.get_request_method() == "POST":
-            return self.post_data(request)
+            return self.post_data(request, params)
+
+    def post_data(self, request: RouteRequest, params: dict = None) -> dict:
+        # {"payload": [...], "bulk": true} appends every item of the payload to the route's list in one go
+        kwargs = self.get_request_parameters(request, params)
+        request_body = request.get_request_body()
+        if request_body.get(BULK_FIELD):
+            return self.data_mutator.append_items(request_body.get("payload"), **kwargs)
+        return self.data_mutator.update_data(request_body.get("payload"), **kwargs)
 
-    def post_data(self, request: RouteRequest) -> dict:
-        kwargs = self.constraint.get_constraint_parameters_from_request(request)
-        return self.data_mutator.update_data(request.get_request_body().get("payload"), **kwargs)
+    def get_data(self, request: RouteRequest, params: dict = None) -> typing.Any:
+        result = self.find_data(request, params)
+        return self.get_default_data(request) if result is None else result
+
+    def get_default_data(self, request: RouteRequest) -> typing.Any:
+        # what reads that find nothing are answered with, None leaves it to RoutesProvider's not found response
+        return self.data_resolver.get_default() if request.get_request_method() == "GET" else None
+
+    def find_data(self, request: RouteRequest, params: dict = None) -> typing.Any:
+        # List results are filtered by the remaining query parameters first, then aggregated, sorted and paged: a Page
+        # when the request asks for one (limit, offset or cursor). Fields are projected last, so only the items of the
+        # page are.
+        query_params = request.get_query_params()
+        page_request = PageRequest.from_query_params(query_params)
+        projection = get_projection(query_params)
+        kwargs = self.get_request_parameters(request, params)
+        result = self.data_resolver.find(kwargs, ListQuery.from_query_params(query_params))
+        if result is None:
+            return None
+        if page_request is not None:
+            result = paginate(result, page_request)
+        if projection is None:
+            return result
+        if isinstance(result, Page):
+            return result._replace(items=projection.apply(result.items))
+        return projection.apply(result)
+
+    def lock_request(self, request: RouteRequest) -> typing.ContextManager:
+        # held while the result is serialized too, since results are live views over the group's data
+        if request.get_request_method() == "POST" and self.data_mutator is not None:
+            return self.data_mutator.write_lock()
+        if request.get_request_method() == "GET":
+            return self.data_resolver.read_lock()
+        return contextlib.nullcontext()
+
+    def get_version_token(self, request: RouteRequest, params: dict = None) -> typing.Optional[int]:
+        # only reads are cacheable, and only when the resolver's data is versioned
+        if request.get_request_method() != "GET":
+            return None
+        kwargs = self.get_request_parameters(request, params)
+        return self.data_resolver.get_version_token(**kwargs)
+
+    def get_cache_key(self, request: RouteRequest, params: dict = None) -> tuple:
+        kwargs = self.get_request_parameters(request, params)
+        return (
+            self,
+            request.get_request_method(),
+            tuple(sorted(kwargs.items())),
+            tuple(sorted(request.get_query_params().items()))
+        )
 
-    def get_data(self, request: RouteRequest) -> typing.Any:
-        kwargs = self.constraint.get_constraint_parameters_from_request(request)
-        return self.data_resolver(**kwargs)
+
+class RouteSet(typing.NamedTuple):
+    # swapped as a whole on reload, so a request never matches against one set's trie and another's routes
+    routes: typing.List[Route]
+    route_trie: RouteTrie
 
 
 class RoutesProvider:
 
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, response_cache: ResponseCache = None, data_store: MutableDataStore = None,
+                 lazy_data: bool = False, use_mmap: bool = False, use_artifact: bool = False,
+                 collect_metrics: bool = True, trace_requests: bool = False,
+                 compression_threshold: typing.Optional[int] = DEFAULT_COMPRESSION_THRESHOLD):
         self.named_data_references = {}
         self.file_path = file_path
-        self.raw_route_data = self.get_data_file_contents(self.file_path)
-        self.main_data_store = MutableDataStore()
+        self.response_cache = ResponseCache() if response_cache is None else response_cache
+        self.metrics = MetricsRegistry(enabled=collect_metrics)
+        # with trace_requests every response carries a Server-Timing header, not only the ones asking for it
+        self.trace_requests = trace_requests
+        # cached bodies of at least this many bytes are sent compressed to clients accepting it, None never compresses
+        self.compression_threshold = compression_threshold
+        # switched on at runtime, see dummy_api.admin
+        self.profiler = RequestProfiler()
+        self.etag_prefix = new_etag_prefix()
+        # with lazy_data only the routes are decoded up front, each data group is decoded when it is first read
+        self.routes_file_index = RoutesFileIndex(self.file_path, use_mmap=use_mmap) if lazy_data else None
+        # with use_artifact the compiled artifact next to the file is used, (re)compiling it when it is stale
+        self.artifact = load_or_compile_artifact(self.file_path) if use_artifact and not lazy_data else None
+        self.route_table = self.artifact.route_table if self.artifact else None
+        if self.routes_file_index:
+            self.raw_route_data = {"routes": self.routes_file_index.routes}
+        elif self.route_table:
+            self.raw_route_data = self.route_table.raw_route_data
+        else:
+            self.raw_route_data = self.get_data_file_contents(self.file_path)
+        # the data store may be shared with other processes (see dummy_api.shared_store), so groups are only seeded
+        self.main_data_store = MutableDataStore() if data_store is None else data_store
         self.populate_data_groups()
-        self.routes = self.build_routes()
+        # building every route allocates a lot of long lived objects, see paused_garbage_collection
+        with paused_garbage_collection():
+            routes = self.build_routes()
+            route_trie = self.route_table.route_trie if self.route_table else self.build_route_trie(routes)
+            self.route_set = RouteSet(routes, route_trie)
+
+    @property
+    def routes(self) -> typing.List[Route]:
+        return self.route_set.routes
+
+    @property
+    def route_trie(self) -> RouteTrie:
+        return self.route_set.route_trie
+
+    @staticmethod
+    def compile(file_path: str, artifact_path: str = None) -> RouteTableArtifact:
+        return compile_routes_file(file_path, artifact_path)
 
     @staticmethod
     def get_data_file_contents(file_path: str) -> dict:
-        with open(file_path, "r") as f:
+        with open(file_path, "r") as f, paused_garbage_collection():
             return json.loads(f.read())
 
     def populate_data_groups(self):
-        for group_dict in self.raw_route_data.get("data_groups", []):
-            self.main_data_store.add_data_group(group_dict.get("group_name"), group_dict.get("data"))
+        group_source = self.routes_file_index or self.artifact
+        if group_source:
+            for group_name in group_source.get_group_names():
+                self.main_data_store.seed_data_group_loader(group_name, group_source.get_group_loader(group_name))
+        else:
+            for group_dict in self.raw_route_data.get("data_groups", []):
+                self.main_data_store.seed_data_group(group_dict.get("group_name"), group_dict.get("data"))
+        # every group there is has been seeded, recovered mutations still waiting for one never will be
+        self.main_data_store.discard_pending_mutations()
 
     def build_routes(self) -> typing.List[Route]:
-        routes = []
-        for route_config_entry in self.raw_route_data.get("routes", []):
-            path = route_config_entry.get("path")
-            name = route_config_entry.get("name")
-            route_data = route_config_entry.get("data")
-
-            group_name = route_data.get("reference", {}).get("source", name)
-            query_path = route_data.get("reference", {}).get("find", "")
-            resolver = self.main_data_store.build_data_resolver(
-                group_name,
-                query_path,
-                default_data=route_config_entry.get("default")
-            )  # build resolver that may pull from another data source
-            mutator = self.main_data_store.get_group_mutator(group_name, query_path)
-            # add resolver under its own name so it can also be referenced
-            self.main_data_store.add_resolver(name, resolver)
-
-            route = Route(
-                RouteConstraint(path, route_config_entry.get("methods", ["GET"])),
-                resolver,
-                mutator
-            )
-            routes.append(route)
-
+        route_specs = self.route_table.route_specs if self.route_table else get_route_specs(self.raw_route_data)
+        routes = [self.build_route(route_spec) for route_spec in route_specs]
         routes.append(self.get_default_route())
-
         return routes
 
+    def build_route(self, route_spec: RouteSpec) -> Route:
+        resolver = self.main_data_store.build_data_resolver(
+            route_spec.group_name,
+            route_spec.query_path,
+            default_data=route_spec.default
+        )  # build resolver that may pull from another data source
+        mutator = self.main_data_store.get_group_mutator(route_spec.group_name, route_spec.query_path)
+        self.main_data_store.register_index_targets(
+            route_spec.group_name, route_spec.index_targets, route_spec.sorted_index_targets
+        )
+        self.main_data_store.register_columnar_targets(route_spec.group_name, route_spec.columnar_targets)
+        # add resolver under its own name so it can also be referenced
+        self.main_data_store.add_resolver(route_spec.name, resolver)
+        return Route(RouteConstraint(route_spec.path, route_spec.methods), resolver, mutator)
+
+    def set_routes(self, routes: typing.List[Route], raw_routes: typing.List[dict]):
+        # Requests already past match_route finish on the routes they matched, unless those get retired before the
+        # request holds its group's lock: such requests are matched again (see encode_route_result)
+        with paused_garbage_collection():
+            route_set = RouteSet(routes, self.build_route_trie(routes))
+        kept_routes = set(routes)
+        for route in self.route_set.routes:
+            if route not in kept_routes:
+                route.retired = True
+        self.route_set = route_set
+        # the same path may now be served from other data at the same version
+        self.etag_prefix = new_etag_prefix()
+        self.raw_route_data = {**self.raw_route_data, "routes": raw_routes}
+
+    @staticmethod
+    def build_route_trie(routes: typing.List[Route]) -> RouteTrie:
+        # entries are positions in routes, so compiled tries (see dummy_api.compiler) work the same way
+        route_trie = RouteTrie()
+        for position, route in enumerate(routes):
+            route_trie.add(route.constraint.route_pattern, position)
+        return route_trie
+
     @staticmethod
     def get_default_response_data():
         return {"error": True, "message": "Not found"}
@@ -84,15 +241,162 @@ class RoutesProvider:
     @staticmethod
     def get_default_route() -> Route:
         default_constraint = RouteConstraint("/**")
-        default_resolver = DataResolver("default_route", RoutesProvider.get_default_response_data)
+        # finds nothing, so every request it handles is counted as not found
+        default_resolver = DataResolver(
+            "default_route", lambda: None, default=RoutesProvider.get_default_response_data()
+        )
         route = Route(default_constraint, default_resolver)
         return route
 
+    def match_route(self, request: RouteRequest) -> typing.Optional[typing.Tuple[Route, dict]]:
+        routes, route_trie = self.route_set
+        match = route_trie.match(
+            request.get_request_path(),
+            lambda position: routes[position].can_handle_request_method(request)
+        )
+        if match is None:
+            return None
+        position, params = match
+        return routes[position], params
+
+    @staticmethod
+    def get_route_result(route: Route, request: RouteRequest, params: dict,
+                         timings: RequestTimings = None) -> typing.Any:
+        result = route.handle_request(request, params)
+        if result is None:
+            if timings is not None:
+                timings.not_found = True
+            result = route.get_default_data(request)
+        return RoutesProvider.get_default_response_data() if result is None else result
+
     def handle_request(self, request: RouteRequest) -> typing.Any:
-        for route in self.routes:
-            if route.can_handle_request(request):
-                result = route.handle_request(request)
-                return RoutesProvider.get_default_response_data() if result is None else result
+        match = self.match_route(request)
+        if match is None:
+            return None
+        route, params = match
+        result = self.get_route_result(route, request, params)
+        return result.items if isinstance(result, Page) else result
+
+    def encode_route_result(self, route: Route, request: RouteRequest, params: dict,
+                            timings: RequestTimings = None) -> typing.Tuple[bytes, dict]:
+        # (body, headers), paged results carry their total count and next cursor in the headers
+        with route.lock_request(request):
+            if route.retired:
+                # a reload replaced the route (and maybe its group's data) while the request waited for the lock
+                raise RetiredRouteError(route.constraint.route_pattern)
+            result = self.get_route_result(route, request, params, timings)
+            headers = {}
+            if isinstance(result, Page):
+                headers = result.get_headers()
+                result = result.items
+            if timings is not None:
+                timings.resolved = time.perf_counter()
+            body = encode_json(result)
+            if timings is not None:
+                timings.serialized = time.perf_counter()
+            return body, headers
+
+    def render_request(self, request: RouteRequest) -> RouteResponse:
+        if self.profiler.should_sample():
+            with self.profiler.profile_request():
+                return self.render_request_with_trace(request)
+        return self.render_request_with_trace(request)
+
+    def render_request_with_trace(self, request: RouteRequest) -> RouteResponse:
+        timings = RequestTimings()
+        if not (self.trace_requests or request.is_traced()):
+            return self.render_timed_request(request, timings)
+        with traced_request() as request_trace:
+            response = self.render_timed_request(request, timings)
+        response.headers[SERVER_TIMING_HEADER] = request_trace.get_server_timing(
+            timings,
+            time.perf_counter(),
+            mutating=request.get_request_method() == "POST"
+        )
+        return response
+
+    def render_timed_request(self, request: RouteRequest, timings: RequestTimings) -> RouteResponse:
+        match = self.match_route(request)
+        timings.matched = time.perf_counter()
+        if match is None:
+            return RouteResponse(encode_json(None))
+        route, params = match
+        version_token = route.get_version_token(request, params)
+        etag = None if version_token is None else format_etag(self.etag_prefix, version_token)
+        if etag is not None and matches_if_none_match(request.get_if_none_match(), etag):
+            # nothing the response depends on has changed, so nothing gets resolved, serialized or sent
+            self.metrics.record_request(
+                route.constraint.route_pattern, request.get_request_method(), RESULT_NOT_MODIFIED, timings
+            )
+            return RouteResponse(b"", status=304, headers=self.get_version_headers(etag))
+        try:
+            body, headers = self.get_route_body(route, request, params, timings, version_token)
+        except RetiredRouteError:
+            return self.render_timed_request(request, timings)
+        except BadRequestError as e:
+            self.metrics.record_request(
+                route.constraint.route_pattern, request.get_request_method(), RESULT_BAD_REQUEST, timings
+            )
+            return RouteResponse(encode_json({"error": True, "message": str(e)}), status=400)
+        except Exception:
+            self.metrics.record_request(
+                route.constraint.route_pattern, request.get_request_method(), RESULT_ERROR, timings
+            )
+            raise
+
+        result = RESULT_NOT_FOUND if timings.not_found else RESULT_OK
+        self.metrics.record_request(route.constraint.route_pattern, request.get_request_method(), result, timings)
+        # copied, the cached headers are shared between responses
+        headers = dict(headers)
+        if etag is not None:
+            headers.update(self.get_version_headers(etag))
+            if CONTENT_ENCODING_HEADER in headers:
+                # the compressed body is the same data in other bytes
+                headers[ETAG_HEADER] = WEAK_PREFIX + etag
+        return RouteResponse(body, headers=headers)
+
+    def get_version_headers(self, etag: str) -> dict:
+        if self.compression_threshold is None:
+            return {ETAG_HEADER: etag}
+        return {ETAG_HEADER: etag, VARY_HEADER: ACCEPT_ENCODING_HEADER}
+
+    def get_route_body(self, route: Route, request: RouteRequest, params: dict, timings: RequestTimings,
+                       version_token: typing.Optional[int]) -> typing.Tuple[bytes, dict]:
+        if version_token is None:
+            return self.encode_route_result(route, request, params, timings)
+        # The token is read before resolving: if a write lands in between, the cached body is newer than its token
+        # and simply gets re-rendered on the next request.
+        cache_key = route.get_cache_key(request, params)
+        entry = self.response_cache.get_entry(cache_key, version_token)
+        if entry is None:
+            body, headers = self.encode_route_result(route, request, params, timings)
+            entry = self.response_cache.put(
+                cache_key, version_token, body, headers, not_found=timings is not None and timings.not_found
+            )
+        elif timings is not None:
+            timings.cache_hit = True
+            timings.not_found = entry.not_found
+        return self.get_entry_body(cache_key, entry, request)
+
+    def get_entry_body(self, cache_key: tuple, entry: CacheEntry, request: RouteRequest) -> typing.Tuple[bytes, dict]:
+        # Compressed variants are made once per data version, when a client accepting their encoding first asks, and
+        # go when the entry does
+        if self.compression_threshold is None or len(entry.body) < self.compression_threshold:
+            return entry.body, entry.headers
+        encoding = choose_encoding(request.get_accept_encoding())
+        if encoding is None:
+            return entry.body, entry.headers
+        body = entry.variants.get(encoding)
+        if body is None:
+            body = compress(entry.body, encoding)
+            self.response_cache.add_variant(cache_key, entry, encoding, body)
+        return body, {**entry.headers, CONTENT_ENCODING_HEADER: encoding}
+
+    def render_metrics(self) -> RouteResponse:
+        return RouteResponse(
+            self.metrics.render(self.response_cache.get_stats()),
+            content_type=PROMETHEUS_CONTENT_TYPE
+        )
 
     def get_route_response_data(self, request_path, request_method=None, query_parameters=None,
                                 request_body=None) -> typing.Any:
@@ -103,3 +407,17 @@ class RoutesProvider:
             request_body=request_body
         )
         return self.handle_request(request)
+
+    def get_route_response(self, request_path, request_method=None, query_parameters=None,
+                           request_body=None, trace=False, if_none_match=None,
+                           accept_encoding=None) -> RouteResponse:
+        request = RouteRequest(
+            request_path=request_path,
+            request_method=request_method,
+            query_parameters=query_parameters,
+            request_body=request_body,
+            trace=trace,
+            if_none_match=if_none_match,
+            accept_encoding=accept_encoding
+        )
+        return self.render_request(request)
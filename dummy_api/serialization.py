@@ -0,0 +1,25 @@
+import collections.abc
+import json
+import typing
+from dummy_api.views import READ_ONLY_VIEW_TYPES, unwrap
+
+JSON_MIMETYPE = "application/json"
+
+
+def json_default(value: typing.Any) -> typing.Any:
+    # read-only views are serialized straight from the live data they wrap, no intermediate copies
+    if isinstance(value, READ_ONLY_VIEW_TYPES):
+        value = unwrap(value)
+        if isinstance(value, (list, dict)):
+            return value
+    # lazily ordered lists (see dummy_api.sorting) and columnar lists and their rows (see dummy_api.columnar) are
+    # only turned into lists and dicts here
+    if isinstance(value, collections.abc.Sequence) and not isinstance(value, (str, bytes)):
+        return list(value)
+    if isinstance(value, collections.abc.Mapping):
+        return dict(value)
+    raise TypeError(f"Object of type {value.__class__.__name__} is not JSON serializable")
+
+
+def encode_json(data: typing.Any) -> bytes:
+    return json.dumps(data, default=json_default, separators=(",", ":")).encode("utf-8")
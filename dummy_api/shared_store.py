@@ -0,0 +1,400 @@
+import argparse
+import collections
+import json
+import mmap
+import os
+import secrets
+import stat
+import struct
+import tempfile
+import threading
+import typing
+from multiprocessing.managers import BaseManager
+from dummy_api.backends import InMemoryBackend
+from dummy_api.data import MutableDataStore
+from dummy_api.indexes import DataGroupIndexes
+from dummy_api.lazy_loading import RoutesFileIndex
+from dummy_api.persistence import (
+    MutationLog, OPERATION_APPEND, OPERATION_DELETE, OPERATION_SET, OPERATION_UPDATE, apply_group_change,
+    discard_pending_mutations, replay_mutations, replay_pending_mutations
+)
+from dummy_api.query_plan import QueryPlan, compile_query_path
+from dummy_api.reloading import DEFAULT_POLL_INTERVAL, ReloadSummary, RoutesFileState, RoutesFileWatcher
+from dummy_api.serialization import encode_json
+
+GENERATION_FORMAT = "q"
+GENERATION_SIZE = struct.calcsize(GENERATION_FORMAT)
+DEFAULT_CHANGE_LOG_SIZE = 1000
+
+
+def apply_change(data: typing.Any, operation: str, query_plan: QueryPlan, update_data: typing.Any, params: dict,
+                 indexes: DataGroupIndexes = None) -> typing.Any:
+    # replays a change of the service's change log on a client's copy of the group
+    if operation == OPERATION_APPEND:
+        return query_plan.append_items(data, update_data, params, indexes)
+    return query_plan.update(data, update_data, params, indexes)
+
+
+class SharedDataService:
+    # Lives in the store server process and owns the authoritative copy of every data group. Every change bumps
+    # the group's version and a global generation counter published through a memory-mapped file, so clients can
+    # tell with a single memory read whether anything changed at all. Recent updates are kept per group so clients
+    # can replay them instead of re-fetching whole groups.
+
+    def __init__(self, change_log_size: int = DEFAULT_CHANGE_LOG_SIZE):
+        self.backend = InMemoryBackend()
+        self.lock = threading.Lock()
+        self.group_versions = {}
+        self.change_log_size = change_log_size
+        self.change_logs = {}
+        self.mutation_log = None
+        self.recovered_state = None
+        self.deleted_groups = set()
+        self.generation = 0
+        generation_fd, self.generation_path = tempfile.mkstemp(prefix="dummy-api-generation-")
+        os.write(generation_fd, b"\0" * GENERATION_SIZE)
+        os.close(generation_fd)
+        with open(self.generation_path, "r+b") as f:
+            self.generation_map = mmap.mmap(f.fileno(), GENERATION_SIZE)
+
+    def get_generation_path(self) -> str:
+        return self.generation_path
+
+    def get_group_versions(self) -> dict:
+        with self.lock:
+            return dict(self.group_versions)
+
+    def get_group(self, name: str) -> typing.Tuple[int, typing.Any]:
+        with self.lock:
+            return self.group_versions.get(name, 0), self.backend.get_group(name)
+
+    def get_group_changes(self, name: str, since_version: int) -> typing.Optional[list]:
+        # None means the changes since that version aren't all known and the group has to be fetched again
+        with self.lock:
+            changes = [change for change in self.change_logs.get(name, []) if change[0] > since_version]
+            expected_change_count = self.group_versions.get(name, 0) - since_version
+            if len(changes) != expected_change_count or any(change[1] is None for change in changes):
+                return None
+            return changes
+
+    def record_change(self, name: str, query_string: typing.Optional[str] = None, update_data: typing.Any = None,
+                      params: dict = None, operation: str = OPERATION_UPDATE) -> typing.Tuple[int, int]:
+        previous_version = self.group_versions.get(name, 0)
+        version = previous_version + 1
+        self.group_versions[name] = version
+        change_log = self.change_logs.setdefault(name, collections.deque(maxlen=self.change_log_size))
+        change_log.append((version, query_string, update_data, params, operation))
+        self.generation += 1
+        struct.pack_into(GENERATION_FORMAT, self.generation_map, 0, self.generation)
+        return previous_version, version
+
+    def enable_mutation_log(self, mutation_log: MutationLog):
+        with self.lock:
+            recovered_state = mutation_log.recover()
+            for name in replay_mutations(self.backend, recovered_state):
+                self.record_change(name)
+            self.deleted_groups = recovered_state.deleted_groups
+            self.recovered_state = recovered_state
+            self.mutation_log = mutation_log
+        mutation_log.start(self.get_snapshot)
+
+    def record_mutation(self, operation: str, name: str, query_string: str = None, data: typing.Any = None,
+                        params: dict = None):
+        if self.mutation_log:
+            self.mutation_log.append(operation, name, query_string, data, params)
+
+    def discard_pending_mutations(self) -> int:
+        with self.lock:
+            return discard_pending_mutations(self.recovered_state) if self.recovered_state else 0
+
+    def get_snapshot(self) -> typing.Optional[dict]:
+        with self.lock:
+            if self.recovered_state.pending_records:
+                return None
+            snapshot = {name: (self.mutation_log.get_last_seq(), None) for name in self.deleted_groups}
+            for name, data in self.backend.data_groups.items():
+                snapshot[name] = (self.mutation_log.get_last_seq(), encode_json(data))
+            return snapshot
+
+    def set_group(self, name: str, data: typing.Any) -> int:
+        with self.lock:
+            self.backend.set_group(name, data)
+            self.deleted_groups.discard(name)
+            self.record_mutation(OPERATION_SET, name, data=data)
+            return self.record_change(name)[1]
+
+    def seed_group(self, name: str, data: typing.Any) -> bool:
+        with self.lock:
+            if name in self.deleted_groups or not self.backend.seed_group(name, data):
+                return False
+            if self.recovered_state:
+                replay_pending_mutations(self.backend, self.recovered_state, name)
+            self.record_change(name)
+            return True
+
+    def delete_group(self, name: str) -> int:
+        with self.lock:
+            self.backend.delete_group(name)
+            self.deleted_groups.add(name)
+            self.record_mutation(OPERATION_DELETE, name)
+            return self.record_change(name)[1]
+
+    def update_group(self, name: str, query_string: str, update_data: typing.Any, params: dict,
+                     operation: str = OPERATION_UPDATE) -> typing.Tuple[int, int]:
+        # operation is OPERATION_UPDATE or OPERATION_APPEND, where update_data is the list of items
+        with self.lock:
+            try:
+                apply_group_change(self.backend, name, operation, compile_query_path(query_string), update_data, params)
+            except Exception:
+                # the update may have partially applied, clients have to re-fetch the group
+                self.record_change(name)
+                raise
+            finally:
+                self.record_mutation(operation, name, query_string, update_data, params)
+            return self.record_change(name, query_string, update_data, params, operation)
+
+
+shared_data_service = None
+
+
+def get_shared_data_service() -> SharedDataService:
+    global shared_data_service
+    if shared_data_service is None:
+        shared_data_service = SharedDataService()
+    return shared_data_service
+
+
+class SharedStoreManager(BaseManager):
+    pass
+
+
+SharedStoreManager.register("SharedDataService", callable=get_shared_data_service)
+
+
+class SharedStoreBackend(InMemoryBackend):
+    # Client side of the shared store. Groups are cached in this process and kept up to date by replaying the
+    # changes other processes made, which is only checked for when the shared generation counter moves.
+
+    owns_groups = False
+
+    def __init__(self, address: typing.Union[str, tuple], authkey: bytes):
+        super().__init__()
+        self.manager = SharedStoreManager(address=address, authkey=authkey)
+        self.manager.connect()
+        self.service = self.manager.SharedDataService()
+        with open(self.service.get_generation_path(), "rb") as f:
+            self.generation_map = mmap.mmap(f.fileno(), GENERATION_SIZE, access=mmap.ACCESS_READ)
+        self.group_versions = {}
+        self.seen_generation = None
+        self.server_group_versions = {}
+
+    def get_generation(self) -> int:
+        return struct.unpack_from(GENERATION_FORMAT, self.generation_map, 0)[0]
+
+    def fetch_group(self, name: str) -> typing.Any:
+        # replacing a local copy may take in changes to any path of the group, made by other processes
+        replaced = name in self.data_groups
+        version, data = self.service.get_group(name)
+        data = self.make_columnar(name, data)
+        self.data_groups[name] = data
+        self.group_versions[name] = version
+        if replaced and self.group_replaced_listener is not None:
+            self.group_replaced_listener(name)
+        return data
+
+    def get_group(self, name: str) -> typing.Any:
+        if name not in self.data_groups:
+            return self.fetch_group(name)
+        return self.data_groups.get(name)
+
+    def has_group(self, name: str) -> bool:
+        return self.get_group(name) is not None
+
+    def set_group(self, name: str, data: typing.Any):
+        self.group_versions[name] = self.service.set_group(name, data)
+        self.data_groups[name] = self.make_columnar(name, data)
+
+    def seed_group(self, name: str, data: typing.Any) -> bool:
+        seeded = self.service.seed_group(name, data)
+        self.data_groups.pop(name, None)
+        return seeded
+
+    def seed_group_loader(self, name: str, loader: callable) -> bool:
+        # the server holds every group, so only load the group if it doesn't know it yet
+        if name in self.service.get_group_versions():
+            return False
+        return self.seed_group(name, loader())
+
+    def delete_group(self, name: str):
+        self.group_versions[name] = self.service.delete_group(name)
+        self.data_groups[name] = None
+
+    def update_group(self, name: str, query_plan: QueryPlan, update_data: typing.Any, params: dict,
+                     indexes: DataGroupIndexes = None) -> typing.Any:
+        return self.change_group(name, OPERATION_UPDATE, query_plan, update_data, params, indexes)
+
+    def append_group_items(self, name: str, query_plan: QueryPlan, items: list, params: dict,
+                           indexes: DataGroupIndexes = None) -> typing.Any:
+        return self.change_group(name, OPERATION_APPEND, query_plan, items, params, indexes)
+
+    def change_group(self, name: str, operation: str, query_plan: QueryPlan, update_data: typing.Any, params: dict,
+                     indexes: DataGroupIndexes = None) -> typing.Any:
+        previous_version, version = self.service.update_group(
+            name, query_plan.query_string, update_data, params, operation
+        )
+        if name in self.data_groups and self.group_versions.get(name) == previous_version:
+            # nobody else wrote in between, apply the same change to the local copy instead of re-fetching it
+            result = apply_change(self.data_groups[name], operation, query_plan, update_data, params, indexes)
+            self.group_versions[name] = version
+            return result
+        return self.fetch_group(name)
+
+    def discard_pending_mutations(self) -> int:
+        return self.service.discard_pending_mutations()
+
+    def has_remote_changes(self, name: str) -> bool:
+        generation = self.get_generation()
+        if generation != self.seen_generation:
+            self.server_group_versions = self.service.get_group_versions()
+            self.seen_generation = generation
+        if name not in self.data_groups:
+            return False
+        return self.server_group_versions.get(name, 0) != self.group_versions.get(name)
+
+    def pull_remote_changes(self, name: str, indexes: DataGroupIndexes = None) -> typing.List[tuple]:
+        changes = self.service.get_group_changes(name, self.group_versions.get(name, 0))
+        if changes is None:
+            self.fetch_group(name)
+            return [()]
+
+        changed_paths = []
+        for version, query_string, update_data, params, operation in changes:
+            query_plan = compile_query_path(query_string)
+            try:
+                apply_change(self.data_groups[name], operation, query_plan, update_data, params, indexes)
+            except Exception:
+                self.fetch_group(name)
+                return [()]
+            self.group_versions[name] = version
+            changed_paths.append(query_plan.get_dependency_path(params))
+        return changed_paths
+
+
+def parse_address(address: str) -> typing.Union[str, tuple]:
+    # "host:port" for TCP, anything else is taken as a unix socket path
+    host, separator, port = address.rpartition(":")
+    if separator and port.isdigit():
+        return host, int(port)
+    return address
+
+
+# The store server and its clients exchange pickles, so whoever knows the authkey can run code in all of them: there
+# is no default key, it is either given explicitly or generated by the server and handed to the workers in a file
+# only the owner can read.
+def generate_authkey() -> bytes:
+    return secrets.token_hex(32).encode("utf-8")
+
+
+def write_authkey_file(file_path: str, authkey: bytes):
+    file_descriptor = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(file_descriptor, "wb") as f:
+        os.fchmod(f.fileno(), 0o600)
+        f.write(authkey)
+
+
+def read_authkey_file(file_path: str) -> bytes:
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_mode & (stat.S_IRWXG | stat.S_IRWXO):
+            raise ValueError(f"{file_path} must only be accessible by its owner")
+        authkey = f.read().strip()
+    if not authkey:
+        raise ValueError(f"{file_path} holds no authkey")
+    return authkey
+
+
+def get_environment_authkey() -> typing.Optional[bytes]:
+    authkey = os.environ.get("DUMMY_API_STORE_AUTHKEY")
+    if authkey:
+        return authkey.encode("utf-8")
+    authkey_file = os.environ.get("DUMMY_API_STORE_AUTHKEY_FILE")
+    if authkey_file:
+        return read_authkey_file(authkey_file)
+    return None
+
+
+def start_shared_store_server(authkey: bytes,
+                              address: typing.Union[str, tuple] = ("127.0.0.1", 0)) -> SharedStoreManager:
+    manager = SharedStoreManager(address=address, authkey=authkey)
+    manager.start()
+    return manager
+
+
+def connect_shared_data_store(address: typing.Union[str, tuple], authkey: bytes) -> MutableDataStore:
+    return MutableDataStore(backend=SharedStoreBackend(address, authkey))
+
+
+def seed_from_routes_file(service: SharedDataService, file_path: str):
+    with open(file_path, "r") as f:
+        raw_route_data = json.loads(f.read())
+    for group_dict in raw_route_data.get("data_groups", []):
+        service.seed_group(group_dict.get("group_name"), group_dict.get("data"))
+
+
+class SharedGroupsReloader(RoutesFileWatcher):
+    # Reseeds the data groups of a changed routes file in the store server, the only process that does: workers
+    # sharing the store only reload their routes (see dummy_api.reloading.RoutesReloader) and pick up the new data
+    # like any other change.
+
+    def __init__(self, service: SharedDataService, file_path: str, poll_interval: float = DEFAULT_POLL_INTERVAL):
+        self.service = service
+        super().__init__(file_path, poll_interval)
+
+    def apply(self, state: RoutesFileState, routes_file_index: RoutesFileIndex) -> ReloadSummary:
+        changed_groups, removed_groups = self.get_group_changes(state)
+        for name in changed_groups:
+            self.service.set_group(name, routes_file_index.load_group(name))
+        for name in removed_groups:
+            self.service.delete_group(name)
+        return ReloadSummary(0, 0, changed_groups, removed_groups)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve dummy-api data groups to multiple worker processes")
+    parser.add_argument("routes_file", nargs="?", help="routes file to seed the data groups from")
+    parser.add_argument("--address", default=os.environ.get("DUMMY_API_STORE_ADDRESS", "127.0.0.1:5555"))
+    parser.add_argument("--authkey", default=os.environ.get("DUMMY_API_STORE_AUTHKEY"),
+                        help="key the workers authenticate with, anyone who knows it can run code in the server")
+    parser.add_argument("--authkey-file", default=os.environ.get("DUMMY_API_STORE_AUTHKEY_FILE"),
+                        help="without --authkey, generate a random key and write it to this file for the workers")
+    parser.add_argument("--data-dir", default=os.environ.get("DUMMY_API_DATA_DIR"),
+                        help="directory to keep the mutation log and snapshots in")
+    parser.add_argument("--reload", action="store_true",
+                        default=os.environ.get("DUMMY_API_RELOAD", "").lower() not in ["", "0", "false"],
+                        help="reseed the data groups whenever the routes file changes")
+    parser.add_argument("--reload-interval", type=float,
+                        default=float(os.environ.get("DUMMY_API_RELOAD_INTERVAL", DEFAULT_POLL_INTERVAL)))
+    args = parser.parse_args()
+    if args.authkey:
+        authkey = args.authkey.encode("utf-8")
+    elif args.authkey_file:
+        authkey = generate_authkey()
+        write_authkey_file(args.authkey_file, authkey)
+    else:
+        parser.error("an authkey is required, set --authkey/DUMMY_API_STORE_AUTHKEY "
+                     "or --authkey-file/DUMMY_API_STORE_AUTHKEY_FILE")
+
+    if args.data_dir:
+        get_shared_data_service().enable_mutation_log(MutationLog(args.data_dir))
+    if args.routes_file:
+        seed_from_routes_file(get_shared_data_service(), args.routes_file)
+        get_shared_data_service().discard_pending_mutations()
+        if args.reload:
+            SharedGroupsReloader(get_shared_data_service(), args.routes_file, args.reload_interval).start()
+    manager = SharedStoreManager(address=parse_address(args.address), authkey=authkey)
+    server = manager.get_server()
+    print(f"Serving shared data store on {server.address}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import bisect
+import collections.abc
+import math
+import typing
+from dummy_api import tracing
+from dummy_api.indexes import DataGroupIndexes, get_item_sort_key
+from dummy_api.request import QueryParameterError
+from dummy_api.views import unwrap
+
+SORT_PARAMETER = "sort"
+DESCENDING_PREFIX = "-"
+
+
+class SortError(QueryParameterError):
+    pass
+
+
+class IndexOrderView(collections.abc.Sequence):
+    # A list in the order of a SortedIndex's entries, with the items that can't be ordered last. Items are only
+    # looked up as they are read, so paging a sorted list costs as much as the page.
+    __slots__ = ("items", "entries", "unordered", "descending")
+
+    def __init__(self, items: typing.Sequence, entries: list, unordered: list, descending: bool = False):
+        self.items = items
+        self.entries = entries
+        self.unordered = unordered
+        self.descending = descending
+
+    def __len__(self) -> int:
+        return len(self.entries) + len(self.unordered)
+
+    def get_position(self, index: int) -> int:
+        entry_count = len(self.entries)
+        if index >= entry_count:
+            return self.unordered[index - entry_count]
+        if not self.descending:
+            return self.entries[index][2]
+        # values in descending order, but items with equal values keep their list order like sort_items does: find
+        # the run of entries sharing the value and count from its start
+        rank, value, _ = self.entries[entry_count - 1 - index]
+        start = bisect.bisect_left(self.entries, (rank, value))
+        end = bisect.bisect_left(self.entries, (rank, value, math.inf))
+        return self.entries[start + index - (entry_count - end)][2]
+
+    def __getitem__(self, index) -> typing.Any:
+        if isinstance(index, slice):
+            return [self.items[self.get_position(i)] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("list index out of range")
+        return self.items[self.get_position(index)]
+
+
+def sort_items(items: typing.Iterable, fields: tuple) -> list:
+    # one stable sort per field, last field first, items whose value can't be ordered go last either way
+    ordered = list(items)
+    for field, descending in reversed(fields):
+        unordered_key = (-1,) if descending else (1,)
+
+        def get_key(item: typing.Any, field: str = field, unordered_key: tuple = unordered_key) -> tuple:
+            sort_key = get_item_sort_key(item, field)
+            return unordered_key if sort_key is None else (0,) + sort_key
+
+        ordered.sort(key=get_key, reverse=descending)
+    return ordered
+
+
+class SortOrder(typing.NamedTuple):
+    # sort=last_name,-born, (field, descending) pairs
+    fields: tuple
+
+    def apply(self, result: typing.Any, indexes: DataGroupIndexes = None, list_path: tuple = None) -> typing.Any:
+        # A single field with a sorted index on the list (at list_path in its data group) is served in the index's
+        # order, anything else is sorted here
+        if not isinstance(result, collections.abc.Sequence) or isinstance(result, (str, bytes)):
+            return result
+        items = unwrap(result)
+        if len(self.fields) == 1 and indexes is not None and list_path is not None:
+            field, descending = self.fields[0]
+            index = indexes.get_sorted_index(list_path, field)
+            if index is not None:
+                tracing.count(tracing.COUNTER_INDEX_LOOKUPS)
+                return IndexOrderView(items, *index.get_entries(items), descending=descending)
+        tracing.count(tracing.COUNTER_LIST_ITEMS_SCANNED, len(items))
+        return sort_items(items, self.fields)
+
+
+def get_sort_order(query_params: dict) -> typing.Optional[SortOrder]:
+    sort = query_params.get(SORT_PARAMETER)
+    if sort is None:
+        return None
+    fields = []
+    for field in sort.split(","):
+        field = field.strip()
+        descending = field.startswith(DESCENDING_PREFIX)
+        field = field[len(DESCENDING_PREFIX):] if descending else field
+        if not field:
+            raise SortError(f"Invalid field in '{SORT_PARAMETER}': '{sort}'")
+        fields.append((field, descending))
+    return SortOrder(tuple(fields))
@@ -0,0 +1,59 @@
+import contextlib
+import contextvars
+import typing
+from dummy_api.metrics import RequestTimings
+
+TRACE_HEADER = "X-Dummy-Api-Trace"
+SERVER_TIMING_HEADER = "Server-Timing"
+COUNTER_LIST_ITEMS_SCANNED = "list_items_scanned"
+COUNTER_INDEX_LOOKUPS = "index_lookups"
+
+current_trace = contextvars.ContextVar("dummy_api_trace", default=None)
+
+
+class RequestTrace:
+    # Stage timings and counters of one traced request. Code anywhere below RoutesProvider.render_request adds to
+    # the trace of the request it runs for through count(), which is a no-op for untraced requests.
+
+    def __init__(self):
+        self.counters = {}
+
+    def add_count(self, name: str, amount: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def get_server_timing(self, timings: RequestTimings, finished: float, mutating: bool = False) -> str:
+        # durations are in milliseconds, as the Server-Timing header expects
+        entries = [format_timing_entry("match", timings.matched - timings.started)]
+        if timings.cache_hit:
+            entries.append('cache;desc="hit"')
+        elif timings.resolved is not None:
+            entries.append(format_timing_entry("mutate" if mutating else "resolve", timings.resolved - timings.matched))
+            entries.append(format_timing_entry("serialize", timings.serialized - timings.resolved))
+        entries.append(format_timing_entry("total", finished - timings.started))
+        for name, amount in sorted(self.counters.items()):
+            entries.append(f'{name};desc="{amount}"')
+        return ", ".join(entries)
+
+
+def format_timing_entry(name: str, duration_s: float) -> str:
+    return f"{name};dur={duration_s * 1000:.3f}"
+
+
+def count(name: str, amount: int = 1):
+    request_trace = current_trace.get()
+    if request_trace is not None:
+        request_trace.add_count(name, amount)
+
+
+@contextlib.contextmanager
+def traced_request() -> typing.Iterator[RequestTrace]:
+    request_trace = RequestTrace()
+    token = current_trace.set(request_trace)
+    try:
+        yield request_trace
+    finally:
+        current_trace.reset(token)
+
+
+def is_trace_requested(header_value: typing.Optional[str]) -> bool:
+    return header_value is not None and header_value.lower() not in ["", "0", "false"]
@@ -2,4 +2,14 @@ class RoutesFileValidator:
 
     @staticmethod
     def validate_file_data(data: dict):
-        return "routes" in data
\ No newline at end of file
+        if not isinstance(data, dict) or not isinstance(data.get("routes"), list):
+            return False
+        if not isinstance(data.get("data_groups", []), list):
+            return False
+        return all(RoutesFileValidator.validate_route_entry(route) for route in data["routes"]) and all(
+            isinstance(group, dict) and "group_name" in group for group in data.get("data_groups", [])
+        )
+
+    @staticmethod
+    def validate_route_entry(route: dict):
+        return isinstance(route, dict) and isinstance(route.get("path"), str) and isinstance(route.get("data"), dict)
\ No newline at end of file
@@ -0,0 +1,47 @@
+import threading
+
+
+class VersionNode:
+    __slots__ = ("children", "version", "subtree_version")
+
+    def __init__(self):
+        self.children = {}
+        self.version = 0  # bumped when the value at exactly this path is mutated
+        self.subtree_version = 0  # bumped when this path or anything below it is mutated
+
+
+class DataVersions:
+    # Version counters over data paths ((group name, key, key, ...) tuples). A token for a path changes whenever
+    # that path, one of its ancestors or one of its descendants is mutated, and stays the same for mutations of
+    # unrelated paths. Nodes are only created by mutations, so reads never grow the tree.
+
+    def __init__(self):
+        self.root = VersionNode()
+        self.lock = threading.Lock()
+
+    def bump(self, path: tuple):
+        # writers to different groups share the ancestors of their paths, so bumps are serialized
+        with self.lock:
+            node = self.root
+            node.subtree_version += 1
+            for key in path:
+                child = node.children.get(key)
+                if child is None:
+                    child = node.children[key] = VersionNode()
+                node = child
+                node.subtree_version += 1
+            node.version += 1
+
+    def get_token(self, path: tuple) -> int:
+        # counters only ever increase, so the sum changes whenever any counter it covers does
+        token = 0
+        node = self.root
+        for key in path:
+            token += node.version
+            node = node.children.get(key)
+            if node is None:
+                return token
+        return token + node.subtree_version
+
+    def get_group_token(self, group_name: str) -> int:
+        return self.get_token((group_name,))
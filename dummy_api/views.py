@@ -0,0 +1,86 @@
+import collections.abc
+import typing
+
+
+class ReadOnlyMappingView(collections.abc.Mapping):
+    __slots__ = ("_data",)
+
+    def __init__(self, data: collections.abc.Mapping):
+        self._data = data
+
+    def __getitem__(self, key) -> typing.Any:
+        return make_read_only(self._data[key])
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+    def __eq__(self, other) -> bool:
+        return self._data == unwrap(other)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._data!r})"
+
+
+class ReadOnlySequenceView(collections.abc.Sequence):
+    __slots__ = ("_data",)
+
+    def __init__(self, data: collections.abc.Sequence):
+        self._data = data
+
+    def __getitem__(self, index) -> typing.Any:
+        if isinstance(index, slice):
+            return ReadOnlySequenceView(self._data[index])
+        return make_read_only(self._data[index])
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __eq__(self, other) -> bool:
+        return self._data == unwrap(other)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._data!r})"
+
+
+READ_ONLY_VIEW_TYPES = (ReadOnlyMappingView, ReadOnlySequenceView)
+
+
+def make_read_only(value: typing.Any) -> typing.Any:
+    # Scalars are immutable already, containers get wrapped one level at a time as they are accessed
+    if isinstance(value, dict):
+        return ReadOnlyMappingView(value)
+    if isinstance(value, list):
+        return ReadOnlySequenceView(value)
+    if isinstance(value, READ_ONLY_VIEW_TYPES) or isinstance(value, (str, bytes)):
+        return value
+    if isinstance(value, collections.abc.Mapping):
+        return ReadOnlyMappingView(value)
+    if isinstance(value, collections.abc.Sequence):
+        return ReadOnlySequenceView(value)
+    return value
+
+
+def unwrap(value: typing.Any) -> typing.Any:
+    # Only meant for serializers and comparisons, which read the live data without holding on to it
+    if isinstance(value, READ_ONLY_VIEW_TYPES):
+        return value._data
+    return value
+
+
+def materialize(value: typing.Any) -> typing.Any:
+    value = unwrap(value)
+    if isinstance(value, collections.abc.Mapping):
+        return {key: materialize(item) for key, item in value.items()}
+    if isinstance(value, collections.abc.Sequence) and not isinstance(value, (str, bytes)):
+        return [materialize(item) for item in value]
+    return value
@@ -0,0 +1,22 @@
+import json
+import pathlib
+import typing
+from dummy_api.routes import RoutesProvider
+
+
+def make_route_provider(tmp_path: pathlib.Path, data_groups: dict, routes: list) -> RoutesProvider:
+    # a routes file in tmp_path, data_groups maps group names to their data
+    file_path = tmp_path / "routes.json"
+    file_path.write_text(json.dumps({
+        "data_groups": [{"group_name": group_name, "data": data} for group_name, data in data_groups.items()],
+        "routes": routes
+    }))
+    return RoutesProvider(str(file_path))
+
+
+def get_json(route_provider: RoutesProvider, path: str, **kwargs) -> typing.Any:
+    return json.loads(route_provider.get_route_response(path, **kwargs).get_body())
+
+
+def get_ids(items: typing.Iterable) -> list:
+    return [item["id"] for item in items]
@@ -1,6 +1,7 @@
 import pytest
 import json
 import os
+import threading
 from dummy_api.routes import RoutesProvider
 
 
@@ -225,3 +226,100 @@ class TestDynamicRoute:
 
         assert result_2 == payload[0]
 
+
+class TestRoutesProviderResponseCache:
+
+    def test_repeated_get_is_served_from_cache(self, route_provider):
+        first = route_provider.get_route_response("/friends/1")
+        second = route_provider.get_route_response("/friends/1")
+        assert json.loads(second.get_body()).get("first_name") == "Stephen"
+        assert first.get_body() == second.get_body()
+        assert route_provider.response_cache.get_stats()["hits"] == 1
+
+    def test_post_invalidates_overlapping_responses(self, route_provider):
+        route_provider.get_route_response("/friends")
+        route_provider.get_route_response("/friends/3")
+        route_provider.get_route_response(
+            "/friends",
+            request_method="POST",
+            request_body={"payload": {"id": 3, "first_name": "Robert"}}
+        )
+        assert json.loads(route_provider.get_route_response("/friends/3").get_body()).get("first_name") == "Robert"
+        assert len(json.loads(route_provider.get_route_response("/friends").get_body()).get("friends")) == 3
+        assert route_provider.response_cache.get_stats()["invalidations"] == 2
+
+    def test_post_keeps_unrelated_responses(self, route_provider):
+        route_provider.get_route_response("/friends/1")
+        route_provider.get_route_response(
+            "/meta",
+            request_method="POST",
+            request_body={"payload": {"name": "New meta"}}
+        )
+        route_provider.get_route_response("/friends/1")
+        stats = route_provider.response_cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["invalidations"] == 0
+
+
+class TestRoutesProviderConcurrency:
+
+    def test_concurrent_posts_and_gets_lose_no_updates(self, route_provider):
+        thread_count = 8
+        posts_per_thread = 200
+        errors = []
+
+        def post_friends(thread_number):
+            try:
+                for i in range(posts_per_thread):
+                    route_provider.get_route_response(
+                        "/friends",
+                        request_method="POST",
+                        request_body={"payload": {"id": 1000 * (thread_number + 1) + i}}
+                    )
+            except Exception as e:
+                errors.append(e)
+
+        def get_friends():
+            try:
+                for i in range(posts_per_thread):
+                    json.loads(route_provider.get_route_response("/friends").get_body())
+                    route_provider.get_route_response(f"/friends/{1000 + i}")
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=post_friends, args=(n,)) for n in range(thread_count)]
+        threads += [threading.Thread(target=get_friends) for _ in range(thread_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        friends = json.loads(route_provider.get_route_response("/friends").get_body()).get("friends")
+        assert len(friends) == 2 + thread_count * posts_per_thread
+        assert json.loads(route_provider.get_route_response("/friends/8199").get_body()) == {"id": 8199}
+
+
+class TestRoutesProviderLazyData:
+
+    @pytest.mark.parametrize("use_mmap", [False, True])
+    def test_lazy_provider_serves_same_data(self, route_provider, use_mmap):
+        lazy_route_provider = RoutesProvider(
+            os.path.join(os.path.dirname(__file__), "routes.test.json"),
+            lazy_data=True,
+            use_mmap=use_mmap
+        )
+        assert lazy_route_provider.main_data_store.data_groups == {}
+        for path in ["/friends", "/friends/1", "/friends/101", "/data/anything"]:
+            assert lazy_route_provider.get_route_response(path).get_body() == \
+                route_provider.get_route_response(path).get_body()
+        assert set(lazy_route_provider.main_data_store.data_groups) == {"friends", "dynamic_data"}
+
+    def test_post_to_lazy_group(self):
+        lazy_route_provider = RoutesProvider(os.path.join(os.path.dirname(__file__), "routes.test.json"), lazy_data=True)
+        lazy_route_provider.get_route_response(
+            "/friends",
+            request_method="POST",
+            request_body={"payload": {"id": 3, "first_name": "Robert"}}
+        )
+        assert lazy_route_provider.get_route_response_data("/friends/3").get("first_name") == "Robert"
@@ -0,0 +1,192 @@
+import pytest
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+from dummy_api import shared_store
+from dummy_api.environment import get_environment_data_store
+from dummy_api.reloading import RoutesReloader
+from dummy_api.routes import RoutesProvider
+from dummy_api.shared_store import (
+    SharedGroupsReloader, connect_shared_data_store, generate_authkey, parse_address, read_authkey_file,
+    start_shared_store_server, write_authkey_file
+)
+from tests.conftest import get_json
+
+ROUTES_FILE_PATH = os.path.join(os.path.dirname(__file__), "routes.test.json")
+
+
+@pytest.fixture
+def authkey():
+    return generate_authkey()
+
+
+@pytest.fixture
+def store_server(authkey):
+    manager = start_shared_store_server(authkey)
+    yield manager
+    manager.shutdown()
+
+
+@pytest.fixture
+def workers(store_server, authkey):
+    # two route providers sharing one store, like two pre-forked workers
+    return [
+        RoutesProvider(ROUTES_FILE_PATH, data_store=connect_shared_data_store(store_server.address, authkey))
+        for _ in range(2)
+    ]
+
+
+class TestSharedDataStore:
+
+    def test_later_worker_does_not_reseed_groups(self, store_server, authkey, workers):
+        first, second = workers
+        first.get_route_response("/friends", request_method="POST", request_body={"payload": {"id": 3}})
+        seeded_later = RoutesProvider(
+            ROUTES_FILE_PATH, data_store=connect_shared_data_store(store_server.address, authkey)
+        )
+        assert len(get_json(seeded_later, "/friends").get("friends")) == 3
+
+    def test_post_is_visible_to_other_worker(self, workers):
+        first, second = workers
+        assert get_json(second, "/friends/3") == {"error": True, "message": "Not found"}
+        first.get_route_response(
+            "/friends",
+            request_method="POST",
+            request_body={"payload": {"id": 3, "first_name": "Robert"}}
+        )
+        assert get_json(second, "/friends/3").get("first_name") == "Robert"
+        assert len(get_json(second, "/friends").get("friends")) == 3
+        assert second.response_cache.get_stats()["invalidations"] == 1
+
+    def test_bulk_post_is_visible_to_other_worker(self, workers):
+        first, second = workers
+        get_json(second, "/friends")
+        first.get_route_response("/friends", request_method="POST", request_body={
+            "payload": [{"id": 3, "first_name": "Robert"}, {"id": 4, "first_name": "Fanny"}], "bulk": True
+        })
+        assert get_json(second, "/friends/4").get("first_name") == "Fanny"
+        assert len(get_json(second, "/friends").get("friends")) == 4
+        assert len(get_json(first, "/friends").get("friends")) == 4
+
+    def test_item_update_is_visible_to_other_worker(self, workers):
+        first, second = workers
+        assert get_json(second, "/friends/1").get("first_name") == "Stephen"
+        first.get_route_response(
+            "/friends/1",
+            request_method="POST",
+            request_body={"payload": {"id": 1, "first_name": "Steve"}}
+        )
+        assert get_json(second, "/friends/1").get("first_name") == "Steve"
+        assert get_json(first, "/friends/1").get("first_name") == "Steve"
+
+    def test_refetch_after_a_concurrent_write_invalidates_the_group(self, workers):
+        first, second = workers
+        etag = second.get_route_response("/friends/1").get_headers()["ETag"]
+        # the first worker's write lands after the second worker last synced
+        second.main_data_store.backend.has_remote_changes = lambda name: False
+        first.get_route_response(
+            "/friends/1", request_method="POST", request_body={"payload": {"id": 1, "first_name": "Bob"}}
+        )
+        second.get_route_response("/meta", request_method="POST", request_body={"payload": {"name": "updated"}})
+        response = second.get_route_response("/friends/1", if_none_match=etag)
+        assert response.get_status() == 200
+        assert json.loads(response.get_body()).get("first_name") == "Bob"
+
+    def test_replaced_group_is_visible_to_other_worker(self, workers):
+        first, second = workers
+        get_json(second, "/friends")
+        first.main_data_store.add_data_group("friends", {"friends": []})
+        assert get_json(second, "/friends") == {"friends": []}
+
+    def test_interleaved_writes_from_both_workers(self, workers):
+        first, second = workers
+        for friend_id in range(3, 13):
+            writer = workers[friend_id % 2]
+            writer.get_route_response("/friends", request_method="POST", request_body={"payload": {"id": friend_id}})
+        assert get_json(first, "/friends") == get_json(second, "/friends")
+        assert [friend["id"] for friend in get_json(first, "/friends").get("friends")] == list(range(1, 13))
+
+
+    def test_only_the_store_server_reseeds_reloaded_groups(self, store_server, authkey, tmp_path):
+        routes_file = tmp_path / "routes.json"
+        shutil.copy(ROUTES_FILE_PATH, routes_file)
+        first, second = [
+            RoutesProvider(str(routes_file), data_store=connect_shared_data_store(store_server.address, authkey))
+            for _ in range(2)
+        ]
+        group_reloader = SharedGroupsReloader(store_server.SharedDataService(), str(routes_file))
+        route_reloaders = [RoutesReloader(first), RoutesReloader(second)]
+        second.get_route_response("/friends", request_method="POST", request_body={"payload": {"id": 3}})
+
+        with open(routes_file, "r") as f:
+            raw_route_data = json.loads(f.read())
+        raw_route_data["data_groups"][0]["data"]["meta"]["name"] = "Changed"
+        with open(routes_file, "w") as f:
+            f.write(json.dumps(raw_route_data))
+        for route_reloader in route_reloaders:
+            assert route_reloader.reload().changed_groups == []
+        assert get_json(first, "/friends").get("meta").get("name") != "Changed"
+        assert group_reloader.reload().changed_groups == [raw_route_data["data_groups"][0]["group_name"]]
+        for worker in [first, second]:
+            assert get_json(worker, "/friends").get("meta").get("name") == "Changed"
+
+
+class TestAuthkey:
+
+    def test_wrong_authkey_is_refused(self, store_server):
+        with pytest.raises(multiprocessing.AuthenticationError):
+            connect_shared_data_store(store_server.address, generate_authkey())
+
+    def test_server_refuses_to_start_without_authkey(self, mocker, monkeypatch, capsys):
+        monkeypatch.delenv("DUMMY_API_STORE_AUTHKEY", raising=False)
+        monkeypatch.delenv("DUMMY_API_STORE_AUTHKEY_FILE", raising=False)
+        mocker.patch.object(sys, "argv", ["shared_store.py", "--address", "127.0.0.1:0"])
+        get_server = mocker.patch.object(shared_store.SharedStoreManager, "get_server")
+        with pytest.raises(SystemExit):
+            shared_store.main()
+        assert "an authkey is required" in capsys.readouterr().err
+        get_server.assert_not_called()
+
+    def test_server_writes_a_generated_authkey_for_the_workers(self, mocker, monkeypatch, tmp_path):
+        monkeypatch.delenv("DUMMY_API_STORE_AUTHKEY", raising=False)
+        authkey_file = str(tmp_path / "authkey")
+        mocker.patch.object(
+            sys, "argv", ["shared_store.py", "--address", "127.0.0.1:0", "--authkey-file", authkey_file]
+        )
+        manager = mocker.patch.object(shared_store, "SharedStoreManager")
+        shared_store.main()
+        assert os.stat(authkey_file).st_mode & 0o777 == 0o600
+        assert manager.call_args.kwargs["authkey"] == read_authkey_file(authkey_file)
+
+    def test_worker_reads_the_authkey_file(self, store_server, authkey, monkeypatch, tmp_path):
+        authkey_file = str(tmp_path / "authkey")
+        write_authkey_file(authkey_file, authkey)
+        monkeypatch.setenv("DUMMY_API_STORE_ADDRESS", "{}:{}".format(*store_server.address))
+        monkeypatch.delenv("DUMMY_API_STORE_AUTHKEY", raising=False)
+        monkeypatch.setenv("DUMMY_API_STORE_AUTHKEY_FILE", authkey_file)
+        assert isinstance(get_environment_data_store().backend, shared_store.SharedStoreBackend)
+
+    def test_worker_refuses_to_connect_without_authkey(self, monkeypatch):
+        monkeypatch.setenv("DUMMY_API_STORE_ADDRESS", "127.0.0.1:5555")
+        monkeypatch.delenv("DUMMY_API_STORE_AUTHKEY", raising=False)
+        monkeypatch.delenv("DUMMY_API_STORE_AUTHKEY_FILE", raising=False)
+        with pytest.raises(ValueError):
+            get_environment_data_store()
+
+    def test_authkey_files_readable_by_others_are_refused(self, tmp_path):
+        authkey_file = str(tmp_path / "authkey")
+        write_authkey_file(authkey_file, generate_authkey())
+        os.chmod(authkey_file, 0o644)
+        with pytest.raises(ValueError):
+            read_authkey_file(authkey_file)
+
+
+class TestParseAddress:
+
+    def test_host_and_port(self):
+        assert parse_address("127.0.0.1:5555") == ("127.0.0.1", 5555)
+
+    def test_unix_socket_path(self):
+        assert parse_address("/tmp/dummy-api.sock") == "/tmp/dummy-api.sock"
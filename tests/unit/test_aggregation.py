@@ -0,0 +1,75 @@
+import pytest
+from dummy_api.aggregation import AggregationError, get_aggregation
+from dummy_api.columnar import ColumnarList, is_columnar_available
+from tests.conftest import get_json, make_route_provider
+
+BOOKS = [
+    {"id": 1, "author": "Stevenson", "pages": 292, "price": 7.5, "published": "1883-11-14"},
+    {"id": 2, "author": "Poe", "pages": 120, "price": 3.25, "published": "1838-07-01"},
+    {"id": 3, "author": "Stevenson", "pages": 141, "published": "1886-01-05"},
+    {"id": 4, "author": "Melville", "pages": 635, "price": 12.0},
+    {"id": 5, "pages": 50, "price": 1.0, "published": "1900-01-01"}
+]
+
+
+@pytest.fixture
+def route_provider(tmp_path):
+    return make_route_provider(tmp_path, {"books": {"books": BOOKS}}, [
+        {"path": "/books", "name": "books", "data": {"reference": {"source": "books", "find": "books"}}}
+    ])
+
+
+def get_tables() -> list:
+    return [BOOKS, ColumnarList.from_records(BOOKS)] if is_columnar_available() else [BOOKS]
+
+
+class TestAggregation:
+
+    @pytest.mark.parametrize("items", get_tables())
+    def test_totals(self, items):
+        aggregation = get_aggregation({"aggregate": "count,count:price,sum:pages,min:published,max:price"})
+        assert aggregation.apply(items) == {
+            "count": 5, "count_price": 4, "sum_pages": 1238, "min_published": "1838-07-01", "max_price": 12.0
+        }
+
+    @pytest.mark.parametrize("items", get_tables())
+    def test_group_by(self, items):
+        aggregation = get_aggregation({"aggregate": "count,sum:price,max:pages", "group_by": "author"})
+        assert aggregation.apply(items) == [
+            {"author": "Melville", "count": 1, "sum_price": 12.0, "max_pages": 635},
+            {"author": "Poe", "count": 1, "sum_price": 3.25, "max_pages": 120},
+            {"author": "Stevenson", "count": 2, "sum_price": 7.5, "max_pages": 292},
+            {"author": None, "count": 1, "sum_price": 1.0, "max_pages": 50}
+        ]
+
+    @pytest.mark.parametrize("items", get_tables())
+    def test_missing_field(self, items):
+        aggregation = get_aggregation({"aggregate": "sum:weight,min:weight"})
+        assert aggregation.apply(items) == {"sum_weight": 0, "min_weight": None}
+
+    def test_group_by_counts_by_default(self):
+        assert get_aggregation({"group_by": "author"}).functions == (("count", None),)
+
+    @pytest.mark.parametrize("query_params", [
+        {"aggregate": "avg:price"},
+        {"aggregate": "sum"},
+        {"aggregate": "count:"},
+        {"aggregate": "count", "group_by": "author,id"}
+    ])
+    def test_invalid_aggregation(self, query_params):
+        with pytest.raises(AggregationError):
+            get_aggregation(query_params)
+
+
+class TestRouteAggregation:
+
+    def test_filtered_and_sorted(self, route_provider):
+        assert get_json(route_provider, "/books", query_parameters={
+            "pages__gte": "100", "aggregate": "sum:pages", "group_by": "author", "sort": "-sum_pages", "limit": "2"
+        }) == [
+            {"author": "Melville", "sum_pages": 635}, {"author": "Stevenson", "sum_pages": 433}
+        ]
+
+    def test_invalid_aggregation(self, route_provider):
+        response = route_provider.get_route_response("/books", query_parameters={"aggregate": "median:pages"})
+        assert response.get_status() == 400
@@ -0,0 +1,152 @@
+import asyncio
+import gzip
+import json
+import os
+import pytest
+import threading
+from dummy_api.asgi import AsgiApp, RESPONSE_CHUNK_SIZE
+from dummy_api.routes import RoutesProvider
+
+ROUTES_FILE_PATH = os.path.join(os.path.dirname(__file__), "..", "integration", "routes.test.json")
+
+
+def call_app(app, method, path, query_string=b"", body_chunks=None, headers=None):
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": i < len(body_chunks or []) - 1}
+        for i, chunk in enumerate(body_chunks or [b""])
+    ]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "query_string": query_string, "headers": headers or []}
+    asyncio.run(app(scope, receive, send))
+    start = sent[0]
+    body = b"".join(message["body"] for message in sent[1:])
+    return start["status"], dict(start["headers"]), body, sent
+
+
+@pytest.fixture
+def app():
+    return AsgiApp(RoutesProvider(ROUTES_FILE_PATH))
+
+
+class TestAsgiApp:
+
+    def test_index(self, app):
+        status, headers, body, _ = call_app(app, "GET", "/")
+        assert status == 200
+        assert body == b"Welcome to dummy-api"
+
+    def test_api_get(self, app):
+        status, headers, body, _ = call_app(app, "GET", "/api/friends/1")
+        assert status == 200
+        assert headers[b"content-type"] == b"application/json"
+        assert json.loads(body).get("first_name") == "Stephen"
+
+    def test_api_post_with_chunked_body(self, app):
+        payload = json.dumps({"payload": {"id": 3, "first_name": "Robert"}}).encode("utf-8")
+        status, _, body, _ = call_app(app, "POST", "/api/friends", body_chunks=[payload[:10], payload[10:]])
+        assert status == 200
+        assert json.loads(body).get("friends")[-1] == {"id": 3, "first_name": "Robert"}
+        _, _, body, _ = call_app(app, "GET", "/api/friends/3")
+        assert json.loads(body).get("first_name") == "Robert"
+
+    def test_api_post_invalid_json(self, app):
+        status, _, _, _ = call_app(app, "POST", "/api/friends", body_chunks=[b"{not json"])
+        assert status == 400
+
+    def test_unknown_path_and_method(self, app):
+        assert call_app(app, "GET", "/unknown")[0] == 404
+        assert call_app(app, "PATCH", "/api/friends")[0] == 405
+
+    def test_head_is_answered_like_get_without_a_body(self, app):
+        _, get_headers, get_body, _ = call_app(app, "GET", "/api/friends/1")
+        status, headers, body, sent = call_app(app, "HEAD", "/api/friends/1")
+        assert status == 200
+        assert body == b""
+        assert len(sent) == 2
+        assert headers == get_headers
+        assert int(headers[b"content-length"]) == len(get_body)
+        status, _, body, _ = call_app(app, "HEAD", "/")
+        assert (status, body) == (200, b"")
+
+    def test_requests_are_handled_off_the_event_loop(self, app, mocker):
+        handled_on = []
+        get_route_response = app.route_provider.get_route_response
+
+        def record_thread(*args, **kwargs):
+            handled_on.append(threading.current_thread())
+            return get_route_response(*args, **kwargs)
+
+        mocker.patch.object(app.route_provider, "get_route_response", side_effect=record_thread)
+        call_app(app, "POST", "/api/friends", body_chunks=[json.dumps({"payload": {"id": 3}}).encode("utf-8")])
+        call_app(app, "POST", "/api/_batch", body_chunks=[json.dumps([{"path": "friends/3"}]).encode("utf-8")])
+        assert len(handled_on) == 2
+        assert threading.current_thread() not in handled_on
+
+    def test_admin_requests_are_handled_off_the_event_loop(self, mocker):
+        app = AsgiApp(RoutesProvider(ROUTES_FILE_PATH), admin_enabled=True)
+        handled_on = []
+        handle = app.admin_handler.handle
+
+        def record_thread(*args, **kwargs):
+            handled_on.append(threading.current_thread())
+            return handle(*args, **kwargs)
+
+        mocker.patch.object(app.admin_handler, "handle", side_effect=record_thread)
+        assert call_app(app, "GET", "/_admin/profile/status")[0] == 200
+        assert len(handled_on) == 1
+        assert threading.current_thread() not in handled_on
+
+    def test_parse_query_string_first_value_wins(self):
+        assert AsgiApp.parse_query_string(b"a=1&b=2&a=3") == {"a": "1", "b": "2"}
+
+    def test_large_response_is_chunked(self, app):
+        big_payload = {"payload": "x" * (RESPONSE_CHUNK_SIZE * 2)}
+        call_app(app, "POST", "/api/meta", body_chunks=[json.dumps(big_payload).encode("utf-8")])
+        status, headers, body, sent = call_app(app, "GET", "/api/friends")
+        assert len(sent) > 2
+        assert int(headers[b"content-length"]) == len(body)
+
+    def test_admin_endpoints_are_off_by_default(self, app):
+        for method, path in [("GET", "/_admin/metrics"), ("POST", "/_admin/profile/start")]:
+            assert call_app(app, method, path)[0] == 404
+        assert not app.route_provider.profiler.get_status()["active"]
+
+    def test_metrics(self):
+        app = AsgiApp(RoutesProvider(ROUTES_FILE_PATH), admin_enabled=True)
+        call_app(app, "GET", "/api/friends/1")
+        status, headers, body, _ = call_app(app, "GET", "/_admin/metrics")
+        assert status == 200
+        assert headers[b"content-type"].startswith(b"text/plain; version=0.0.4")
+        assert b'dummy_api_requests_total{route="/friends/{id}",method="GET",result="ok"} 1' in body
+
+    def test_trace_header(self, app):
+        scope_headers = [(b"x-dummy-api-trace", b"1")]
+        assert AsgiApp.get_header({"headers": scope_headers}, "X-Dummy-Api-Trace") == "1"
+
+    def test_conditional_get(self, app):
+        status, headers, body, _ = call_app(app, "GET", "/api/friends/1")
+        etag = headers[b"etag"]
+        status, headers, body, _ = call_app(app, "GET", "/api/friends/1", headers=[(b"if-none-match", etag)])
+        assert status == 304
+        assert body == b""
+        assert headers[b"etag"] == etag
+
+    def test_compressed_response(self, app):
+        app.route_provider.compression_threshold = 0
+        status, headers, body, _ = call_app(app, "GET", "/api/friends", headers=[(b"accept-encoding", b"gzip")])
+        assert headers[b"content-encoding"] == b"gzip"
+        assert int(headers[b"content-length"]) == len(body)
+        assert json.loads(gzip.decompress(body))
+
+    def test_batch(self, app):
+        batch = [{"path": "friends/1"}, {"path": "friends/2"}]
+        status, _, body, _ = call_app(app, "POST", "/api/_batch", body_chunks=[json.dumps(batch).encode("utf-8")])
+        assert status == 200
+        assert [result["body"]["id"] for result in json.loads(body)] == [1, 2]
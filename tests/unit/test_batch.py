@@ -0,0 +1,80 @@
+import pytest
+import json
+from dummy_api.batch import BatchHandler, MAX_BATCH_SIZE
+from dummy_api.routes import RoutesProvider
+
+
+@pytest.fixture
+def batch_handler(tmp_path):
+    file_path = tmp_path / "routes.json"
+    file_path.write_text(json.dumps({
+        "data_groups": [{"group_name": "people", "data": {"people": [{"id": 1, "name": "Ann"}]}}],
+        "routes": [
+            {
+                "path": "/people",
+                "name": "people",
+                "methods": ["GET", "POST"],
+                "data": {"reference": {"source": "people", "find": "people"}}
+            },
+            {
+                "path": "/people/{id}",
+                "name": "person",
+                "methods": ["GET", "POST"],
+                "data": {"reference": {"source": "people", "find": "people[id={id}]"}}
+            }
+        ]
+    }))
+    return BatchHandler(RoutesProvider(str(file_path)))
+
+
+def run_batch(batch_handler, request_body) -> list:
+    response = batch_handler.handle(request_body)
+    assert response.get_status() == 200
+    return json.loads(response.get_body())
+
+
+class TestBatch:
+
+    @pytest.mark.parametrize("parallel", [False, True])
+    def test_sub_requests_run_in_order(self, batch_handler, parallel):
+        results = run_batch(batch_handler, {"parallel": parallel, "requests": [
+            {"path": "people"},
+            {"path": "people/1"},
+            {"path": "/api/people", "method": "POST", "body": {"payload": {"id": 2, "name": "Bob"}}},
+            {"path": "people", "query": {"id": 2}},
+            {"path": "people", "query": {"limit": 1}},
+            {"path": "people/2"}
+        ]})
+        assert [result["status"] for result in results] == [200] * 6
+        assert results[0]["body"] == [{"id": 1, "name": "Ann"}]
+        assert results[1]["body"] == {"id": 1, "name": "Ann"}
+        assert results[3]["body"] == [{"id": 2, "name": "Bob"}]
+        assert results[4]["headers"]["X-Total-Count"] == "2"
+        assert results[5]["body"] == {"id": 2, "name": "Bob"}
+
+    def test_plain_list(self, batch_handler):
+        assert run_batch(batch_handler, [{"path": "people/1", "query": {"fields": "name"}}])[0]["body"] == {
+            "name": "Ann"
+        }
+
+    def test_failures_are_reported_per_sub_request(self, batch_handler):
+        results = run_batch(batch_handler, [
+            {"path": "people", "query": {"limit": "x"}},
+            {"path": "people/9", "method": "POST", "body": {"payload": {"id": 9}}},
+            {"path": "people/1"}
+        ])
+        assert [result["status"] for result in results] == [400, 500, 200]
+        assert results[1]["body"]["error"] is True
+
+    @pytest.mark.parametrize("request_body", [
+        None,
+        {"requests": "people"},
+        [{"method": "GET"}],
+        [{"path": "people", "method": "PATCH"}],
+        [{"path": "people", "query": ["limit"]}],
+        [{"path": "people"}] * (MAX_BATCH_SIZE + 1)
+    ])
+    def test_invalid_batch(self, batch_handler, request_body):
+        response = batch_handler.handle(request_body)
+        assert response.get_status() == 400
+        assert json.loads(response.get_body())["error"] is True
@@ -0,0 +1,75 @@
+import pytest
+import sys
+from benchmarks import suite
+
+
+def get_results(calibration_us: float, **results) -> dict:
+    return {"version": suite.RESULTS_FORMAT_VERSION, "python": "3", "calibration_us": calibration_us,
+            "results": results}
+
+
+@pytest.fixture
+def baseline_path(tmp_path):
+    baseline_path = str(tmp_path / "baseline.json")
+    suite.save_results(baseline_path, get_results(10.0, match=1.0, route_get=2.0))
+    return baseline_path
+
+
+def run_main(mocker, baseline_path: str, results: dict, *args) -> int:
+    mocker.patch.object(suite, "run", return_value=results)
+    mocker.patch.object(sys, "argv", ["suite.py", "--baseline", baseline_path, *args])
+    return suite.main()
+
+
+class TestBenchmarkSuite:
+
+    def test_compare_flags_cases_beyond_the_threshold(self):
+        results = get_results(10.0, match=1.4, route_get=3.2)
+        baseline = get_results(10.0, match=1.0, route_get=2.0, removed=1.0)
+        comparisons = suite.compare(results, baseline, threshold=0.5)
+        assert [(comparison["case"], comparison["regressed"]) for comparison in comparisons] == [
+            ("match", False), ("route_get", True)
+        ]
+
+    def test_compare_scales_by_calibration(self):
+        # twice as slow on a machine that is twice as slow is no regression
+        comparison = suite.compare(get_results(20.0, match=2.0), get_results(10.0, match=1.0))[0]
+        assert comparison["ratio"] == pytest.approx(1.0)
+        assert not comparison["regressed"]
+
+    def test_compare_scales_by_the_median_case(self):
+        # the whole machine ran twice as slow while the calibration workload happened to run at full speed
+        keys = [f"case_{i}" for i in range(suite.MIN_SCALED_CASES + 2)]
+        baseline = get_results(10.0, **{key: 10.0 for key in keys})
+        results = get_results(10.0, **{key: 20.0 for key in keys[1:]}, case_0=40.0)
+        comparisons = suite.compare(results, baseline)
+        assert [comparison["case"] for comparison in comparisons if comparison["regressed"]] == ["case_0"]
+
+    def test_compare_ignores_changes_below_the_noise_floor(self):
+        results = get_results(10.0, match=1.8)
+        baseline = get_results(10.0, match=1.0)
+        assert not suite.compare(results, baseline)[0]["regressed"]
+        assert suite.compare(results, baseline, noise_floor_us=0.5)[0]["regressed"]
+
+    def test_run_keeps_the_median_round(self, mocker):
+        case = suite.BenchmarkCase("case", lambda: (lambda: None, 1), {})
+        mocker.patch.object(suite, "get_cases", return_value=[case])
+        mocker.patch.object(suite, "get_loop_count", return_value=1)
+        mocker.patch.object(suite, "time_operation", side_effect=[1.0, 9.0, 2.0])
+        mocker.patch.object(suite, "calibrate", side_effect=[10.0, 30.0, 11.0])
+        results = suite.run(rounds=3)
+        assert results["results"] == {case.key: 2.0}
+        assert results["calibration_us"] == 11.0
+
+    def test_regression_fails_the_run(self, mocker, baseline_path, capsys):
+        assert run_main(mocker, baseline_path, get_results(10.0, match=1.0, route_get=4.0)) == 1
+        output = capsys.readouterr().out
+        assert "REGRESSED" in output.splitlines()[2]
+        assert "1 case(s) regressed by more than 50%" in output
+
+    def test_threshold_is_configurable(self, mocker, baseline_path):
+        assert run_main(mocker, baseline_path, get_results(10.0, match=1.0, route_get=4.0), "--threshold", "2") == 0
+
+    def test_run_within_threshold_passes(self, mocker, baseline_path, capsys):
+        assert run_main(mocker, baseline_path, get_results(10.0, match=1.1, route_get=2.2)) == 0
+        assert "REGRESSED" not in capsys.readouterr().out
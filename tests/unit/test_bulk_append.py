@@ -0,0 +1,66 @@
+import pytest
+import json
+from tests.conftest import get_ids, get_json, make_route_provider
+
+
+@pytest.fixture
+def route_provider(tmp_path):
+    return make_route_provider(tmp_path, {"people": {"people": [{"id": 1, "name": "Ann", "age": 40}]}}, [
+        {
+            "path": "/people",
+            "name": "people",
+            "methods": ["GET", "POST"],
+            "indexes": ["name"],
+            "sorted_indexes": ["age"],
+            "data": {"reference": {"source": "people", "find": "people"}}
+        },
+        {
+            "path": "/people/{id}",
+            "name": "person",
+            "methods": ["GET", "POST"],
+            "data": {"reference": {"source": "people", "find": "people[id={id}]"}}
+        }
+    ])
+
+
+def post_bulk(route_provider, path: str, payload) -> dict:
+    return get_json(route_provider, path, request_method="POST", request_body={"payload": payload, "bulk": True})
+
+
+class TestBulkAppend:
+
+    def test_items_are_appended(self, route_provider):
+        people = [{"id": i, "name": f"Person {i}", "age": i} for i in range(2, 102)]
+        assert post_bulk(route_provider, "/people", people) == {"appended": 100, "errors": []}
+        assert len(get_json(route_provider, "/people")) == 101
+        assert get_json(route_provider, "/people/50") == {"id": 50, "name": "Person 50", "age": 50}
+
+    def test_invalid_items_are_reported(self, route_provider):
+        result = post_bulk(route_provider, "/people", [{"id": 2}, 3, [4], {"id": 5}])
+        assert result == {
+            "appended": 2,
+            "errors": [{"index": 1, "message": "Expected an object"}, {"index": 2, "message": "Expected an object"}]
+        }
+        assert get_ids(get_json(route_provider, "/people")) == [1, 2, 5]
+
+    def test_indexes_and_cache_catch_up(self, route_provider):
+        assert get_json(route_provider, "/people", query_parameters={"name": "Bob"}) == []
+        etag = route_provider.get_route_response("/people").get_headers()["ETag"]
+        post_bulk(route_provider, "/people", [{"id": 2, "name": "Bob", "age": 30}, {"id": 3, "name": "Bob", "age": 20}])
+        response = route_provider.get_route_response("/people", query_parameters={"name": "Bob"}, trace=True)
+        assert get_ids(json.loads(response.get_body())) == [2, 3]
+        assert "index_lookups" in response.get_headers()["Server-Timing"]
+        assert get_ids(get_json(route_provider, "/people", query_parameters={"sort": "age"})) == [3, 2, 1]
+        assert route_provider.get_route_response("/people", if_none_match=etag).get_status() == 200
+
+    @pytest.mark.parametrize("path, payload", [
+        ("/people", {"id": 2}),
+        ("/people/1", [{"id": 2}])
+    ])
+    def test_invalid_bulk_appends_are_bad_requests(self, route_provider, path, payload):
+        response = route_provider.get_route_response(
+            path, request_method="POST", request_body={"payload": payload, "bulk": True}
+        )
+        assert response.get_status() == 400
+        assert json.loads(response.get_body())["error"] is True
+        assert len(get_json(route_provider, "/people")) == 1
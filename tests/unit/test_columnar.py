@@ -0,0 +1,121 @@
+import pytest
+import json
+from dummy_api.columnar import (
+    ColumnarList, DateColumn, FloatColumn, IntColumn, ObjectColumn, StringColumn, convert_columnar_lists,
+    select_records
+)
+from dummy_api.filtering import get_list_filter
+from dummy_api.routes import RoutesProvider
+
+pytest.importorskip("numpy")
+
+RECORDS = [
+    {"id": 1, "name": "Anchor", "price": 9.5, "added": "2021-03-01", "tags": ["nautical"]},
+    {"id": 2, "name": "Buoy", "price": 4.0, "added": "2020-11-15"},
+    {"id": 3, "name": "Anchor", "added": "2022-01-30", "tags": []},
+    {"id": 4, "name": "Compass", "price": 25.25}
+]
+
+
+@pytest.fixture
+def route_provider(tmp_path):
+    file_path = tmp_path / "routes.json"
+    file_path.write_text(json.dumps({
+        "data_groups": [{"group_name": "products", "data": {"products": RECORDS}}],
+        "routes": [
+            {
+                "path": "/products",
+                "name": "products",
+                "methods": ["GET", "POST"],
+                "columnar": True,
+                "indexes": ["name"],
+                "data": {"reference": {"source": "products", "find": "products"}}
+            }
+        ]
+    }))
+    return RoutesProvider(str(file_path))
+
+
+class TestColumnarList:
+
+    def test_column_types(self):
+        table = ColumnarList.from_records(RECORDS)
+        assert isinstance(table.get_column("id"), IntColumn)
+        assert isinstance(table.get_column("price"), FloatColumn)
+        assert isinstance(table.get_column("added"), DateColumn)
+        assert isinstance(table.get_column("name"), StringColumn)
+        assert isinstance(table.get_column("tags"), ObjectColumn)
+
+    def test_reads_like_the_list(self):
+        table = ColumnarList.from_records(RECORDS)
+        assert table == RECORDS
+        assert len(table) == 4
+        assert table[-1] == RECORDS[-1]
+        assert table[1:3] == RECORDS[1:3]
+        assert "price" not in table[2]
+        assert [dict(record) for record in table] == RECORDS
+
+    def test_only_lists_of_records_convert(self):
+        assert ColumnarList.from_records([{"id": 1}, "two"]) is None
+
+    def test_append_and_change(self):
+        table = ColumnarList.from_records(RECORDS)
+        table.append({"id": 5, "name": "Dinghy", "price": 120, "extra": {"oars": 2}})
+        table[0]["price"] = "free"
+        del table[1]
+        expected = [{**RECORDS[0], "price": "free"}] + RECORDS[2:] + [
+            {"id": 5, "name": "Dinghy", "price": 120, "extra": {"oars": 2}}
+        ]
+        assert table == expected
+        # a value that doesn't fit its column moves the field to plain values
+        assert isinstance(table.get_column("price"), ObjectColumn)
+
+    def test_non_records_are_rejected(self):
+        with pytest.raises(ValueError):
+            ColumnarList.from_records(RECORDS).append(7)
+
+    @pytest.mark.parametrize("query_params", [
+        {"name": "Anchor"},
+        {"name__in": "Buoy,Compass"},
+        {"price__gte": "5"},
+        {"added__lt": "2021-06-01"},
+        {"name__gt": "B", "id__lte": "3"},
+        {"id": "2"},
+        {"tags": "nautical"}
+    ])
+    def test_select_records_matches_the_scan(self, query_params):
+        list_filter = get_list_filter(query_params)
+        table = ColumnarList.from_records(RECORDS)
+        assert list_filter.apply(table) == list_filter.select(RECORDS)
+
+    @pytest.mark.parametrize("query_params, expected_ids", [({"id": "true"}, []), ({"id__in": "false,2"}, [2])])
+    def test_select_records_and_the_scan_keep_booleans_apart(self, query_params, expected_ids):
+        list_filter = get_list_filter(query_params)
+        assert [record["id"] for record in list_filter.apply(ColumnarList.from_records(RECORDS))] == expected_ids
+        assert [record["id"] for record in list_filter.select(RECORDS)] == expected_ids
+
+    def test_select_records_leaves_object_columns_to_the_scan(self):
+        table = ColumnarList.from_records(RECORDS)
+        assert select_records(table, [("tags", ("nautical",), None)]) is None
+
+    def test_convert_columnar_lists(self):
+        data = convert_columnar_lists({"products": list(RECORDS), "other": [1, 2]}, [("products",), ("other",)])
+        assert isinstance(data["products"], ColumnarList)
+        assert data["other"] == [1, 2]
+
+
+class TestColumnarRoute:
+
+    def test_group_is_columnar(self, route_provider):
+        data = route_provider.main_data_store.backend.get_group("products")
+        assert isinstance(data["products"], ColumnarList)
+
+    def test_get_encodes_the_records(self, route_provider):
+        assert json.loads(route_provider.get_route_response("/products").get_body()) == RECORDS
+
+    def test_post_appends(self, route_provider):
+        route_provider.get_route_response(
+            "/products", request_method="POST", request_body={"payload": {"id": 5, "name": "Anchor"}}
+        )
+        response = route_provider.get_route_response("/products", query_parameters={"name": "Anchor"})
+        assert [item["id"] for item in json.loads(response.get_body())] == [1, 3, 5]
@@ -0,0 +1,110 @@
+import pytest
+import concurrent.futures
+import json
+import os
+import pathlib
+import pickle
+import shutil
+from dummy_api.compiler import compile_routes_file, get_artifact_path, load_artifact
+from dummy_api.routes import RoutesProvider
+from dummy_api.validators import RoutesFileValidator
+
+TEST_ROUTES_FILE_PATH = os.path.join(os.path.dirname(__file__), "..", "integration", "routes.test.json")
+
+
+@pytest.fixture
+def routes_file_path(tmp_path):
+    file_path = str(tmp_path / "routes.json")
+    shutil.copy(TEST_ROUTES_FILE_PATH, file_path)
+    return file_path
+
+
+class TestRouteTableArtifact:
+
+    def test_compiled_provider_serves_same_responses(self, routes_file_path):
+        RoutesProvider.compile(routes_file_path)
+        compiled_provider = RoutesProvider(routes_file_path, use_artifact=True)
+        route_provider = RoutesProvider(routes_file_path)
+        for path in ["/friends", "/friends/1", "/friends/101", "/friends/1/something", "/data/anything"]:
+            assert compiled_provider.get_route_response(path).get_body() == \
+                route_provider.get_route_response(path).get_body()
+
+    def test_artifact_is_reused_while_source_is_unchanged(self, routes_file_path):
+        compile_routes_file(routes_file_path)
+        assert load_artifact(routes_file_path) is not None
+
+    def test_stale_artifact_is_recompiled(self, routes_file_path):
+        compile_routes_file(routes_file_path)
+        with open(routes_file_path, "r") as f:
+            raw_route_data = json.loads(f.read())
+        raw_route_data["data_groups"][0]["data"]["meta"]["name"] = "Changed"
+        with open(routes_file_path, "w") as f:
+            f.write(json.dumps(raw_route_data))
+
+        assert load_artifact(routes_file_path) is None
+        route_provider = RoutesProvider(routes_file_path, use_artifact=True)
+        assert route_provider.get_route_response_data("/friends").get("meta").get("name") == "Changed"
+        assert load_artifact(routes_file_path) is not None
+
+    def test_corrupt_artifact_is_ignored(self, routes_file_path):
+        with open(get_artifact_path(routes_file_path), "wb") as f:
+            f.write(b"not a pickle")
+        assert load_artifact(routes_file_path) is None
+
+    def test_pickled_headers_are_never_loaded(self, routes_file_path, tmp_path):
+        marker_path = tmp_path / "marker"
+
+        class Payload:
+            def __reduce__(self):
+                return pathlib.Path.touch, (marker_path,)
+
+        with open(get_artifact_path(routes_file_path), "wb") as f:
+            f.write(pickle.dumps(Payload()))
+        assert load_artifact(routes_file_path) is None
+        assert not marker_path.exists()
+
+    def test_artifacts_writable_by_others_are_ignored(self, routes_file_path):
+        artifact_path = compile_routes_file(routes_file_path).artifact_path
+        os.chmod(artifact_path, 0o666)
+        assert load_artifact(routes_file_path) is None
+        os.chmod(artifact_path, 0o644)
+        assert load_artifact(routes_file_path) is not None
+
+    def test_truncated_artifact_is_ignored(self, routes_file_path):
+        artifact_path = compile_routes_file(routes_file_path).artifact_path
+        artifact_size = os.path.getsize(artifact_path)
+        for truncated_size in [artifact_size - 1, artifact_size // 2]:
+            with open(artifact_path, "r+b") as f:
+                f.truncate(truncated_size)
+            assert load_artifact(routes_file_path) is None
+        route_provider = RoutesProvider(routes_file_path, use_artifact=True)
+        assert route_provider.get_route_response_data("/friends/1") is not None
+
+    def test_concurrent_compiles_all_succeed(self, routes_file_path):
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            artifacts = list(executor.map(lambda _: compile_routes_file(routes_file_path), range(8)))
+        for artifact in artifacts:
+            assert artifact.load_group("friends") == artifacts[0].load_group("friends")
+        assert load_artifact(routes_file_path) is not None
+        assert sorted(os.listdir(os.path.dirname(routes_file_path))) == ["routes.json", "routes.json.compiled"]
+
+    def test_invalid_file_is_rejected(self, tmp_path):
+        file_path = str(tmp_path / "routes.json")
+        with open(file_path, "w") as f:
+            f.write(json.dumps({"routes": [{"name": "no path"}]}))
+        with pytest.raises(ValueError):
+            compile_routes_file(file_path)
+        assert not os.path.exists(get_artifact_path(file_path))
+
+
+class TestRoutesFileValidator:
+
+    def test_valid_file(self):
+        with open(TEST_ROUTES_FILE_PATH, "r") as f:
+            assert RoutesFileValidator.validate_file_data(json.loads(f.read()))
+
+    def test_missing_routes(self):
+        assert not RoutesFileValidator.validate_file_data({"data_groups": []})
+
+    def test_group_without_name(self):
+        assert not RoutesFileValidator.validate_file_data({"routes": [], "data_groups": [{"data": {}}]})
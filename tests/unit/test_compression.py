@@ -0,0 +1,86 @@
+import pytest
+import gzip
+import json
+import zlib
+from dummy_api.compression import choose_encoding
+from tests.conftest import make_route_provider
+
+PEOPLE = [{"id": i, "name": f"Person {i}", "city": "Oslo"} for i in range(200)]
+
+
+@pytest.fixture
+def route_provider(tmp_path):
+    return make_route_provider(tmp_path, {"people": {"people": PEOPLE}}, [
+        {
+            "path": "/people",
+            "name": "people",
+            "methods": ["GET", "POST"],
+            "data": {"reference": {"source": "people", "find": "people"}}
+        },
+        {
+            "path": "/people/{id}",
+            "name": "person",
+            "data": {"reference": {"source": "people", "find": "people[id={id}]"}}
+        }
+    ])
+
+
+class TestChooseEncoding:
+
+    @pytest.mark.parametrize("accept_encoding, expected", [
+        (None, None),
+        ("", None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("deflate, gzip", "gzip"),
+        ("gzip;q=0.5, deflate", "deflate"),
+        ("br, *", "gzip"),
+        ("*;q=0.5, gzip;q=0", "deflate"),
+        ("gzip;q=0, deflate;q=0", None),
+        ("GZIP;Q=0.8", "gzip")
+    ])
+    def test_choose_encoding(self, accept_encoding, expected):
+        assert choose_encoding(accept_encoding) == expected
+
+
+class TestCompressedResponses:
+
+    @pytest.mark.parametrize("encoding, decompress", [("gzip", gzip.decompress), ("deflate", zlib.decompress)])
+    def test_large_bodies_are_compressed(self, route_provider, encoding, decompress):
+        response = route_provider.get_route_response("/people", accept_encoding=encoding)
+        headers = response.get_headers()
+        assert headers["Content-Encoding"] == encoding
+        assert headers["Vary"] == "Accept-Encoding"
+        assert headers["ETag"].startswith('W/"')
+        assert json.loads(decompress(response.get_body())) == PEOPLE
+
+    def test_variants_are_compressed_once_per_version(self, route_provider):
+        first = route_provider.get_route_response("/people", accept_encoding="gzip").get_body()
+        second = route_provider.get_route_response("/people", accept_encoding="gzip").get_body()
+        assert second is first
+        route_provider.get_route_response(
+            "/people", request_method="POST", request_body={"payload": {"id": 200, "name": "New"}}
+        )
+        third = route_provider.get_route_response("/people", accept_encoding="gzip").get_body()
+        assert len(json.loads(gzip.decompress(third))) == 201
+
+    def test_small_bodies_are_not_compressed(self, route_provider):
+        response = route_provider.get_route_response("/people/1", accept_encoding="gzip")
+        assert "Content-Encoding" not in response.get_headers()
+        assert json.loads(response.get_body())["id"] == 1
+
+    def test_identity_for_clients_without_accept_encoding(self, route_provider):
+        response = route_provider.get_route_response("/people")
+        assert "Content-Encoding" not in response.get_headers()
+        assert response.get_headers()["Vary"] == "Accept-Encoding"
+
+    def test_compressed_etag_revalidates(self, route_provider):
+        etag = route_provider.get_route_response("/people", accept_encoding="gzip").get_headers()["ETag"]
+        response = route_provider.get_route_response("/people", accept_encoding="gzip", if_none_match=etag)
+        assert response.get_status() == 304
+
+    def test_compression_can_be_turned_off(self, route_provider):
+        route_provider.compression_threshold = None
+        response = route_provider.get_route_response("/people", accept_encoding="gzip")
+        assert "Content-Encoding" not in response.get_headers()
+        assert "Vary" not in response.get_headers()
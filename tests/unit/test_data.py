@@ -150,3 +150,54 @@ class TestMutableDataStoreMutators:
         mutator = self.store.get_group_mutator("data_group_one")
         mutator.get_data()["name"] = "Someone else"
         assert mutator.get_data()["name"] == "Someone else"
+
+
+class TestMutableDataStoreIndexes:
+
+    def setup_method(self):
+        self.store = MutableDataStore()
+        self.store.add_data_group("data", {"items": [{"id": i, "value": str(i)} for i in range(100)]})
+        self.store.register_query_indexes("data", "items[id={id}]")
+        self.resolver = self.store.build_data_resolver("data", "items[id={id}]")
+
+    def test_register_query_indexes(self):
+        indexes = self.store.get_group_indexes("data")
+        assert indexes.get_index(("items",), "id") is not None
+
+    def test_indexed_lookup(self):
+        assert self.resolver(id="50") == {"id": 50, "value": "50"}
+        assert self.resolver(id="500") is None
+
+    def test_index_sees_appended_items(self):
+        self.resolver(id="1")
+        self.store.get_group_mutator("data", "items").update_data({"id": 100, "value": "new"})
+        assert self.resolver(id="100") == {"id": 100, "value": "new"}
+
+    def test_index_sees_replaced_items(self):
+        self.resolver(id="1")
+        self.store.get_group_mutator("data", "items[id={id}]").update_data({"id": 1000, "value": "moved"}, id="5")
+        assert self.resolver(id="5") is None
+        assert self.resolver(id="1000") == {"id": 1000, "value": "moved"}
+
+    def test_index_sees_replaced_group(self):
+        self.resolver(id="1")
+        self.store.get_group_mutator("data").update_data({"items": [{"id": 1, "value": "replaced"}]})
+        assert self.resolver(id="1") == {"id": 1, "value": "replaced"}
+
+    def test_index_sees_field_updates_inside_items(self):
+        self.resolver(id="1")
+        self.store.get_group_mutator("data", "items[id={id}].id").update_data(2000, id="7")
+        assert self.resolver(id="7") is None
+        assert self.resolver(id="2000") == {"id": 2000, "value": "7"}
+
+
+class TestMutableDataStoreReadOnlyResults:
+
+    def test_resolver_result_cannot_mutate_store(self):
+        store = MutableDataStore()
+        group_data = {"items": [{"id": 1, "name": "Stephen"}]}
+        store.add_data_group("data", group_data)
+        result = store.build_data_resolver("data")()
+        with pytest.raises(TypeError):
+            result["items"][0]["name"] = "Someone else"
+        assert group_data["items"][0]["name"] == "Stephen"
@@ -119,6 +119,18 @@ class TestDataPathQuery:
         )
         assert query_result == "Object 1"
 
+    def test_results_are_read_only_unless_asked(self):
+        dpq = DataPathQuery("meta")
+        assert dpq.query_dict(self.dict_to_query) == self.dict_to_query["meta"]
+        assert dpq.query_dict(self.dict_to_query) is not self.dict_to_query["meta"]
+        assert dpq.query_dict(self.dict_to_query, read_only=False) is self.dict_to_query["meta"]
+
+    def test_copy_is_a_deprecated_read_only(self):
+        dpq = DataPathQuery("items[id={id}]")
+        with pytest.warns(DeprecationWarning):
+            query_result = dpq.query_dict(self.dict_to_query, copy=False, id=2)
+        assert query_result is self.dict_to_query["items"][1]
+
 
 class TestDataPathUpdate:
 
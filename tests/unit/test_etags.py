@@ -0,0 +1,103 @@
+import pytest
+import json
+from dummy_api.etags import matches_if_none_match
+from dummy_api.request import RouteRequest
+from tests.conftest import make_route_provider
+
+
+@pytest.fixture
+def route_provider(tmp_path):
+    data_groups = {
+        "people": {"people": [{"id": 1, "name": "Ann"}, {"id": 2, "name": "Bob"}]},
+        "places": {"places": [{"id": 1, "name": "Oslo"}]}
+    }
+    return make_route_provider(tmp_path, data_groups, [
+        {
+            "path": "/people",
+            "name": "people",
+            "methods": ["GET", "POST"],
+            "data": {"reference": {"source": "people", "find": "people"}}
+        },
+        {
+            "path": "/people/{id}",
+            "name": "person",
+            "methods": ["GET", "POST"],
+            "data": {"reference": {"source": "people", "find": "people[id={id}]"}}
+        },
+        {
+            "path": "/places",
+            "name": "places",
+            "methods": ["GET", "POST"],
+            "data": {"reference": {"source": "places", "find": "places"}}
+        }
+    ])
+
+
+def get_etag(route_provider, path: str, **kwargs) -> str:
+    return route_provider.get_route_response(path, **kwargs).get_headers()["ETag"]
+
+
+class TestMatchesIfNoneMatch:
+
+    @pytest.mark.parametrize("if_none_match, expected", [
+        (None, False),
+        ('"a-1"', True),
+        ('W/"a-1"', True),
+        ('"a-2", "a-1"', True),
+        ("*", True),
+        ('"a-2"', False),
+        ("a-1", False)
+    ])
+    def test_matches(self, if_none_match, expected):
+        assert matches_if_none_match(if_none_match, '"a-1"') == expected
+
+
+class TestConditionalGet:
+
+    def test_unchanged_data_is_not_modified(self, route_provider):
+        etag = get_etag(route_provider, "/people")
+        response = route_provider.get_route_response("/people", if_none_match=etag)
+        assert response.get_status() == 304
+        assert response.get_body() == b""
+        assert response.get_headers()["ETag"] == etag
+
+    def test_changed_data_is_sent(self, route_provider):
+        etag = get_etag(route_provider, "/people")
+        route_provider.get_route_response(
+            "/people", request_method="POST", request_body={"payload": {"id": 3, "name": "Cid"}}
+        )
+        response = route_provider.get_route_response("/people", if_none_match=etag)
+        assert response.get_status() == 200
+        assert len(json.loads(response.get_body())) == 3
+        assert response.get_headers()["ETag"] != etag
+
+    def test_unrelated_changes_keep_the_etag(self, route_provider):
+        etag = get_etag(route_provider, "/people")
+        route_provider.get_route_response(
+            "/places", request_method="POST", request_body={"payload": {"id": 2, "name": "Rome"}}
+        )
+        assert route_provider.get_route_response("/people", if_none_match=etag).get_status() == 304
+
+    def test_not_modified_skips_resolving(self, route_provider):
+        etag = get_etag(route_provider, "/people/1")
+        route_provider.response_cache.clear()
+        route = route_provider.match_route(RouteRequest("/people/1"))[0]
+
+        def fail_data_provider(**kwargs):
+            raise AssertionError("resolved")
+
+        route.data_resolver.data_provider = fail_data_provider
+        assert route_provider.get_route_response("/people/1", if_none_match=etag).get_status() == 304
+
+    def test_reload_changes_the_etag(self, route_provider):
+        etag = get_etag(route_provider, "/people")
+        route_provider.set_routes(route_provider.routes, route_provider.raw_route_data["routes"])
+        assert route_provider.get_route_response("/people", if_none_match=etag).get_status() == 200
+
+    def test_unversioned_responses_have_no_etag(self, route_provider):
+        assert "ETag" not in route_provider.get_route_response("/unknown").get_headers()
+        response = route_provider.get_route_response(
+            "/people", request_method="POST", request_body={"payload": {"id": 3}}, if_none_match="*"
+        )
+        assert response.get_status() == 200
+        assert "ETag" not in response.get_headers()
@@ -0,0 +1,118 @@
+import pytest
+import json
+from dummy_api.filtering import Condition, ListFilter, get_list_filter
+from dummy_api.indexes import DataGroupIndexes
+from dummy_api.tracing import COUNTER_INDEX_LOOKUPS, COUNTER_LIST_ITEMS_SCANNED, traced_request
+from tests.conftest import get_ids, get_json, make_route_provider
+
+AUTHORS = [
+    {"id": 1, "last_name": "Stevenson", "born": 1850, "tags": ["nautical", "adventure"]},
+    {"id": 2, "last_name": "Poe", "born": 1809, "tags": ["spooky"]},
+    {"id": 3, "last_name": "Stevenson", "born": 1900, "tags": ["poetry"]},
+    {"id": 4, "last_name": "Melville", "born": 1819, "tags": ["nautical"]}
+]
+
+
+@pytest.fixture
+def route_provider(tmp_path):
+    return make_route_provider(tmp_path, {"authors": {"authors": AUTHORS}}, [
+        {
+            "path": "/authors",
+            "name": "authors",
+            "indexes": ["last_name"],
+            "data": {"reference": {"source": "authors", "find": "authors"}}
+        },
+        {"path": "/library", "name": "library", "data": {"reference": {"source": "authors", "find": "."}}}
+    ])
+
+
+class TestListFilter:
+
+    @pytest.mark.parametrize("query_params, expected_ids", [
+        ({"last_name": "Stevenson"}, [1, 3]),
+        ({"tags": "nautical"}, [1, 4]),
+        ({"tags": "nautical", "last_name": "Stevenson"}, [1]),
+        ({"id": "2"}, [2]),
+        ({"born__gte": "1819", "born__lt": "1900"}, [1, 4]),
+        ({"id__in": "2,4,9"}, [2, 4]),
+        ({"tags__in": "spooky,poetry"}, [2, 3]),
+        ({"last_name__gt": "P"}, [1, 2, 3]),
+        ({"nope": "1"}, [])
+    ])
+    def test_operators(self, query_params, expected_ids):
+        assert get_ids(get_list_filter(query_params).apply(AUTHORS)) == expected_ids
+
+    def test_reserved_and_underscore_parameters_are_not_filters(self):
+        assert get_list_filter({"limit": "1", "fields": "id", "_": "123"}) is None
+
+    def test_mismatched_types_do_not_match(self):
+        assert ListFilter((Condition("last_name", "gt", (5,)),)).apply(AUTHORS) == []
+
+    def test_objects_are_left_alone(self):
+        assert get_list_filter({"id": "1"}).apply({"id": 2}) == {"id": 2}
+
+    def test_indexed_equality_skips_the_scan(self):
+        indexes = DataGroupIndexes()
+        indexes.register_index(("authors",), "last_name")
+        with traced_request() as request_trace:
+            result = get_list_filter({"last_name": "Stevenson", "born__gt": "1860"}).apply(
+                AUTHORS, indexes, ("authors",)
+            )
+        assert get_ids(result) == [3]
+        assert request_trace.counters == {COUNTER_INDEX_LOOKUPS: 1, COUNTER_LIST_ITEMS_SCANNED: 2}
+
+    def test_unindexed_fields_are_scanned(self):
+        with traced_request() as request_trace:
+            get_list_filter({"last_name": "Poe"}).apply(AUTHORS, DataGroupIndexes(), ("authors",))
+        assert request_trace.counters == {COUNTER_LIST_ITEMS_SCANNED: 4}
+
+    @pytest.mark.parametrize("query_params, expected_ids", [
+        ({"active": "true"}, [1]),
+        ({"active": "1"}, [2]),
+        ({"count": "1"}, [1]),
+        ({"count": "true"}, [2, 4]),
+        ({"active__in": "false,0"}, [3]),
+        ({"active": "false"}, [3])
+    ])
+    def test_booleans_only_equal_booleans(self, query_params, expected_ids):
+        items = [
+            {"id": 1, "active": True, "count": 1},
+            {"id": 2, "active": 1, "count": True},
+            {"id": 3, "active": False, "count": 0},
+            {"id": 4, "count": [True, 2]}
+        ]
+        list_filter = get_list_filter(query_params)
+        indexes = DataGroupIndexes()
+        indexes.register_index(("items",), "active")
+        assert get_ids(list_filter.apply(items)) == expected_ids
+        assert get_ids(list_filter.apply(items, indexes, ("items",))) == expected_ids
+
+
+class TestRouteFiltering:
+
+    def test_filtered_route(self, route_provider):
+        assert get_ids(get_json(route_provider, "/authors", query_parameters={"tags": "nautical"})) == [1, 4]
+
+    def test_declared_index_is_used(self, route_provider):
+        response = route_provider.get_route_response(
+            "/authors", query_parameters={"last_name": "Stevenson"}, trace=True
+        )
+        assert get_ids(json.loads(response.get_body())) == [1, 3]
+        assert "index_lookups" in response.get_headers()["Server-Timing"]
+
+    def test_filters_see_appended_items(self, route_provider):
+        route_provider.get_route_response("/authors", query_parameters={"last_name": "Stevenson"})
+        route_provider.main_data_store.get_group_mutator("authors", "authors").update_data(
+            {"id": 5, "last_name": "Stevenson"}
+        )
+        assert get_ids(get_json(route_provider, "/authors", query_parameters={"last_name": "Stevenson"})) == [1, 3, 5]
+
+    def test_filter_then_page_then_project(self, route_provider):
+        response = route_provider.get_route_response(
+            "/authors", query_parameters={"tags": "nautical", "limit": "1", "fields": "last_name"}
+        )
+        assert json.loads(response.get_body()) == [{"last_name": "Stevenson"}]
+        assert response.get_headers()["X-Total-Count"] == "2"
+
+    def test_objects_are_not_filtered(self, route_provider):
+        assert len(get_json(route_provider, "/library", query_parameters={"id": "1"})["authors"]) == 4
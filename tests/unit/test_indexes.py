@@ -0,0 +1,118 @@
+from dummy_api.indexes import HashIndex, DataGroupIndexes, SortedIndex
+
+
+class TestHashIndex:
+
+    def setup_method(self):
+        self.items = [{"id": 1, "name": "One"}, {"id": 2, "name": "Two"}, {"id": 1, "name": "One again"}]
+        self.index = HashIndex("id")
+
+    def test_find_positions_in_list_order(self):
+        assert self.index.find_positions(self.items, 1) == [0, 2]
+        assert self.index.find_positions(self.items, 3) == []
+
+    def test_unhashable_value_is_not_served(self):
+        assert self.index.find_positions(self.items, [1]) is None
+
+    def test_booleans_and_numbers_are_kept_apart(self):
+        self.items.append({"id": True})
+        assert self.index.find_positions(self.items, True) == [3]
+        self.items[3] = {"id": 1.0}
+        self.index.update_position(self.items, 3)
+        assert self.index.find_positions(self.items, 1) == [0, 2, 3]
+        assert self.index.find_positions(self.items, True) == []
+
+    def test_sync_indexes_appended_items(self):
+        self.index.find_positions(self.items, 1)
+        self.items.append({"id": 3, "name": "Three"})
+        assert self.index.find_positions(self.items, 3) == [3]
+
+    def test_update_position_moves_entry(self):
+        self.index.find_positions(self.items, 1)
+        self.items[0] = {"id": 5}
+        self.index.update_position(self.items, 0)
+        assert self.index.find_positions(self.items, 1) == [2]
+        assert self.index.find_positions(self.items, 5) == [0]
+
+    def test_new_source_list_rebuilds(self):
+        self.index.find_positions(self.items, 1)
+        assert self.index.find_positions([{"id": 2}], 2) == [0]
+
+    def test_stale_index_is_rebuilt(self):
+        self.index.find_positions(self.items, 1)
+        self.items[0]["id"] = 9
+        assert self.index.find_positions(self.items, 1) == [2]
+
+    def test_find_all_positions(self):
+        assert self.index.find_all_positions(self.items, [2, 1]) == [0, 1, 2]
+
+    def test_unindexed_items_are_not_ruled_out(self):
+        self.items.append({"id": [1, 2]})
+        assert self.index.find_all_positions(self.items, [1]) is None
+        self.items[-1] = {"id": 4}
+        self.index.update_position(self.items, 3)
+        assert self.index.find_all_positions(self.items, [4]) == [3]
+
+
+class TestSortedIndex:
+
+    def setup_method(self):
+        self.items = [{"born": 1850}, {"born": "unknown"}, {"born": 1809}, {}, {"born": 1850.5}, {"born": 1809}]
+        self.index = SortedIndex("born")
+
+    def get_order(self) -> list:
+        entries, unordered = self.index.get_entries(self.items)
+        return [entry[2] for entry in entries] + unordered
+
+    def test_numbers_then_strings_then_unordered(self):
+        assert self.get_order() == [2, 5, 0, 4, 1, 3]
+
+    def test_appends_are_merged_into_a_new_snapshot(self):
+        entries, unordered = self.index.get_entries(self.items)
+        self.items.append({"born": 1900})
+        self.index.sync(self.items)
+        assert self.get_order() == [2, 5, 0, 4, 6, 1, 3]
+        assert [entry[2] for entry in entries] == [2, 5, 0, 4, 1]
+
+    def test_update_position(self):
+        self.index.get_entries(self.items)
+        self.items[3] = {"born": 1700}
+        self.index.update_position(self.items, 3)
+        self.items[0] = {"born": None}
+        self.index.update_position(self.items, 0)
+        assert self.get_order() == [3, 2, 5, 4, 1, 0]
+
+    def test_stale_index_is_rebuilt(self):
+        self.index.get_entries(self.items)
+        self.items[2]["born"] = 2000
+        assert self.get_order() == [5, 0, 4, 2, 1, 3]
+
+    def test_find_range_positions(self):
+        assert self.index.find_range_positions(self.items, lower=1809, include_lower=False) == [0, 4]
+        assert self.index.find_range_positions(self.items, lower=1809, upper=1850) == [0, 2, 5]
+        assert self.index.find_range_positions(self.items, upper=1850, include_upper=False) == [2, 5]
+        assert self.index.find_range_positions(self.items, lower="a") == [1]
+        assert self.index.find_range_positions(self.items, lower=None) is None
+
+
+class TestDataGroupIndexes:
+
+    def test_record_append_only_touches_matching_list(self):
+        indexes = DataGroupIndexes()
+        items = [{"id": 1}]
+        index = indexes.register_index(("items",), "id")
+        index.sync(items)
+        items.append({"id": 2})
+        indexes.record_append(("other",), items)
+        assert index.values == [1]
+        indexes.record_append(("items",), items)
+        assert index.values == [1, 2]
+
+    def test_record_append_updates_sorted_indexes(self):
+        indexes = DataGroupIndexes()
+        items = [{"id": 2}]
+        index = indexes.register_sorted_index(("items",), "id")
+        index.sync(items)
+        items.append({"id": 1})
+        indexes.record_append(("items",), items)
+        assert index.entries == [(0, 1, 1), (0, 2, 0)]
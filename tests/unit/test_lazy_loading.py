@@ -0,0 +1,80 @@
+import pytest
+import gc
+import json
+import weakref
+from dummy_api.data import MutableDataStore
+from dummy_api.lazy_loading import JsonSpanScanner, RoutesFileFormatError, RoutesFileIndex
+from dummy_api.routes import RoutesProvider
+
+routes_file_data = {
+    "data_groups": [
+        {"group_name": "first", "data": {"items": [{"id": 1, "text": "brackets ] } inside \" strings {["}]}},
+        {"data": [1, 2.5, -3e2, True, None, "\\"], "group_name": "second"},
+        {"group_name": "empty", "data": {}},
+        {"group_name": "first", "data": {"duplicate": True}}
+    ],
+    "routes": [{"path": "/first", "name": "first", "data": {"reference": {"source": "first", "find": "."}}}]
+}
+
+
+@pytest.fixture(params=[False, True], ids=["bytes", "mmap"])
+def routes_file_index(request, tmp_path):
+    file_path = tmp_path / "routes.json"
+    file_path.write_text(json.dumps(routes_file_data, indent=4))
+    index = RoutesFileIndex(str(file_path), use_mmap=request.param)
+    yield index
+    index.close()
+
+
+class TestRoutesFileIndex:
+
+    def test_routes_are_decoded(self, routes_file_index):
+        assert routes_file_index.routes == routes_file_data["routes"]
+
+    def test_groups_are_located(self, routes_file_index):
+        assert routes_file_index.get_group_names() == ["first", "second", "empty"]
+
+    def test_group_data_is_decoded_on_load(self, routes_file_index):
+        for group_dict in routes_file_data["data_groups"][:3]:
+            assert routes_file_index.load_group(group_dict["group_name"]) == group_dict["data"]
+
+    def test_store_decodes_groups_on_first_access(self, routes_file_index):
+        store = MutableDataStore()
+        for group_name in routes_file_index.get_group_names():
+            store.seed_data_group_loader(group_name, routes_file_index.get_group_loader(group_name))
+        assert store.data_groups == {}
+        assert store.build_data_resolver("second")() == routes_file_data["data_groups"][1]["data"]
+        assert list(store.data_groups) == ["second"]
+
+
+class TestJsonSpanScanner:
+
+    def test_skip_nested_value(self):
+        buffer = b'{"a": [1, {"b": "]"}], "c": 2}'
+        assert JsonSpanScanner(buffer).skip_value(0) == len(buffer)
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 64])
+    def test_skip_value_across_chunks(self, monkeypatch, chunk_size):
+        monkeypatch.setattr("dummy_api.lazy_loading.SCAN_CHUNK_SIZE", chunk_size)
+        value = {"a\\": ["\\", "x\"]", {"b": "{[\\\""}], "c": [[], {}, [1, [2, {"d": None}]]]}
+        buffer = json.dumps(value).encode("utf-8") + b', "next": 1'
+        end = JsonSpanScanner(buffer).skip_value(0)
+        assert json.loads(buffer[:end]) == value
+
+    def test_unterminated_value(self):
+        with pytest.raises(RoutesFileFormatError):
+            JsonSpanScanner(b'{"a": [1, 2}').skip_value(0)
+
+
+class TestGarbageCollection:
+
+    def test_discarded_providers_are_collected(self, tmp_path):
+        file_path = tmp_path / "routes.json"
+        file_path.write_text(json.dumps(routes_file_data))
+        freeze_count = gc.get_freeze_count()
+        data_stores = []
+        for _ in range(3):
+            data_stores.append(weakref.ref(RoutesProvider(str(file_path)).main_data_store))
+        gc.collect()
+        assert [data_store() for data_store in data_stores] == [None, None, None]
+        assert gc.get_freeze_count() == freeze_count
@@ -0,0 +1,54 @@
+import threading
+import pytest
+from dummy_api.locks import ReadWriteLock
+
+
+class TestReadWriteLock:
+
+    def setup_method(self):
+        self.lock = ReadWriteLock()
+
+    def test_readers_share_the_lock(self):
+        both_reading = threading.Barrier(2, timeout=5)
+
+        def read():
+            with self.lock.read():
+                both_reading.wait()
+
+        threads = [threading.Thread(target=read) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        assert not both_reading.broken
+
+    def test_writer_excludes_readers(self):
+        events = []
+
+        def read():
+            with self.lock.read():
+                events.append("read")
+
+        with self.lock.write():
+            reader = threading.Thread(target=read)
+            reader.start()
+            reader.join(0.1)
+            events.append("write done")
+        reader.join(5)
+        assert events == ["write done", "read"]
+
+    def test_reentrant_read_and_read_under_write(self):
+        with self.lock.read():
+            with self.lock.read():
+                pass
+        with self.lock.write():
+            with self.lock.write():
+                with self.lock.read():
+                    pass
+        assert self.lock.active_readers == 0
+        assert self.lock.writer is None
+
+    def test_upgrade_is_rejected(self):
+        with self.lock.read():
+            with pytest.raises(RuntimeError):
+                self.lock.acquire_write()
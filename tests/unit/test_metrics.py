@@ -0,0 +1,101 @@
+import pytest
+import os
+from dummy_api.metrics import Histogram, LATENCY_BUCKETS, MetricsRegistry, RequestTimings, format_labels
+from dummy_api.routes import RoutesProvider
+
+ROUTES_FILE_PATH = os.path.join(os.path.dirname(__file__), "..", "integration", "routes.test.json")
+
+
+@pytest.fixture
+def route_provider():
+    return RoutesProvider(ROUTES_FILE_PATH)
+
+
+def get_samples(route_provider: RoutesProvider) -> dict:
+    samples = {}
+    for line in route_provider.render_metrics().get_body().decode("utf-8").splitlines():
+        if not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+class TestHistogram:
+
+    def test_bucket_upper_bounds_are_inclusive(self):
+        histogram = Histogram()
+        for value in [LATENCY_BUCKETS[0], LATENCY_BUCKETS[0] * 1.5, 100]:
+            histogram.observe(value)
+        cumulative_counts = histogram.get_cumulative_counts()
+        assert cumulative_counts[0] == 1
+        assert cumulative_counts[1] == 2
+        assert cumulative_counts[-2] == 2
+        assert cumulative_counts[-1] == 3
+
+
+class TestMetricsRegistry:
+
+    def test_label_values_are_escaped(self):
+        assert format_labels({"route": 'a"b\\c\n'}) == '{route="a\\"b\\\\c\\n"}'
+
+    def test_disabled_registry_records_nothing(self):
+        registry = MetricsRegistry(enabled=False)
+        timings = RequestTimings()
+        timings.matched = timings.started
+        registry.record_request("/friends", "GET", "ok", timings)
+        assert registry.route_metrics == {}
+
+
+class TestRouteMetrics:
+
+    def test_requests_are_counted_by_route_method_and_result(self, route_provider):
+        route_provider.get_route_response("/friends/1", request_method="GET")
+        route_provider.get_route_response("/friends/2", request_method="GET")
+        route_provider.get_route_response("/friends/101", request_method="GET")
+        route_provider.get_route_response("/undefined", request_method="GET")
+        samples = get_samples(route_provider)
+        assert samples['dummy_api_requests_total{route="/friends/{id}",method="GET",result="ok"}'] == 2
+        assert samples['dummy_api_requests_total{route="/friends/{id}",method="GET",result="not_found"}'] == 1
+        assert samples['dummy_api_requests_total{route="/**",method="GET",result="not_found"}'] == 1
+
+    def test_phases_are_timed(self, route_provider):
+        route_provider.get_route_response("/friends/1", request_method="GET")
+        route_provider.get_route_response("/friends/1", request_method="GET")
+        samples = get_samples(route_provider)
+        labels = 'route="/friends/{id}",method="GET"'
+        assert samples[f'dummy_api_request_duration_seconds_count{{{labels},phase="match"}}'] == 2
+        assert samples[f'dummy_api_request_duration_seconds_count{{{labels},phase="total"}}'] == 2
+        # the second request was answered from the response cache
+        assert samples[f'dummy_api_request_duration_seconds_count{{{labels},phase="resolve"}}'] == 1
+        assert samples[f'dummy_api_request_duration_seconds_count{{{labels},phase="serialize"}}'] == 1
+        assert samples[f'dummy_api_response_cache_hits_total{{{labels}}}'] == 1
+        assert samples[f'dummy_api_request_duration_seconds_bucket{{{labels},phase="total",le="+Inf"}}'] == 2
+        assert samples["dummy_api_response_cache_hits"] == 1
+
+    def test_cached_not_found_responses_stay_not_found(self, route_provider):
+        for _ in range(2):
+            route_provider.get_route_response("/friends/101", request_method="GET")
+        samples = get_samples(route_provider)
+        assert samples['dummy_api_requests_total{route="/friends/{id}",method="GET",result="not_found"}'] == 2
+        assert samples['dummy_api_response_cache_hits_total{route="/friends/{id}",method="GET"}'] == 1
+
+    def test_not_modified_responses_are_not_cache_hits(self, route_provider):
+        etag = route_provider.get_route_response("/friends/1").get_headers()["ETag"]
+        assert route_provider.get_route_response("/friends/1", if_none_match=etag).get_status() == 304
+        samples = get_samples(route_provider)
+        assert samples['dummy_api_requests_total{route="/friends/{id}",method="GET",result="not_modified"}'] == 1
+        assert samples['dummy_api_response_cache_hits_total{route="/friends/{id}",method="GET"}'] == 0
+
+    def test_bad_requests_and_errors_are_counted(self, route_provider, mocker):
+        route_provider.get_route_response("/friends", query_parameters={"limit": "many"})
+        mocker.patch.object(route_provider, "encode_route_result", side_effect=RuntimeError("broken"))
+        with pytest.raises(RuntimeError):
+            route_provider.get_route_response("/friends/1")
+        samples = get_samples(route_provider)
+        assert samples['dummy_api_requests_total{route="/friends",method="GET",result="bad_request"}'] == 1
+        assert samples['dummy_api_requests_total{route="/friends/{id}",method="GET",result="error"}'] == 1
+
+    def test_metrics_can_be_turned_off(self):
+        route_provider = RoutesProvider(ROUTES_FILE_PATH, collect_metrics=False)
+        route_provider.get_route_response("/friends/1", request_method="GET")
+        assert not any(name.startswith("dummy_api_requests_total") for name in get_samples(route_provider))
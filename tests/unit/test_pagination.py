@@ -0,0 +1,95 @@
+import pytest
+import json
+from dummy_api.pagination import (
+    NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, PageRequest, PaginationError, decode_cursor, encode_cursor, paginate
+)
+from dummy_api.views import ReadOnlySequenceView
+from tests.conftest import get_ids, make_route_provider
+
+
+@pytest.fixture
+def route_provider(tmp_path):
+    return make_route_provider(tmp_path, {"people": {"people": [{"id": i} for i in range(1, 11)]}}, [
+        {
+            "path": "/people",
+            "name": "people",
+            "methods": ["GET", "POST"],
+            "data": {"reference": {"source": "people", "find": "people"}}
+        },
+        {"path": "/everything", "name": "everything", "data": {"reference": {"source": "people", "find": "."}}}
+    ])
+
+
+class TestPaginate:
+
+    def test_without_paging_parameters(self):
+        assert PageRequest.from_query_params({"q": "x"}) is None
+
+    def test_limit_and_offset(self):
+        page = paginate(list(range(10)), PageRequest.from_query_params({"limit": "3", "offset": "8"}))
+        assert list(page.items) == [8, 9]
+        assert page.total_count == 10
+        assert page.next_cursor is None
+
+    def test_page_is_a_view(self):
+        page = paginate(ReadOnlySequenceView([1, 2, 3]), PageRequest.from_query_params({"limit": "2"}))
+        assert isinstance(page.items, ReadOnlySequenceView)
+        assert list(page.items) == [1, 2]
+
+    def test_non_list_results_are_left_alone(self):
+        assert paginate({"a": 1}, PageRequest.from_query_params({"limit": "1"})) == {"a": 1}
+
+    @pytest.mark.parametrize("query_params", [
+        {"limit": "-1"}, {"limit": "many"}, {"offset": "1", "cursor": encode_cursor(1, None)}, {"cursor": "%%%"},
+        {"cursor": "bm90IGpzb24"}
+    ])
+    def test_invalid_parameters(self, query_params):
+        with pytest.raises(PaginationError):
+            PageRequest.from_query_params(query_params)
+
+    def test_cursor_round_trip(self):
+        assert decode_cursor(encode_cursor(5, "a")) == (5, "a")
+
+    def test_cursor_finds_its_anchor_again(self):
+        items = [{"id": i} for i in range(6)]
+        page = paginate(items, PageRequest.from_query_params({"limit": "3"}))
+        del items[0]
+        next_page = paginate(items, PageRequest.from_query_params({"limit": "3", "cursor": page.next_cursor}))
+        assert get_ids(next_page.items) == [3, 4, 5]
+
+
+class TestRoutePagination:
+
+    def test_page_headers(self, route_provider):
+        response = route_provider.get_route_response("/people", query_parameters={"limit": "4", "offset": "2"})
+        assert get_ids(json.loads(response.get_body())) == [3, 4, 5, 6]
+        assert response.get_headers()[TOTAL_COUNT_HEADER] == "10"
+        assert NEXT_CURSOR_HEADER in response.get_headers()
+
+    def test_cached_pages_keep_their_headers(self, route_provider):
+        route_provider.get_route_response("/people", query_parameters={"limit": "4"})
+        response = route_provider.get_route_response("/people", query_parameters={"limit": "4"})
+        assert route_provider.response_cache.get_stats()["hits"] == 1
+        assert response.get_headers()[TOTAL_COUNT_HEADER] == "10"
+
+    def test_cursor_is_stable_across_appends(self, route_provider):
+        first_page = route_provider.get_route_response("/people", query_parameters={"limit": "6"})
+        route_provider.get_route_response("/people", request_method="POST", request_body={"payload": {"id": 11}})
+        cursor = first_page.get_headers()[NEXT_CURSOR_HEADER]
+        second_page = route_provider.get_route_response("/people", query_parameters={"limit": "6", "cursor": cursor})
+        assert get_ids(json.loads(second_page.get_body())) == [7, 8, 9, 10, 11]
+        assert second_page.get_headers()[TOTAL_COUNT_HEADER] == "11"
+        assert NEXT_CURSOR_HEADER not in second_page.get_headers()
+
+    def test_invalid_parameters_are_a_bad_request(self, route_provider):
+        response = route_provider.get_route_response("/people", query_parameters={"limit": "x"})
+        assert response.get_status() == 400
+        assert json.loads(response.get_body())["error"] is True
+
+    def test_objects_are_not_paged(self, route_provider):
+        response = route_provider.get_route_response("/everything", query_parameters={"limit": "1"})
+        assert len(json.loads(response.get_body())["people"]) == 10
+        assert TOTAL_COUNT_HEADER not in response.get_headers()
+
+    def test_handle_request_returns_the_page_items(self, route_provider):
+        assert get_ids(route_provider.get_route_response_data("/people", query_parameters={"limit": "2"})) == [1, 2]
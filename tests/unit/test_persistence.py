@@ -0,0 +1,118 @@
+import pytest
+import os
+from dummy_api.data import MutableDataStore
+from dummy_api.persistence import MutationLog, SNAPSHOT_FILE_NAME
+
+
+def open_store(directory, **log_options) -> MutableDataStore:
+    store = MutableDataStore()
+    store.enable_mutation_log(MutationLog(str(directory), **log_options))
+    return store
+
+
+def restart(store: MutableDataStore, directory, **log_options) -> MutableDataStore:
+    store.mutation_log.close()
+    return open_store(directory, **log_options)
+
+
+class TestMutationLog:
+
+    def test_mutations_survive_restart(self, tmp_path):
+        store = open_store(tmp_path)
+        store.add_data_group("data", {"items": [{"id": 1, "value": "one"}]})
+        store.get_group_mutator("data", "items").update_data({"id": 2, "value": "two"})
+        store.get_group_mutator("data", "items[id={id}].value").update_data("uno", id="1")
+
+        store = restart(store, tmp_path)
+        assert store.data_groups["data"] == {"items": [{"id": 1, "value": "uno"}, {"id": 2, "value": "two"}]}
+
+    def test_bulk_appends_survive_restart(self, tmp_path):
+        store = open_store(tmp_path)
+        store.add_data_group("data", {"items": [{"id": 1}]})
+        store.get_group_mutator("data", "items").append_items([{"id": 2}, "three", {"id": 4}])
+
+        store = restart(store, tmp_path)
+        assert store.data_groups["data"] == {"items": [{"id": 1}, {"id": 2}, {"id": 4}]}
+
+    def test_updates_to_seeded_groups_survive_restart(self, tmp_path):
+        store = open_store(tmp_path)
+        store.seed_data_group("data", {"items": [{"id": 1}]})
+        store.get_group_mutator("data", "items").update_data({"id": 2})
+
+        store = restart(store, tmp_path)
+        assert "data" not in store.data_groups
+        store.seed_data_group("data", {"items": [{"id": 1}]})
+        assert store.data_groups["data"] == {"items": [{"id": 1}, {"id": 2}]}
+
+    def test_logged_data_is_taken_at_write_time(self, tmp_path):
+        mutation_log = MutationLog(str(tmp_path))
+        mutation_log.start()
+        item = {"id": 1, "tags": ["old"]}
+        mutation_log.append("update", "data", "items", item, {})
+        item["tags"].append("new")
+        mutation_log.close()
+
+        assert MutationLog(str(tmp_path)).recover().records[0]["data"] == {"id": 1, "tags": ["old"]}
+
+    def test_flush_waits_for_fsync(self, tmp_path):
+        store = open_store(tmp_path, commit_interval=0.05)
+        store.add_data_group("data", {"value": 1})
+        assert store.mutation_log.flush(timeout=5)
+        assert store.mutation_log.committed_seq == store.mutation_log.get_last_seq()
+
+    def test_recovered_groups_are_not_reseeded(self, tmp_path):
+        store = open_store(tmp_path)
+        store.add_data_group("data", {"value": "written"})
+        store.get_group_mutator("deleted").replace({"value": 1})
+        store.get_group_mutator("deleted").delete()
+
+        store = restart(store, tmp_path)
+        store.seed_data_group("data", {"value": "seeded"})
+        store.seed_data_group("deleted", {"value": "seeded"})
+        store.seed_data_group("new", {"value": "seeded"})
+        assert store.data_groups == {"data": {"value": "written"}, "new": {"value": "seeded"}}
+
+    def test_snapshot_compacts_log(self, tmp_path):
+        store = open_store(tmp_path, commit_interval=0, snapshot_interval=10)
+        store.add_data_group("data", {"items": [{"id": 0}]})
+        for item_id in range(1, 100):
+            store.get_group_mutator("data", "items").update_data({"id": item_id})
+            store.mutation_log.flush()
+
+        store = restart(store, tmp_path, snapshot_interval=10)
+        assert os.path.exists(tmp_path / SNAPSHOT_FILE_NAME)
+        assert len(store.mutation_log.get_segment_paths()) <= 2
+        assert store.data_groups["data"] == {"items": [{"id": item_id} for item_id in range(100)]}
+
+    def test_torn_tail_is_ignored(self, tmp_path):
+        store = open_store(tmp_path)
+        store.add_data_group("data", {"value": 1})
+        store.mutation_log.close()
+        first_seq, segment_path = store.mutation_log.get_segment_paths()[-1]
+        with open(segment_path, "ab") as f:
+            f.write(b'{"op": "set", "group": "da')
+
+        store = open_store(tmp_path)
+        assert store.data_groups == {"data": {"value": 1}}
+
+    def test_updates_to_groups_never_seeded_are_discarded(self, tmp_path):
+        store = open_store(tmp_path)
+        store.seed_data_group("removed", {"items": [{"id": 1}]})
+        store.get_group_mutator("removed", "items").update_data({"id": 2})
+
+        store = restart(store, tmp_path)
+        assert store.get_snapshot() is None
+        assert store.discard_pending_mutations() == 1
+        assert store.recovered_state.pending_records == {}
+        assert store.get_snapshot() is not None
+
+    def test_replay_failures_are_logged(self, tmp_path, caplog):
+        store = open_store(tmp_path)
+        store.seed_data_group("data", {"value": 1})
+        with pytest.raises(ValueError):
+            store.get_group_mutator("data", "missing.value").update_data(2)
+
+        store = restart(store, tmp_path)
+        store.seed_data_group("data", {"value": 1})
+        assert store.data_groups["data"] == {"value": 1}
+        assert "Could not replay update of group 'data'" in caplog.text
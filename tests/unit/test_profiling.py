@@ -0,0 +1,82 @@
+import pytest
+import json
+import marshal
+import os
+import time
+from dummy_api.admin import AdminHandler
+from dummy_api.routes import RoutesProvider
+
+ROUTES_FILE_PATH = os.path.join(os.path.dirname(__file__), "..", "integration", "routes.test.json")
+
+
+@pytest.fixture
+def route_provider():
+    route_provider = RoutesProvider(ROUTES_FILE_PATH)
+    yield route_provider
+    route_provider.profiler.stop()
+
+
+@pytest.fixture
+def admin_handler(route_provider):
+    return AdminHandler(route_provider, enabled=True)
+
+
+def get_status(admin_handler: AdminHandler) -> dict:
+    return json.loads(admin_handler.handle("profile/status", "GET").get_body())
+
+
+class TestRequestProfiler:
+
+    def test_cprofile_stats_add_up_across_requests(self, route_provider, admin_handler):
+        admin_handler.handle("profile/start", "POST", {"mode": "cprofile"})
+        for friend_id in [1, 2, 1]:
+            route_provider.get_route_response(f"/friends/{friend_id}")
+        admin_handler.handle("profile/stop", "POST")
+        route_provider.get_route_response("/friends/2")
+
+        assert get_status(admin_handler)["sampled_requests"] == 3
+        response = admin_handler.handle("profile", "GET")
+        assert response.get_headers()["Content-Disposition"] == 'attachment; filename="profile.pstats"'
+        stats = marshal.loads(response.get_body())
+        match_route_calls = [
+            stat[1] for (file_name, line, function_name), stat in stats.items() if function_name == "match_route"
+        ]
+        assert match_route_calls == [3]
+
+    def test_stack_samples_are_collapsed(self, route_provider, admin_handler):
+        admin_handler.handle("profile/start", "POST", {"mode": "stacks", "interval": "0.0005"})
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            route_provider.get_route_response("/friends", request_method="POST", request_body={"payload": {"id": 3}})
+            if route_provider.profiler.stack_counts:
+                break
+        admin_handler.handle("profile/stop", "POST")
+
+        lines = admin_handler.handle("profile", "GET").get_body().decode("utf-8").splitlines()
+        assert lines
+        stack, sample_count = lines[0].rsplit(" ", 1)
+        assert "routes.py:render_request" in stack.split(";")
+        assert int(sample_count) >= 1
+
+    def test_sample_rate(self, route_provider, admin_handler):
+        admin_handler.handle("profile/start", "POST", {"rate": "0.5"})
+        for _ in range(200):
+            route_provider.get_route_response("/friends/1")
+        assert 0 < get_status(admin_handler)["sampled_requests"] < 200
+
+    def test_disabled_handler_serves_nothing(self, route_provider):
+        admin_handler = AdminHandler(route_provider)
+        assert admin_handler.handle("profile/start", "POST").get_status() == 404
+        assert admin_handler.handle("metrics", "GET").get_status() == 404
+        assert not route_provider.profiler.get_status()["active"]
+
+    def test_invalid_requests(self, admin_handler):
+        assert admin_handler.handle("profile/start", "POST", {"mode": "perf"}).get_status() == 400
+        assert admin_handler.handle("profile/start", "POST", {"rate": "2"}).get_status() == 400
+        for interval in ["0", "-1", "nan", "inf"]:
+            response = admin_handler.handle("profile/start", "POST", {"mode": "stacks", "interval": interval})
+            assert response.get_status() == 400
+        assert not get_status(admin_handler)["active"]
+        assert admin_handler.handle("profile", "GET").get_status() == 400
+        assert admin_handler.handle("profile/start", "GET").get_status() == 405
+        assert admin_handler.handle("unknown", "GET").get_status() == 404
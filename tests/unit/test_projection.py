@@ -0,0 +1,74 @@
+import pytest
+import json
+from dummy_api.projection import ProjectionError, compile_projection
+from dummy_api.views import ReadOnlyMappingView
+from tests.conftest import get_json, make_route_provider
+
+
+@pytest.fixture
+def route_provider(tmp_path):
+    people = [
+        {"id": i, "name": {"first": f"First {i}", "last": f"Last {i}"}, "bio": "x" * 100, "tags": ["a", "b"]}
+        for i in range(1, 6)
+    ]
+    return make_route_provider(tmp_path, {"people": {"people": people}}, [
+        {"path": "/people", "name": "people", "data": {"reference": {"source": "people", "find": "people"}}},
+        {
+            "path": "/people/{id}",
+            "name": "person",
+            "data": {"reference": {"source": "people", "find": "people[id={id}]"}}
+        }
+    ])
+
+
+class TestProjection:
+
+    def test_nested_fields(self):
+        data = {"id": 1, "name": {"first": "A", "last": "B"}, "bio": "long"}
+        assert compile_projection("id,name.first").apply(data) == {"id": 1, "name": {"first": "A"}}
+
+    def test_whole_value_wins_over_nested_fields(self):
+        assert compile_projection("name.first,name").tree == {"name": None}
+        assert compile_projection("name,name.first").tree == {"name": None}
+
+    def test_lists_are_projected_per_item(self):
+        data = {"items": [{"id": 1, "x": 1}, {"id": 2}], "other": True}
+        assert compile_projection("items.id").apply(data) == {"items": [{"id": 1}, {"id": 2}]}
+
+    def test_selected_values_are_not_copied(self):
+        data = {"name": {"first": "A"}}
+        projected = compile_projection("name").apply(data)
+        assert isinstance(projected["name"], ReadOnlyMappingView)
+        assert projected["name"]._data is data["name"]
+
+    def test_missing_fields_are_left_out(self):
+        assert compile_projection("id,nope.deeper").apply({"id": 1}) == {"id": 1}
+
+    @pytest.mark.parametrize("fields", ["", "a,,b", "a..b", "a."])
+    def test_invalid_fields(self, fields):
+        with pytest.raises(ProjectionError):
+            compile_projection(fields)
+
+
+class TestRouteProjection:
+
+    def test_fields_of_a_list_route(self, route_provider):
+        people = get_json(route_provider, "/people", query_parameters={"fields": "id,name.last"})
+        assert people[0] == {"id": 1, "name": {"last": "Last 1"}}
+
+    def test_fields_of_an_object_route(self, route_provider):
+        assert get_json(route_provider, "/people/2", query_parameters={"fields": "tags"}) == {"tags": ["a", "b"]}
+
+    def test_fields_with_paging(self, route_provider):
+        response = route_provider.get_route_response(
+            "/people", query_parameters={"fields": "id", "limit": "2", "offset": "3"}
+        )
+        assert json.loads(response.get_body()) == [{"id": 4}, {"id": 5}]
+        assert response.get_headers()["X-Total-Count"] == "5"
+
+    def test_projections_are_cached_separately(self, route_provider):
+        route_provider.get_route_response("/people/1", query_parameters={"fields": "id"})
+        assert get_json(route_provider, "/people/1", query_parameters={"fields": "bio"}) == {"bio": "x" * 100}
+
+    def test_invalid_fields_are_a_bad_request(self, route_provider):
+        assert route_provider.get_route_response("/people", query_parameters={"fields": "a..b"}).get_status() == 400
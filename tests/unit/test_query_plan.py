@@ -0,0 +1,63 @@
+import pytest
+from dummy_api.query_plan import compile_query_path, KeyStep, ListStep, ParameterSlot, TemplateSlot
+
+
+class TestCompileQueryPath:
+
+    def test_root_query_has_no_steps(self):
+        assert compile_query_path(".").is_root()
+        assert compile_query_path("").is_root()
+
+    def test_compile_key_steps(self):
+        plan = compile_query_path("meta.name")
+        assert plan.steps == (KeyStep("meta"), KeyStep("name"))
+
+    def test_compile_static_list_step_coerces_value(self):
+        plan = compile_query_path("items[id=1].list[name='Object 1']")
+        assert plan.steps == (ListStep("items", "id", 1), ListStep("list", "name", "Object 1"))
+
+    def test_compile_parameterized_steps(self):
+        plan = compile_query_path("{key}[id={id}].{field}")
+        assert plan.steps == (
+            ListStep(ParameterSlot("key"), "id", ParameterSlot("id")),
+            KeyStep(ParameterSlot("field"))
+        )
+        assert plan.parameter_names == {"key", "id", "field"}
+
+    def test_compile_mixed_template(self):
+        plan = compile_query_path("items[name=item_{id}]")
+        assert plan.steps == (ListStep("items", "name", TemplateSlot("item_{id}", ("id",))),)
+
+    def test_dots_inside_predicates_are_not_split(self):
+        plan = compile_query_path("items[name='a.b'].value")
+        assert plan.steps == (ListStep("items", "name", "a.b"), KeyStep("value"))
+
+    def test_plans_are_cached(self):
+        assert compile_query_path("items[id={id}]") is compile_query_path("items[id={id}]")
+
+    def test_get_parent(self):
+        plan = compile_query_path("groups[id={group_id}].members[member_id={member_id}].name")
+        assert plan.get_parent().query_string == "groups[id={group_id}].members[member_id={member_id}]"
+        assert compile_query_path("friends").get_parent().is_root()
+
+
+class TestQueryPlanExecution:
+
+    def setup_method(self):
+        self.data = {"items": [{"id": 1, "name": "One"}, {"id": 2, "name": "Two"}], "meta": {"name": "Meta"}}
+
+    def test_parameter_values_are_coerced_like_path_segments(self):
+        plan = compile_query_path("items[id={id}].name")
+        assert plan.query(self.data, {"id": "2"}) == "Two"
+        assert plan.query(self.data, {"id": 2}) == "Two"
+
+    def test_missing_parameter_raises(self):
+        with pytest.raises(ValueError):
+            compile_query_path("{key}.name").query(self.data, {})
+
+    def test_missing_list_returns_none(self):
+        assert compile_query_path("missing[id=1]").query(self.data, {}) is None
+
+    def test_update_appends_entity(self):
+        compile_query_path("items").update(self.data, {"id": 3, "name": "Three"}, {})
+        assert self.data["items"][-1] == {"id": 3, "name": "Three"}
@@ -0,0 +1,163 @@
+import pytest
+import json
+import os
+from dummy_api.reloading import RoutesReloader
+from dummy_api.request import RouteRequest
+from dummy_api.routes import RoutesProvider
+
+
+def get_routes_file_data(friends=None, extra_routes=None, extra_groups=None) -> dict:
+    return {
+        "data_groups": [
+            {"group_name": "friends", "data": {"friends": friends or [{"id": 1, "name": "Stephen"}]}},
+            {"group_name": "places", "data": {"places": [{"id": 1, "name": "Home"}]}}
+        ] + (extra_groups or []),
+        "routes": [
+            {"path": "/friends", "name": "friends", "data": {"reference": {"source": "friends", "find": "."}}},
+            {
+                "path": "/friends/{id}",
+                "name": "friend",
+                "data": {"reference": {"source": "friends", "find": "friends[id={id}]"}}
+            },
+            {
+                "path": "/places",
+                "name": "places",
+                "methods": ["GET", "POST"],
+                "data": {"reference": {"source": "places", "find": "."}}
+            }
+        ] + (extra_routes or [])
+    }
+
+
+def write_routes_file(file_path, file_data: dict):
+    file_path.write_text(json.dumps(file_data, indent=4))
+    # make sure the change is visible even on filesystems with coarse timestamps
+    file_stat = os.stat(file_path)
+    os.utime(file_path, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def routes_file(tmp_path):
+    file_path = tmp_path / "routes.json"
+    write_routes_file(file_path, get_routes_file_data())
+    return file_path
+
+
+@pytest.fixture
+def route_provider(routes_file):
+    return RoutesProvider(str(routes_file))
+
+
+@pytest.fixture
+def reloader(route_provider):
+    return RoutesReloader(route_provider)
+
+
+def get_json(route_provider: RoutesProvider, path: str):
+    return json.loads(route_provider.get_route_response(path).get_body())
+
+
+class TestRoutesReloader:
+
+    def test_unchanged_file_is_not_reloaded(self, reloader):
+        assert reloader.check() is None
+
+    def test_changed_group_is_replaced(self, routes_file, route_provider, reloader):
+        write_routes_file(routes_file, get_routes_file_data(friends=[{"id": 1, "name": "Steve"}]))
+        summary = reloader.check()
+        assert summary.changed_groups == ["friends"]
+        assert summary.built_routes == 0
+        assert get_json(route_provider, "/friends/1") == {"id": 1, "name": "Steve"}
+
+    def test_mutations_to_untouched_groups_are_kept(self, routes_file, route_provider, reloader):
+        route_provider.get_route_response(
+            "/places", request_method="POST", request_body={"payload": {"places": [{"id": 2, "name": "Work"}]}}
+        )
+        write_routes_file(routes_file, get_routes_file_data(friends=[{"id": 1, "name": "Steve"}]))
+        reloader.check()
+        assert get_json(route_provider, "/places") == {"places": [{"id": 2, "name": "Work"}]}
+
+    def test_unchanged_routes_are_reused(self, routes_file, route_provider, reloader):
+        old_routes = route_provider.routes
+        new_route = {"path": "/enemies", "name": "enemies", "data": {"reference": {"source": "enemies", "find": "."}}}
+        write_routes_file(routes_file, get_routes_file_data(
+            extra_routes=[new_route],
+            extra_groups=[{"group_name": "enemies", "data": {"enemies": []}}]
+        ))
+        summary = reloader.check()
+        assert summary.built_routes == 1
+        assert summary.changed_groups == ["enemies"]
+        assert route_provider.routes[:3] == old_routes[:3]
+        assert route_provider.routes[-1] is old_routes[-1]
+        assert get_json(route_provider, "/enemies") == {"enemies": []}
+
+    def test_removed_routes_and_groups(self, routes_file, route_provider, reloader):
+        file_data = get_routes_file_data()
+        file_data["routes"] = file_data["routes"][:2]
+        file_data["data_groups"] = file_data["data_groups"][:1]
+        write_routes_file(routes_file, file_data)
+        summary = reloader.check()
+        assert (summary.removed_routes, summary.removed_groups) == (1, ["places"])
+        assert get_json(route_provider, "/places") == {"error": True, "message": "Not found"}
+        assert not route_provider.main_data_store.does_resolver_exist("places")
+        assert "places" not in route_provider.main_data_store.data_groups
+
+    def test_changed_route_is_rebuilt(self, routes_file, route_provider, reloader):
+        file_data = get_routes_file_data()
+        file_data["routes"][1]["path"] = "/people/{id}"
+        write_routes_file(routes_file, file_data)
+        assert reloader.check().built_routes == 1
+        assert get_json(route_provider, "/people/1") == {"id": 1, "name": "Stephen"}
+        assert get_json(route_provider, "/friends/1") == {"error": True, "message": "Not found"}
+
+    def test_indexes_only_removed_routes_used_are_dropped(self, routes_file, route_provider, reloader):
+        friend_index = route_provider.main_data_store.get_group_indexes("friends").get_index(("friends",), "id")
+        file_data = get_routes_file_data()
+        file_data["routes"][1]["path"] = "/people/{id}"
+        write_routes_file(routes_file, file_data)
+        reloader.check()
+        assert route_provider.main_data_store.get_group_indexes("friends").get_index(("friends",), "id") is friend_index
+
+        file_data["routes"] = [file_data["routes"][0], file_data["routes"][2]]
+        write_routes_file(routes_file, file_data)
+        reloader.check()
+        assert route_provider.main_data_store.get_group_indexes("friends").get_index(("friends",), "id") is None
+
+    def test_requests_on_retired_routes_are_matched_again(self, routes_file, route_provider, reloader):
+        # a request that matched the old route just before the reload swapped it out
+        stale_matches = [route_provider.match_route(RouteRequest("/friends/1"))]
+        file_data = get_routes_file_data(friends=[{"id": 1, "name": "Steve"}])
+        file_data["routes"][1]["data"]["reference"]["find"] = "friends[id={id}].name"
+        write_routes_file(routes_file, file_data)
+        reloader.check()
+        assert stale_matches[0][0].retired
+
+        match_route = route_provider.match_route
+        route_provider.match_route = lambda request: stale_matches.pop() if stale_matches else match_route(request)
+        assert get_json(route_provider, "/friends/1") == "Steve"
+        assert stale_matches == []
+
+    def test_groups_are_left_to_the_store_server(self, routes_file, route_provider, reloader):
+        route_provider.main_data_store.backend.owns_groups = False
+        file_data = get_routes_file_data(friends=[{"id": 1, "name": "Steve"}])
+        file_data["routes"][1]["path"] = "/people/{id}"
+        write_routes_file(routes_file, file_data)
+        summary = reloader.check()
+        assert (summary.built_routes, summary.changed_groups) == (1, [])
+        assert get_json(route_provider, "/people/1") == {"id": 1, "name": "Stephen"}
+
+    def test_cached_responses_follow_reloaded_groups(self, routes_file, route_provider, reloader):
+        assert get_json(route_provider, "/friends/1") == {"id": 1, "name": "Stephen"}
+        write_routes_file(routes_file, get_routes_file_data(friends=[{"id": 1, "name": "Steve"}]))
+        reloader.check()
+        assert get_json(route_provider, "/friends/1") == {"id": 1, "name": "Steve"}
+
+    def test_invalid_file_keeps_current_config(self, routes_file, route_provider, reloader):
+        routes_file.write_text('{"routes": [{"path": "/friends"')
+        with pytest.raises(ValueError):
+            reloader.check()
+        assert reloader.check() is None
+        assert get_json(route_provider, "/friends/1") == {"id": 1, "name": "Stephen"}
+
+        write_routes_file(routes_file, get_routes_file_data(friends=[{"id": 1, "name": "Steve"}]))
+        assert reloader.check().changed_groups == ["friends"]
@@ -0,0 +1,48 @@
+from dummy_api.response_cache import ResponseCache, ENTRY_OVERHEAD_BYTES
+
+
+class TestResponseCache:
+
+    def setup_method(self):
+        self.cache = ResponseCache()
+
+    def test_miss_then_hit(self):
+        assert self.cache.get("key", 1) is None
+        self.cache.put("key", 1, b"body")
+        assert self.cache.get("key", 1) == b"body"
+        stats = self.cache.get_stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    def test_newer_token_invalidates_entry(self):
+        self.cache.put("key", 1, b"body")
+        assert self.cache.get("key", 2) is None
+        assert self.cache.get_stats()["invalidations"] == 1
+        assert self.cache.get_stats()["entries"] == 0
+
+    def test_evicts_least_recently_used_when_full(self):
+        cache = ResponseCache(max_bytes=2 * (ENTRY_OVERHEAD_BYTES + 4))
+        cache.put("a", 1, b"aaaa")
+        cache.put("b", 1, b"bbbb")
+        cache.get("a", 1)
+        cache.put("c", 1, b"cccc")
+        assert cache.get("b", 1) is None
+        assert cache.get("a", 1) == b"aaaa"
+        assert cache.get_stats()["evictions"] == 1
+        assert cache.get_stats()["bytes"] <= cache.max_bytes
+
+    def test_oversized_entry_is_not_stored(self):
+        cache = ResponseCache(max_bytes=10)
+        cache.put("key", 1, b"x" * 100)
+        assert cache.get_stats()["entries"] == 0
+
+    def test_variants_count_towards_the_entry(self):
+        entry = self.cache.put("key", 1, b"body")
+        self.cache.add_variant("key", entry, "gzip", b"zipped")
+        assert self.cache.get_entry("key", 1).variants == {"gzip": b"zipped"}
+        assert self.cache.get_stats()["bytes"] == ENTRY_OVERHEAD_BYTES + len(b"body") + len(b"zipped")
+
+    def test_variants_of_replaced_entries_are_dropped(self):
+        entry = self.cache.put("key", 1, b"body")
+        self.cache.put("key", 2, b"new body")
+        self.cache.add_variant("key", entry, "gzip", b"zipped")
+        assert self.cache.get_entry("key", 2).variants == {}
@@ -1,6 +1,6 @@
 import pytest
 from dummy_api.routes import RouteRequest
-from dummy_api.route_matching import RouteConstraint
+from dummy_api.route_matching import RouteConstraint, RouteTrie
 
 
 class TestRouteConstraint:
@@ -58,4 +58,69 @@ class TestRouteConstraint:
         path = "/data/{data_type}/items/{id}"
         constraint = RouteConstraint(path)
         request = RouteRequest("/data/people/items/100", request_method="GET")
-        assert constraint.get_constraint_parameters_from_request(request) == {"id": "100", "data_type": "people"}
\ No newline at end of file
+        assert constraint.get_constraint_parameters_from_request(request) == {"id": "100", "data_type": "people"}
+
+
+class TestRouteTrie:
+
+    def setup_method(self):
+        self.patterns = [
+            "/data/items",
+            "/data/{data_type}/items/{id}",
+            "/data/*/items",
+            "/data/items/{id}",
+            "/data/items/special",
+            "/files/**",
+            "/data/*",
+            "/**"
+        ]
+        self.trie = RouteTrie()
+        for pattern in self.patterns:
+            self.trie.add(pattern, pattern)
+
+    def linear_match(self, request_path):
+        for pattern in self.patterns:
+            constraint = RouteConstraint(pattern)
+            request = RouteRequest(request_path, request_method="GET")
+            if constraint.does_request_match(request):
+                return pattern, constraint.get_constraint_parameters_from_request(request)
+
+    def test_literal_match(self):
+        assert self.trie.match("/data/items") == ("/data/items", {})
+
+    def test_parameter_match_extracts_params(self):
+        assert self.trie.match("/data/people/items/100") == (
+            "/data/{data_type}/items/{id}",
+            {"data_type": "people", "id": "100"}
+        )
+
+    def test_earlier_route_takes_precedence(self):
+        assert self.trie.match("/data/items/special") == ("/data/items/{id}", {"id": "special"})
+
+    def test_catch_all_fallback(self):
+        assert self.trie.match("/unknown/path") == ("/**", {})
+
+    def test_accept_filter_skips_routes(self):
+        assert self.trie.match("/data/items", lambda pattern: pattern != "/data/items") == ("/data/*", {})
+
+    def test_no_match(self):
+        trie = RouteTrie()
+        trie.add("/data/items", "items")
+        assert trie.match("/data/other") is None
+
+    @pytest.mark.parametrize("request_path", [
+        "/data/items",
+        "data/items/",
+        "/data/items/5",
+        "/data/x/items",
+        "/data/x/items/5",
+        "/data",
+        "/data/x",
+        "/data/x/y/z",
+        "/files",
+        "/files/a/b/c",
+        "/",
+        ""
+    ])
+    def test_matches_linear_scan(self, request_path):
+        assert self.trie.match(request_path) == self.linear_match(request_path)
@@ -0,0 +1,103 @@
+import pytest
+import json
+from dummy_api.indexes import DataGroupIndexes
+from dummy_api.sorting import IndexOrderView, SortError, get_sort_order, sort_items
+from tests.conftest import get_ids, get_json, make_route_provider
+
+AUTHORS = [
+    {"id": 1, "last_name": "Stevenson", "born": 1850},
+    {"id": 2, "last_name": "Poe", "born": 1809},
+    {"id": 3, "last_name": "Stevenson", "born": 1900},
+    {"id": 4, "last_name": "Melville"},
+    {"id": 5, "last_name": "Austen", "born": 1775}
+]
+
+
+@pytest.fixture
+def route_provider(tmp_path):
+    return make_route_provider(tmp_path, {"authors": {"authors": AUTHORS}}, [
+        {
+            "path": "/authors",
+            "name": "authors",
+            "methods": ["GET", "POST"],
+            "sorted_indexes": ["born"],
+            "data": {"reference": {"source": "authors", "find": "authors"}}
+        }
+    ])
+
+
+class TestSortItems:
+
+    @pytest.mark.parametrize("sort, expected_ids", [
+        ("born", [5, 2, 1, 3, 4]),
+        ("-born", [3, 1, 2, 5, 4]),
+        ("last_name,-born", [5, 4, 2, 3, 1]),
+        ("-last_name,id", [1, 3, 2, 4, 5])
+    ])
+    def test_sort_items(self, sort, expected_ids):
+        assert get_ids(sort_items(AUTHORS, get_sort_order({"sort": sort}).fields)) == expected_ids
+
+    @pytest.mark.parametrize("sort", ["", "-", "born,,id"])
+    def test_invalid_sort(self, sort):
+        with pytest.raises(SortError):
+            get_sort_order({"sort": sort})
+
+    @pytest.mark.parametrize("sort", ["born", "-born"])
+    def test_index_order_matches_sorting(self, sort):
+        indexes = DataGroupIndexes()
+        indexes.register_sorted_index(("authors",), "born")
+        result = get_sort_order({"sort": sort}).apply(AUTHORS, indexes, ("authors",))
+        assert isinstance(result, IndexOrderView)
+        assert get_ids(result) == get_ids(sort_items(AUTHORS, get_sort_order({"sort": sort}).fields))
+        assert get_ids(result[1:3]) == get_ids(result)[1:3]
+        assert result[-1]["id"] == 4
+
+    @pytest.mark.parametrize("sort", ["group", "-group"])
+    def test_index_order_keeps_ties_in_list_order(self, sort):
+        items = [{"id": i, "group": ["b", "a"][i % 2] if i < 6 else i} for i in range(8)] + [{"id": 8}]
+        indexes = DataGroupIndexes()
+        indexes.register_sorted_index(("items",), "group")
+        sort_order = get_sort_order({"sort": sort})
+        expected_ids = get_ids(sort_items(items, sort_order.fields))
+        result = sort_order.apply(items, indexes, ("items",))
+        assert isinstance(result, IndexOrderView)
+        assert get_ids(result) == expected_ids
+        assert [result[i]["id"] for i in range(len(result))] == expected_ids
+
+
+class TestRouteSorting:
+
+    def test_sorted_page(self, route_provider):
+        response = route_provider.get_route_response(
+            "/authors", query_parameters={"sort": "-born", "limit": "2", "fields": "id"}, trace=True
+        )
+        assert json.loads(response.get_body()) == [{"id": 3}, {"id": 1}]
+        assert "index_lookups" in response.get_headers()["Server-Timing"]
+
+    def test_whole_sorted_list(self, route_provider):
+        assert get_ids(get_json(route_provider, "/authors", query_parameters={"sort": "born"})) == [5, 2, 1, 3, 4]
+
+    def test_appends_are_sorted_in(self, route_provider):
+        route_provider.get_route_response("/authors", query_parameters={"sort": "born"})
+        route_provider.get_route_response(
+            "/authors", request_method="POST", request_body={"payload": {"id": 6, "born": 1800}}
+        )
+        assert get_ids(get_json(route_provider, "/authors", query_parameters={"sort": "born"})) == [5, 6, 2, 1, 3, 4]
+
+    def test_range_filter_uses_the_sorted_index(self, route_provider):
+        response = route_provider.get_route_response(
+            "/authors", query_parameters={"born__gte": "1800", "sort": "-born"}, trace=True
+        )
+        assert get_ids(json.loads(response.get_body())) == [3, 1, 2]
+        assert "index_lookups" in response.get_headers()["Server-Timing"]
+
+    def test_cursor_through_a_sorted_list(self, route_provider):
+        first_page = route_provider.get_route_response("/authors", query_parameters={"sort": "born", "limit": "2"})
+        cursor = first_page.get_headers()["X-Next-Cursor"]
+        route_provider.get_route_response(
+            "/authors", request_method="POST", request_body={"payload": {"id": 6, "born": 1700}}
+        )
+        next_page = get_json(
+            route_provider, "/authors", query_parameters={"sort": "born", "limit": "2", "cursor": cursor}
+        )
+        assert get_ids(next_page) == [1, 3]
@@ -0,0 +1,78 @@
+import pytest
+import os
+from dummy_api.query_plan import compile_query_path
+from dummy_api.routes import RoutesProvider
+from dummy_api.tracing import SERVER_TIMING_HEADER, count, current_trace, is_trace_requested, traced_request
+
+ROUTES_FILE_PATH = os.path.join(os.path.dirname(__file__), "..", "integration", "routes.test.json")
+
+
+@pytest.fixture
+def route_provider():
+    return RoutesProvider(ROUTES_FILE_PATH)
+
+
+def parse_server_timing(header: str) -> dict:
+    entries = {}
+    for entry in header.split(", "):
+        name, *parameters = entry.split(";")
+        entries[name] = dict(parameter.split("=", 1) for parameter in parameters)
+    return entries
+
+
+class TestRequestTracing:
+
+    def test_untraced_requests_have_no_header(self, route_provider):
+        assert SERVER_TIMING_HEADER not in route_provider.get_route_response("/friends/1").get_headers()
+
+    def test_traced_request_reports_stages(self, route_provider):
+        response = route_provider.get_route_response("/friends/2", trace=True)
+        entries = parse_server_timing(response.get_headers()[SERVER_TIMING_HEADER])
+        assert {"match", "resolve", "serialize", "total"} <= set(entries)
+        assert float(entries["total"]["dur"]) >= float(entries["match"]["dur"])
+        assert entries["index_lookups"]["desc"] == '"1"'
+
+    def test_list_scans_are_counted(self):
+        data = {"items": [{"id": item_id} for item_id in range(10)]}
+        with traced_request() as request_trace:
+            compile_query_path("items[id={id}]").query(data, {"id": "3"})
+            compile_query_path("items[id={id}]").query(data, {"id": "42"})
+        assert request_trace.counters == {"list_items_scanned": 4 + 10}
+
+    def test_cache_hits_and_mutations(self, route_provider):
+        route_provider.get_route_response("/friends/1")
+        entries = parse_server_timing(route_provider.get_route_response("/friends/1", trace=True).get_headers()[
+            SERVER_TIMING_HEADER
+        ])
+        assert entries["cache"]["desc"] == '"hit"'
+        assert "resolve" not in entries
+
+        response = route_provider.get_route_response(
+            "/friends", request_method="POST", request_body={"payload": {"id": 3}}, trace=True
+        )
+        assert "mutate" in parse_server_timing(response.get_headers()[SERVER_TIMING_HEADER])
+
+    def test_not_modified_and_bad_requests_are_not_cache_hits(self, route_provider):
+        etag = route_provider.get_route_response("/friends/1").get_headers()["ETag"]
+        not_modified = route_provider.get_route_response("/friends/1", if_none_match=etag, trace=True)
+        bad_request = route_provider.get_route_response("/friends", query_parameters={"limit": "many"}, trace=True)
+        assert (not_modified.get_status(), bad_request.get_status()) == (304, 400)
+        for response in [not_modified, bad_request]:
+            entries = parse_server_timing(response.get_headers()[SERVER_TIMING_HEADER])
+            assert {"match", "total"} <= set(entries)
+            assert "cache" not in entries and "resolve" not in entries
+
+    def test_trace_requests_traces_everything(self):
+        route_provider = RoutesProvider(ROUTES_FILE_PATH, trace_requests=True)
+        assert SERVER_TIMING_HEADER in route_provider.get_route_response("/friends/1").get_headers()
+
+    def test_counts_outside_of_traces_are_dropped(self):
+        count("anything")
+        with traced_request() as request_trace:
+            count("anything", 2)
+        assert request_trace.counters == {"anything": 2}
+        assert current_trace.get() is None
+
+    def test_trace_header_values(self):
+        assert is_trace_requested("1") and is_trace_requested("true")
+        assert not is_trace_requested(None) and not is_trace_requested("0")
@@ -0,0 +1,34 @@
+from dummy_api.versions import DataVersions
+
+
+class TestDataVersions:
+
+    def setup_method(self):
+        self.versions = DataVersions()
+        self.versions.bump(("group",))
+
+    def test_token_changes_for_mutated_path(self):
+        token = self.versions.get_token(("group", "items"))
+        self.versions.bump(("group", "items"))
+        assert self.versions.get_token(("group", "items")) != token
+
+    def test_token_changes_for_mutated_descendant(self):
+        token = self.versions.get_token(("group",))
+        self.versions.bump(("group", "meta", "name"))
+        assert self.versions.get_token(("group",)) != token
+
+    def test_token_changes_for_mutated_ancestor(self):
+        token = self.versions.get_token(("group", "meta", "name"))
+        self.versions.bump(("group",))
+        assert self.versions.get_token(("group", "meta", "name")) != token
+
+    def test_token_unchanged_for_unrelated_path(self):
+        self.versions.bump(("group", "meta"))
+        token = self.versions.get_token(("group", "items"))
+        self.versions.bump(("group", "meta", "name"))
+        self.versions.bump(("other_group",))
+        assert self.versions.get_token(("group", "items")) == token
+
+    def test_reads_do_not_create_nodes(self):
+        self.versions.get_token(("group", "a", "b", "c"))
+        assert "a" not in self.versions.root.children["group"].children
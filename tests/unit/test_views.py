@@ -0,0 +1,50 @@
+import pytest
+from dummy_api.views import make_read_only, materialize, ReadOnlyMappingView, ReadOnlySequenceView
+from dummy_api.serialization import encode_json
+
+
+class TestReadOnlyViews:
+
+    def setup_method(self):
+        self.data = {"name": "Test", "items": [{"id": 1, "tags": ["a", "b"]}, {"id": 2, "tags": []}]}
+        self.view = make_read_only(self.data)
+
+    def test_scalars_are_not_wrapped(self):
+        assert make_read_only("value") == "value"
+        assert make_read_only(5) == 5
+
+    def test_nested_values_are_wrapped(self):
+        assert isinstance(self.view, ReadOnlyMappingView)
+        assert isinstance(self.view["items"], ReadOnlySequenceView)
+        assert isinstance(self.view["items"][0], ReadOnlyMappingView)
+
+    def test_views_compare_equal_to_data(self):
+        assert self.view == self.data
+        assert self.data == self.view
+        assert self.view["items"][0]["tags"] == ["a", "b"]
+
+    def test_views_reject_mutation(self):
+        with pytest.raises(TypeError):
+            self.view["name"] = "Changed"
+        with pytest.raises(TypeError):
+            self.view["items"][0]["tags"][0] = "c"
+        with pytest.raises(AttributeError):
+            self.view["items"].append({"id": 3})
+
+    def test_views_reflect_live_data(self):
+        self.data["items"].append({"id": 3})
+        assert len(self.view["items"]) == 3
+
+    def test_slices_are_views(self):
+        page = self.view["items"][1:]
+        assert isinstance(page, ReadOnlySequenceView)
+        assert page == [{"id": 2, "tags": []}]
+
+    def test_materialize_returns_plain_copy(self):
+        copied = materialize(self.view)
+        assert type(copied) is dict and type(copied["items"]) is list
+        copied["items"][0]["tags"].append("c")
+        assert self.data["items"][0]["tags"] == ["a", "b"]
+
+    def test_encode_json(self):
+        assert encode_json(self.view["items"][:1]) == b'[{"id":1,"tags":["a","b"]}]'